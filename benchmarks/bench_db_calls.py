@@ -0,0 +1,169 @@
+"""
+Count database work per podcast: `Files` calls, SQL statements and commits.
+
+Renders run against a fake Gemini client and a SQLite-backed files table that mirrors
+Open WebUI's (`File` rows, `insert_new_file` and `delete_file_by_id` with one session
+and commit per call). Records go through that public API once the audio succeeded, so a
+podcast costs one insert per saved file: rows are compared with and without
+`save_transcript`. With `--progressive` every preview part adds an insert, and a delete
+once the whole episode is saved.
+
+Before `_save_file` returned a `SavedFile`, every podcast also re-read each of its files
+with `get_file_by_id` to build the citations: 2 inserts + 2 reads with a transcript.
+
+Usage:
+    python benchmarks/bench_db_calls.py [--lines 20] [--repeat 3] [--progressive]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+
+from sqlalchemy import JSON, BigInteger, Column, String, Text, create_engine, event
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import common
+
+Base = declarative_base()
+
+
+class File(Base):
+    __tablename__ = "file"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String)
+    hash = Column(Text, nullable=True)
+    filename = Column(Text)
+    path = Column(Text, nullable=True)
+    data = Column(JSON, nullable=True)
+    meta = Column(JSON, nullable=True)
+    access_control = Column(JSON, nullable=True)
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+
+class Database:
+    """In-memory SQLite engine counting executed statements and commits.
+
+    Records are inserted from `IO_EXECUTOR` threads, so every session shares the one
+    connection of a `StaticPool`: each new connection would be a new, empty database.
+    """
+
+    def __init__(self) -> None:
+        self.engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(self.engine)
+        self.sessions = sessionmaker(bind=self.engine, expire_on_commit=False)
+        self.statements = 0
+        self.commits = 0
+        event.listen(self.engine, "before_cursor_execute", self._count_statement)
+        event.listen(self.engine, "commit", self._count_commit)
+
+    def _count_statement(self, *args) -> None:
+        self.statements += 1
+
+    def _count_commit(self, *args) -> None:
+        self.commits += 1
+
+    @contextlib.contextmanager
+    def get_db(self):
+        session = self.sessions()
+        try:
+            yield session
+        finally:
+            session.close()
+
+
+class FilesTable:
+    """The parts of Open WebUI's `FilesTable` the plugin uses."""
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+        self.calls = {"insert_new_file": 0, "get_file_by_id": 0, "delete_file_by_id": 0}
+
+    def insert_new_file(self, user_id: str, form_data) -> common.FileModel | None:
+        self.calls["insert_new_file"] += 1
+        with self.database.get_db() as db:
+            now = int(time.time())
+            file = File(**form_data.model_dump(), user_id=user_id, created_at=now, updated_at=now)
+            db.add(file)
+            db.commit()
+            db.refresh(file)
+            return common.FileModel(user_id=user_id, **form_data.model_dump())
+
+    def get_file_by_id(self, id: str) -> common.FileModel | None:
+        self.calls["get_file_by_id"] += 1
+        with self.database.get_db() as db:
+            file = db.get(File, id)
+            if file is None:
+                return None
+            return common.FileModel(
+                id=file.id,
+                user_id=file.user_id,
+                filename=file.filename,
+                path=file.path,
+                data=file.data or {},
+                meta=file.meta or {},
+                access_control=file.access_control,
+            )
+
+    def delete_file_by_id(self, id: str) -> bool:
+        self.calls["delete_file_by_id"] += 1
+        with self.database.get_db() as db:
+            deleted = db.query(File).filter_by(id=id).delete()
+            db.commit()
+            return bool(deleted)
+
+
+async def render(plugin, files, transcript: str, transcript_saved: bool, progressive: bool) -> None:
+    action = plugin.Action()
+    action.valves.API_KEY = "bench"
+    action.valves.requests_per_minute = 0
+    action.valves.characters_per_minute = 0
+    action.valves.reuse_identical_renders = "No"
+    action.valves.segment_cache_max_mb = 0
+    action.valves.save_transcript = "Yes" if transcript_saved else "No"
+    action.valves.progressive_playback = "Yes" if progressive else "No"
+    plugin.Files = files
+
+    async def emit(event: dict) -> None:
+        pass
+
+    await action.action(
+        {"messages": [{"content": transcript}]},
+        __user__={"id": "bench-user"},
+        __event_emitter__=emit,
+        __event_call__=emit,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=20, help="Transcript size in speaker lines")
+    parser.add_argument("--repeat", type=int, default=3, help="Podcasts rendered per row")
+    parser.add_argument("--progressive", action="store_true", help="Enable progressive playback parts")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="podcast_it_bench_"))
+    plugin = common.load_plugin()
+    transcript = common.make_transcript(args.lines)
+
+    print(f"{'transcript':<12}{'inserts':>9}{'reads':>7}{'deletes':>9}{'statements':>12}{'commits':>9}  per podcast")
+    for transcript_saved in (True, False):
+        database = Database()
+        table = FilesTable(database)
+        for _ in range(args.repeat):
+            common.install_fakes(plugin, common.FakeGeminiConfig(first_chunk_latency=0.05))
+            asyncio.run(render(plugin, table, transcript, transcript_saved, args.progressive))
+        print(
+            f"{'yes' if transcript_saved else 'no':<12}{table.calls['insert_new_file'] / args.repeat:>9.1f}"
+            f"{table.calls['get_file_by_id'] / args.repeat:>7.1f}{table.calls['delete_file_by_id'] / args.repeat:>9.1f}"
+            f"{database.statements / args.repeat:>12.1f}{database.commits / args.repeat:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
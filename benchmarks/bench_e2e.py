@@ -0,0 +1,227 @@
+"""
+End-to-end benchmark of `Action.action()` against a fake Gemini and in-memory Open WebUI.
+
+Each transcript size runs in a fresh child process (clean caches and peak RSS):
+  1. `--repeat` sequential renders, timed per stage:
+       validate    `_validate_transcript_format`
+       queue       action start until `_generate_podcast` starts (job scheduler)
+       first chunk `_generate_podcast` start until the first streamed chunk
+       synthesize  `_generate_podcast` start until the last streamed chunk (the transcript
+                   and progressive parts upload earlier, while audio is still streaming)
+       upload      time inside `Storage.upload_file`
+       db          time inside `Files` calls
+       finish      last `Files` call until `action()` returns (status, citations)
+       total       whole `action()` call
+     plus the largest event loop lag seen by `LOOP_LAG_MONITOR` during the render
+     (how long any other coroutine of the worker could have been stalled).
+  2. One render under tracemalloc for peak traced allocations.
+  3. `--concurrency` renders for different users at once, for podcasts/min.
+
+Stage and lag columns are medians over the sequential renders, in milliseconds. Caches and
+render reuse are disabled unless `--warm` is given.
+
+Usage:
+    python benchmarks/bench_e2e.py [--lines 20 100 400] [--repeat 3] [--concurrency 4]
+        [--first-chunk-latency 0.5] [--realtime-factor 20] [--chunk-seconds 1]
+        [--failure-rate 0] [--storage-latency 0] [--db-latency 0] [--warm]
+"""
+
+import argparse
+import asyncio
+import functools
+import inspect
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import common
+
+STAGES = ("validate", "queue", "first chunk", "synthesize", "upload", "db", "finish", "total")
+
+
+class StageClock:
+    """Collects stage timings of one render by wrapping plugin and stand-in methods."""
+
+    def __init__(self) -> None:
+        self.marks: dict[str, float] = {}
+        self.totals: dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+
+    def wrap(self, stage: str, function, mark: str | None = None):
+        """Time calls of a sync or async `function` into `stage`, recording its start in `mark`."""
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def timed_async(*args, **kwargs):
+                start = time.perf_counter()
+                if mark:
+                    self.marks.setdefault(mark, start)
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    self.add(stage, time.perf_counter() - start)
+
+            return timed_async
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            if mark:
+                self.marks.setdefault(mark, start)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                self.add(stage, end - start)
+                self.marks["last io"] = end
+
+        return timed
+
+
+def configure(action, args, concurrency: int) -> None:
+    valves = action.valves
+    valves.API_KEY = "bench"
+    valves.requests_per_minute = 0
+    valves.characters_per_minute = 0
+    valves.max_concurrent_jobs = concurrency
+    valves.output_format = args.output_format
+    if not args.warm:
+        valves.reuse_identical_renders = "No"
+        valves.segment_cache_max_mb = 0
+
+
+async def render(action, transcript: str, user_id: str) -> None:
+    async def emit(event: dict) -> None:
+        pass
+
+    await action.action(
+        {"messages": [{"content": transcript}]},
+        __user__={"id": user_id},
+        __event_emitter__=emit,
+        __event_call__=emit,
+    )
+
+
+async def timed_render(plugin, args, transcript: str) -> dict[str, float]:
+    """Render once with a fresh action and stand-ins, returning seconds per stage."""
+    storage, files = common.install_fakes(plugin, gemini_config(args), args.storage_latency, args.db_latency)
+    action = plugin.Action()
+    configure(action, args, 1)
+
+    clock = StageClock()
+    action._validate_transcript_format = clock.wrap("validate", action._validate_transcript_format)
+    action._generate_podcast = clock.wrap("generate", action._generate_podcast, mark="generate")
+    storage.upload_file = clock.wrap("upload", storage.upload_file)
+    files.insert_new_file = clock.wrap("db", files.insert_new_file)
+    files.get_file_by_id = clock.wrap("db", files.get_file_by_id)
+
+    plugin.LOOP_LAG_MONITOR.max_lag = 0.0
+    start = time.perf_counter()
+    await render(action, transcript, "bench-user")
+    end = time.perf_counter()
+
+    generate = clock.marks["generate"]
+    first_chunks = [t for t in common.FakeGeminiClient.stats.first_chunk_at if t >= generate]
+    return {
+        "validate": clock.totals.get("validate", 0.0),
+        "queue": generate - start,
+        "first chunk": (min(first_chunks) - generate) if first_chunks else float("nan"),
+        "synthesize": max(common.FakeGeminiClient.stats.last_chunk_at, generate) - generate,
+        "upload": clock.totals.get("upload", 0.0),
+        "db": clock.totals.get("db", 0.0),
+        "finish": end - clock.marks.get("last io", end),
+        "total": end - start,
+        "loop lag": plugin.LOOP_LAG_MONITOR.max_lag,
+    }
+
+
+def gemini_config(args) -> common.FakeGeminiConfig:
+    return common.FakeGeminiConfig(
+        first_chunk_latency=args.first_chunk_latency,
+        realtime_factor=args.realtime_factor,
+        chunk_seconds=args.chunk_seconds,
+        failure_rate=args.failure_rate,
+    )
+
+
+def run_single(args) -> dict:
+    """Benchmark one transcript size in this process and return the results."""
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="podcast_it_bench_")
+    plugin = common.load_plugin()
+    transcript = common.make_transcript(args.single)
+
+    stages = [asyncio.run(timed_render(plugin, args, transcript)) for _ in range(args.repeat)]
+
+    tracemalloc.start()
+    asyncio.run(timed_render(plugin, args, transcript))
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    common.install_fakes(plugin, gemini_config(args), args.storage_latency, args.db_latency)
+    action = plugin.Action()
+    configure(action, args, args.concurrency)
+
+    async def concurrent() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(render(action, transcript, f"bench-user-{i}") for i in range(args.concurrency))
+        )
+        return time.perf_counter() - start
+
+    wall = asyncio.run(concurrent())
+    stats = common.FakeGeminiClient.stats
+    return {
+        "lines": args.single,
+        "stages": {stage: statistics.median(s[stage] for s in stages) for stage in (*STAGES, "loop lag")},
+        "podcasts_per_minute": args.concurrency / wall * 60,
+        "traced_peak": traced_peak,
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "streams": stats.streams,
+        "failures": stats.failures,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[20, 100, 400], help="Transcript sizes in speaker lines")
+    parser.add_argument("--repeat", type=int, default=3, help="Sequential renders per size")
+    parser.add_argument("--concurrency", type=int, default=4, help="Simultaneous renders for the throughput run")
+    parser.add_argument("--first-chunk-latency", type=float, default=0.5, help="Fake seconds before each stream's first chunk")
+    parser.add_argument("--realtime-factor", type=float, default=20.0, help="Fake audio seconds streamed per wall second")
+    parser.add_argument("--chunk-seconds", type=float, default=1.0, help="Fake audio seconds per chunk")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fake probability of a 429 per stream")
+    parser.add_argument("--storage-latency", type=float, default=0.0, help="Seconds per Storage.upload_file")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="Seconds per Files call")
+    parser.add_argument("--output-format", default="WAV")
+    parser.add_argument("--warm", action="store_true", help="Keep the segment cache and render reuse enabled")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        print(json.dumps(run_single(args)))
+        return
+
+    print(f"{'lines':>6}" + "".join(f"{stage:>12}" for stage in STAGES) + f"{'loop lag':>10}{'podcasts/min':>14}{'traced MB':>11}{'RSS MB':>9}{'429s':>6}")
+    for lines in args.lines:
+        command = [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--single", str(lines)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{lines:>6}"
+            + "".join(f"{result['stages'][stage] * 1000:>12.1f}" for stage in STAGES)
+            + f"{result['stages']['loop lag'] * 1000:>10.1f}"
+            + f"{result['podcasts_per_minute']:>14.1f}{result['traced_peak'] / 1e6:>11.1f}"
+            + f"{result['peak_rss'] / 1e6:>9.1f}{result['failures']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
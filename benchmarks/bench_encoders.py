@@ -0,0 +1,60 @@
+"""
+Benchmark the output encoder stage: encode throughput and size ratio per output format.
+
+Encodes synthetic speech-like PCM (see `common.speech_like_pcm`) in Gemini-sized chunks
+through the same encoder stage `_generate_podcast` uses and reports, per format,
+realtime factor, input throughput and output size relative to WAV.
+
+Usage:
+    python benchmarks/bench_encoders.py [--seconds 300] [--chunk-seconds 0.5]
+"""
+
+import argparse
+import importlib.util
+import time
+
+from common import PCM_MIME_TYPE, SAMPLE_RATE, load_plugin, speech_like_pcm
+
+
+def encode(plugin, action, output_format: str, pcm: bytes, chunk_bytes: int) -> tuple[float, int]:
+    """Encode `pcm` chunk by chunk, returning (seconds spent, output size in bytes)."""
+    with plugin.AudioMemoryBudget(plugin.Action.Valves().audio_memory_budget_mb * 1024 * 1024).spool() as file:
+        view = memoryview(pcm)
+        start = time.perf_counter()
+        encoder = action._create_audio_encoder(file, output_format, PCM_MIME_TYPE)
+        for offset in range(0, len(view), chunk_bytes):
+            encoder.write(view[offset : offset + chunk_bytes], PCM_MIME_TYPE)
+        size = encoder.finalize()
+        return time.perf_counter() - start, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=300.0, help="Audio duration to encode")
+    parser.add_argument("--chunk-seconds", type=float, default=0.5, help="Audio per streamed chunk")
+    args = parser.parse_args()
+
+    plugin = load_plugin()
+    action = plugin.Action()
+    pcm = speech_like_pcm(args.seconds)
+    chunk_bytes = int(args.chunk_seconds * SAMPLE_RATE) * 2
+    has_soundfile = importlib.util.find_spec("soundfile") is not None
+
+    print(f"{args.seconds:.0f}s of speech-like 16-bit PCM @ {SAMPLE_RATE} Hz ({len(pcm) / 1e6:.1f} MB), {chunk_bytes} byte chunks")
+    print(f"{'format':<18}{'size MB':>10}{'ratio':>9}{'x realtime':>13}{'MB/s in':>10}")
+
+    wav_size = None
+    for output_format in plugin.OUTPUT_FORMATS:
+        if output_format != "WAV" and not has_soundfile:
+            print(f"{output_format:<18}{'skipped (soundfile not installed)':>42}")
+            continue
+        seconds, size = encode(plugin, action, output_format, pcm, chunk_bytes)
+        wav_size = wav_size or size
+        print(
+            f"{output_format:<18}{size / 1e6:>10.2f}{size / wav_size:>9.3f}"
+            f"{args.seconds / seconds:>13.0f}{len(pcm) / seconds / 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark the pre-flight estimate (`Action._estimate_render`) against actual renders.
+
+Transcripts of random sizes are rendered one after another against a fake Gemini,
+starting from an empty `SEGMENT_TIMING`, so the estimator only knows the renders before
+each one. Every render is estimated the way `action()` does before admission, then its
+actual audio length (PCM received) and synthesis time (`METRICS` "synthesis" stage) are
+compared with the prediction.
+
+Reported per render: predicted and actual audio and synthesis seconds, and the errors.
+The summary gives the median absolute error of the renders after the first `--warmup`.
+
+Usage:
+    python benchmarks/bench_estimate.py [--renders 10] [--warmup 2] [--min-lines 20]
+        [--max-lines 200] [--first-chunk-latency 1.0] [--realtime-factor 20]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+
+import common
+from bench_segments import SynthesisClock, render
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2, help="Renders left out of the summary")
+    parser.add_argument("--min-lines", type=int, default=20)
+    parser.add_argument("--max-lines", type=int, default=200)
+    parser.add_argument("--first-chunk-latency", type=float, default=1.0, help="Fake seconds of overhead per request")
+    parser.add_argument("--realtime-factor", type=float, default=20.0, help="Fake audio seconds streamed per wall second")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="podcast_it_bench_"))
+    plugin = common.load_plugin()
+    plugin.SEGMENT_TIMING = plugin.SegmentTimingModel(os.path.join(tempfile.mkdtemp(), "segment_timing.json"))
+    clock = SynthesisClock()
+    plugin.METRICS.add_sink("bench", clock)
+    rng = random.Random(0)
+
+    print(f"{'render':>6}{'lines':>7}{'audio s':>10}{'actual':>9}{'error':>8}{'synth s':>10}{'actual':>9}{'error':>8}")
+    audio_errors, synthesis_errors = [], []
+    for index in range(args.renders):
+        common.install_fakes(
+            plugin,
+            common.FakeGeminiConfig(
+                first_chunk_latency=args.first_chunk_latency, realtime_factor=args.realtime_factor, seed=index
+            ),
+        )
+        action = plugin.Action()
+        valves = action.valves
+        valves.API_KEY = "bench"
+        valves.requests_per_minute = 0
+        valves.characters_per_minute = 0
+        valves.reuse_identical_renders = "No"
+        valves.segment_cache_max_mb = 0
+
+        lines = rng.randint(args.min_lines, args.max_lines)
+        transcript = common.make_transcript(lines, seed=index)
+        parsed = action._validate_transcript_format(text=transcript)
+        planner = plugin.SegmentPlanner(parsed.iter_dialogues(), parsed.style)
+        estimate = action._estimate_render(planner, action._plan_segments(planner))
+
+        clock.seconds.clear()
+        asyncio.run(render(action, transcript))
+        audio = common.FakeGeminiClient.stats.bytes / 2 / common.SAMPLE_RATE
+        synthesis = clock.seconds[-1]
+        audio_error = estimate.audio_seconds / audio - 1
+        synthesis_error = estimate.synthesis_seconds / synthesis - 1
+        if index >= args.warmup:
+            audio_errors.append(abs(audio_error))
+            synthesis_errors.append(abs(synthesis_error))
+        print(
+            f"{index + 1:>6}{lines:>7}{estimate.audio_seconds:>10.1f}{audio:>9.1f}{audio_error:>8.0%}"
+            f"{estimate.synthesis_seconds:>10.1f}{synthesis:>9.1f}{synthesis_error:>8.0%}"
+        )
+
+    if audio_errors:
+        print(
+            f"median absolute error after {args.warmup} renders: audio {statistics.median(audio_errors):.0%}, "
+            f"synthesis {statistics.median(synthesis_errors):.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark the plugin's load cost: module import, re-execution and `Action()` construction.
+
+Every measurement runs in a fresh interpreter with `-X importtime`, with what Open WebUI
+already has loaded when it executes a plugin (pydantic, asyncio, the `open_webui` file
+layers or their stand-ins) imported beforehand. Reported per plugin file, as the median
+over `--repeat` interpreters:
+  import ms   cumulative `-X importtime` of the plugin module
+  SDK ms      part of it spent importing `google.genai`
+  reload ms   executing the plugin source again in a warm interpreter, as Open WebUI
+              does when functions are reloaded
+  Action us   constructing `Action()` (valve defaults included)
+  first ms    imports still outstanding at the first podcast (`warm_up()`)
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 5] [--baseline GIT_REF]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import common
+
+PROBE = """
+import json, sys, time, types
+sys.path.insert(0, {benchmarks!r})
+import common
+common.install_open_webui_standins()
+import asyncio, pydantic, open_webui.models.files
+sys.path.insert(0, {directory!r})
+import main
+
+start = time.perf_counter()
+for _ in range(100):
+    main.Action()
+action_us = (time.perf_counter() - start) * 1e4
+
+with open(main.__file__, encoding="utf-8") as f:
+    code = compile(f.read(), main.__file__, "exec")
+reloads = []
+for _ in range(10):
+    module = types.ModuleType("main_reloaded")
+    module.__file__ = main.__file__
+    start = time.perf_counter()
+    exec(code, module.__dict__)
+    reloads.append(time.perf_counter() - start)
+
+start = time.perf_counter()
+if hasattr(main, "warm_up"):
+    main.warm_up()
+else:
+    from google.genai import types
+first_ms = (time.perf_counter() - start) * 1000
+
+print(json.dumps({{"action_us": action_us, "reload_ms": sorted(reloads)[5] * 1000, "first_ms": first_ms}}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(directory: str) -> dict[str, float]:
+    """Import `main.py` from `directory` in a fresh interpreter."""
+    probe = PROBE.format(benchmarks=os.path.dirname(os.path.abspath(__file__)), directory=directory)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=tempfile.gettempdir(),
+    )
+    # Lines are printed children first, each module's parent is the next shallower line
+    import_us = sdk_us = 0
+    pending: list[tuple[int, str, int]] = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match[1]), len(match[2]), match[3]
+        children = [entry for entry in pending if entry[0] > depth]
+        pending = [entry for entry in pending if entry[0] <= depth] + [(depth, name, cumulative)]
+        if name == "main":
+            import_us = cumulative
+            sdk_us = sum(us for _, child, us in children if child.startswith("google"))
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    return {"import_ms": import_us / 1000, "sdk_ms": sdk_us / 1000, **stats}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per plugin file")
+    parser.add_argument("--baseline", help="Also measure main.py as of this git ref")
+    args = parser.parse_args()
+
+    targets = [("working tree", common.REPO_ROOT)]
+    if args.baseline:
+        directory = tempfile.mkdtemp(prefix="podcast_it_baseline_")
+        source = subprocess.run(
+            ["git", "show", f"{args.baseline}:main.py"], cwd=common.REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        with open(os.path.join(directory, "main.py"), "w", encoding="utf-8") as f:
+            f.write(source)
+        targets.insert(0, (args.baseline, directory))
+
+    print(f"{'plugin':<16}{'import ms':>11}{'SDK ms':>9}{'reload ms':>11}{'Action us':>11}{'first ms':>10}")
+    for label, directory in targets:
+        runs = [measure(directory) for _ in range(args.repeat)]
+        row = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print(
+            f"{label:<16}{row['import_ms']:>11.1f}{row['sdk_ms']:>9.1f}{row['reload_ms']:>11.1f}"
+            f"{row['action_us']:>11.0f}{row['first_ms']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
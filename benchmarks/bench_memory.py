@@ -0,0 +1,137 @@
+"""
+Benchmark the memory held by long renders under different `audio_memory_budget_mb` values.
+
+Each budget runs in a fresh child process (clean peak RSS): `--jobs` long podcasts are
+rendered at once against a fake Gemini, written through a `LocalFileStore` so the saved
+files don't stay in memory like with the in-memory `Storage` stand-in. A budget larger
+than the podcasts (e.g. 4096) keeps every buffer in memory, like spools without a limit.
+
+Reported per budget:
+  peak MB     largest per-job peak reported through the `audio_memory_peak_bytes` metric
+  spilled MB  audio spooled to disk per job (mean)
+  traced MB   peak traced Python allocations of the whole run
+  RSS MB      peak resident set size of the process
+  wall s      time until every job finished
+
+Usage:
+    python benchmarks/bench_memory.py [--budgets 0 16 4096] [--jobs 4] [--lines 400]
+        [--concurrency 4] [--realtime-factor 200] [--output-format WAV]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import common
+
+
+class MemorySink:
+    """Metrics sink keeping the per-job audio memory peaks and spilled bytes."""
+
+    def __init__(self) -> None:
+        self.peaks: list[float] = []
+        self.spilled = 0.0
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        if name == "audio_memory_peak_bytes":
+            self.peaks.append(value)
+
+    def increment(self, name: str, amount: float, labels: dict[str, str]) -> None:
+        if name == "audio_spilled_bytes":
+            self.spilled += amount
+
+    def flush(self) -> None:
+        pass
+
+
+async def render(action, transcript: str, user_id: str) -> None:
+    async def emit(event: dict) -> None:
+        pass
+
+    await action.action(
+        {"messages": [{"content": transcript}]},
+        __user__={"id": user_id},
+        __event_emitter__=emit,
+        __event_call__=emit,
+    )
+
+
+def run_single(args) -> dict:
+    """Render `--jobs` podcasts at once with budget `--single` in this process."""
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="podcast_it_bench_")
+    plugin = common.load_plugin()
+    common.install_fakes(plugin, common.FakeGeminiConfig(first_chunk_latency=0.2, realtime_factor=args.realtime_factor))
+    sink = MemorySink()
+    plugin.METRICS.add_sink("bench", sink)
+
+    action = plugin.Action(file_store=plugin.LocalFileStore(tempfile.mkdtemp(prefix="podcast_it_output_")))
+    valves = action.valves
+    valves.API_KEY = "bench"
+    valves.requests_per_minute = 0
+    valves.characters_per_minute = 0
+    valves.max_concurrent_jobs = args.jobs
+    valves.max_concurrent_segments = args.concurrency
+    valves.output_format = args.output_format
+    valves.reuse_identical_renders = "No"
+    valves.segment_cache_max_mb = 0
+    valves.audio_memory_budget_mb = args.single
+
+    async def concurrent() -> None:
+        await asyncio.gather(
+            *(
+                render(action, common.make_transcript(args.lines, seed=index), f"bench-user-{index}")
+                for index in range(args.jobs)
+            )
+        )
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(concurrent())
+    wall = time.perf_counter() - start
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "peak": max(sink.peaks, default=0),
+        "spilled": sink.spilled / max(len(sink.peaks), 1),
+        "traced_peak": traced_peak,
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "wall": wall,
+        "audio": common.FakeGeminiClient.stats.bytes / args.jobs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[0, 16, 4096], help="audio_memory_budget_mb values")
+    parser.add_argument("--jobs", type=int, default=4, help="Podcasts rendered at once")
+    parser.add_argument("--lines", type=int, default=400, help="Transcript size in speaker lines")
+    parser.add_argument("--concurrency", type=int, default=4, help="max_concurrent_segments")
+    parser.add_argument("--realtime-factor", type=float, default=200.0, help="Fake audio seconds streamed per wall second")
+    parser.add_argument("--output-format", default="WAV")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        print(json.dumps(run_single(args)))
+        return
+
+    print(f"{'budget MB':>10}{'audio MB':>10}{'peak MB':>9}{'spilled MB':>12}{'traced MB':>11}{'RSS MB':>9}{'wall s':>8}")
+    for budget in args.budgets:
+        command = [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--single", str(budget)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{budget:>10}{result['audio'] / 1e6:>10.1f}{result['peak'] / 1e6:>9.1f}{result['spilled'] / 1e6:>12.1f}"
+            f"{result['traced_peak'] / 1e6:>11.1f}{result['peak_rss'] / 1e6:>9.1f}{result['wall']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark transcript parsing: throughput and memory of `parse_transcript` against the
+previous two-pass parser that built one dict per dialogue line.
+
+Both parsers run on the same synthetic transcripts (style block, alternating speakers,
+blank lines and CRLF endings); results are checked to be identical before timing.
+
+Usage:
+    python benchmarks/bench_parser.py [--lines 10000 100000 1000000] [--repeat 3]
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+
+from common import load_plugin, make_transcript
+
+
+def legacy_parse(text: str, default_style: str) -> dict:
+    """The parser `_validate_transcript_format` used before `parse_transcript`."""
+    result = {
+        "valid": False,
+        "error": None,
+        "warning": None,
+        "style": "",
+        "dialogues": [],
+        "has_style": False,
+        "speaker_1_count": 0,
+        "speaker_2_count": 0,
+    }
+    if not text or not text.strip():
+        result["error"] = "Transcript is empty"
+        return result
+
+    style_lines = []
+    dialogues = []
+    first_speaker_found = False
+    for line_num, line in enumerate(text.strip().split("\n"), 1):
+        line = line.strip()
+        if not line:
+            continue
+        match = re.match(r"^Speaker ([12]):\s*(.+)$", line)
+        if match:
+            first_speaker_found = True
+            dialogues.append({"speaker": match.group(1), "text": match.group(2).strip()})
+        elif not first_speaker_found:
+            style_lines.append(line)
+        else:
+            result["warning"] = f"Line {line_num}: Unexpected text after speakers started: '{line[:50]}...'"
+
+    result["speaker_1_count"] = sum(1 for d in dialogues if d["speaker"] == "1")
+    result["speaker_2_count"] = sum(1 for d in dialogues if d["speaker"] == "2")
+    if len(dialogues) == 0:
+        result["error"] = "No speaker dialogues found. Expected format:\nSpeaker 1: text\nSpeaker 2: text"
+        return result
+    if len(dialogues) < 2:
+        result["error"] = f"Need at least 2 speaker lines for a conversation, found only {len(dialogues)}"
+        return result
+    if result["speaker_1_count"] == 0:
+        result["error"] = "Missing Speaker 1 lines"
+        return result
+    if result["speaker_2_count"] == 0:
+        result["error"] = "Missing Speaker 2 lines"
+        return result
+    if style_lines:
+        result["has_style"] = True
+        result["style"] = "\n".join(style_lines)
+    else:
+        result["warning"] = (
+            "No style instructions found. Using default style from settings. Consider adding tone/style guidance before speaker lines to customize the tone of the conversation"
+        )
+        result["style"] = default_style
+    result["valid"] = True
+    result["dialogues"] = dialogues
+    return result
+
+
+def measure(parse, text: str, repeat: int) -> tuple[float, int]:
+    """Return (best seconds, peak traced bytes) of parsing `text` and keeping the result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(text)
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    tracemalloc.start()
+    result = parse(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per parser, best is reported")
+    args = parser.parse_args()
+
+    plugin = load_plugin()
+    parsers = {
+        "legacy": lambda text: legacy_parse(text, "default"),
+        "parse_transcript": lambda text: plugin.parse_transcript(text, "default"),
+    }
+
+    print(f"{'lines':>10}  {'parser':<18}{'seconds':>10}{'lines/s':>14}{'peak MB':>10}")
+    for lines in args.lines:
+        text = make_transcript(lines)
+        if plugin.parse_transcript(text, "default").to_dict() != legacy_parse(text, "default"):
+            raise SystemExit(f"parse_transcript result differs from the legacy parser at {lines} lines")
+        for name, parse in parsers.items():
+            seconds, peak = measure(parse, text, args.repeat)
+            print(f"{lines:>10}  {name:<18}{seconds:>10.3f}{lines / seconds:>14,.0f}{peak / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
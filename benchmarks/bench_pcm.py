@@ -0,0 +1,122 @@
+"""
+Benchmark the `PcmStitcher` stage: throughput, memory, loudness matching and trimming.
+
+Segments are synthetic speech-like PCM at different levels (x1, x0.4, x1.6, x0.7
+repeating), each padded with near-silent leading and trailing noise, as separately
+synthesized segments come back. Every duration is streamed through the stage in
+64 KiB chunks into a null encoder, once per `--minutes`.
+
+Reported per duration:
+  xRT         audio seconds processed per wall second
+  peak MB     peak traced allocations while processing (constant if streaming)
+  spread dB   max/min active-speech RMS over segments, before -> after
+  trimmed     share of the input removed as edge silence
+
+Usage:
+    python benchmarks/bench_pcm.py [--minutes 1 10 60] [--segment-seconds 20]
+        [--lead-silence 1.0] [--trail-silence 2.0]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import common
+
+LEVELS = (1.0, 0.4, 1.6, 0.7)
+CHUNK = 64 * 1024
+
+
+class NullEncoder:
+    """Encoder stage stand-in that only measures what it receives."""
+
+    def __init__(self, keep: bool = False) -> None:
+        self.keep = keep
+        self.size = 0
+        self.blocks: list[bytes] = []
+
+    def write(self, data: bytes, mime_type: str) -> None:
+        self.size += len(data)
+        if self.keep:
+            self.blocks.append(data)
+
+    def finalize(self) -> int:
+        return self.size
+
+
+def make_segment(seconds: float, level: float, seed: int, lead: float, trail: float) -> bytes:
+    rng = np.random.default_rng(seed)
+    speech = np.frombuffer(common.speech_like_pcm(seconds, seed), dtype="<i2") * level
+    edges = [rng.normal(0, 3, int(s * common.SAMPLE_RATE)) for s in (lead, trail)]
+    samples = np.concatenate((edges[0], speech, edges[1]))
+    return np.clip(samples, -32768, 32767).astype("<i2").tobytes()
+
+
+def active_rms(pcm: bytes, threshold_db: float = -50.0) -> float:
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.float64)
+    frames = samples[: len(samples) // 240 * 240].reshape(-1, 240)
+    energy = np.square(frames).mean(axis=1)
+    return float(np.sqrt(energy[energy >= (32768 * 10 ** (threshold_db / 20)) ** 2].mean()))
+
+
+def spread_db(levels: list[float]) -> float:
+    return 20 * np.log10(max(levels) / min(levels))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 10, 60])
+    parser.add_argument("--segment-seconds", type=float, default=20.0, help="Speech per segment")
+    parser.add_argument("--lead-silence", type=float, default=1.0, help="Silence before each segment's speech")
+    parser.add_argument("--trail-silence", type=float, default=2.0, help="Silence after each segment's speech")
+    args = parser.parse_args()
+
+    plugin = common.load_plugin()
+    segments = [
+        make_segment(args.segment_seconds, level, seed, args.lead_silence, args.trail_silence)
+        for seed, level in enumerate(LEVELS)
+    ]
+    segment_seconds = [len(segment) / 2 / common.SAMPLE_RATE for segment in segments]
+
+    # Loudness matching, checked on one round of segments
+    encoder = NullEncoder(keep=True)
+    stitcher = plugin.PcmStitcher(encoder, common.PCM_MIME_TYPE, common.SAMPLE_RATE)
+    boundaries = []
+    for segment in segments:
+        stitcher.write(segment, common.PCM_MIME_TYPE)
+        stitcher.end_segment()
+        boundaries.append(stitcher.output_samples * 2)
+    stitcher.finalize()
+    output = b"".join(encoder.blocks)
+    before = [active_rms(segment) for segment in segments]
+    after = [active_rms(output[start:end]) for start, end in zip([0, *boundaries[:-1]], boundaries)]
+
+    print(f"{'minutes':>8}{'seconds':>9}{'xRT':>8}{'peak MB':>9}{'spread dB':>16}{'trimmed':>9}")
+    for minutes in args.minutes:
+        count = max(1, round(minutes * 60 / (sum(segment_seconds) / len(segments))))
+        stitcher = plugin.PcmStitcher(NullEncoder(), common.PCM_MIME_TYPE, common.SAMPLE_RATE)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        for index in range(count):
+            segment = memoryview(segments[index % len(segments)])
+            for offset in range(0, len(segment), CHUNK):
+                stitcher.write(segment[offset : offset + CHUNK], common.PCM_MIME_TYPE)
+            stitcher.end_segment()
+        stitcher.finalize()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        audio_seconds = stitcher.input_samples / common.SAMPLE_RATE
+        print(
+            f"{audio_seconds / 60:>8.1f}{seconds:>9.2f}{audio_seconds / seconds:>8.0f}{peak / 1e6:>9.1f}"
+            f"{spread_db(before):>9.1f} ->{spread_db(after):>4.1f}"
+            f"{1 - stitcher.output_samples / stitcher.input_samples:>9.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark progress reporting for many podcasts in flight: the shared `ProgressReporter`
+against the previous keep-alive task per job.
+
+Jobs arrive spread over the first 5 seconds and run concurrently on one event loop for
+`--seconds`, updating their progress every half second as segments stream in. Some share
+of them has no event emitter (as when a podcast is rendered without a connected client).
+Emitters take `--emit-latency` seconds like a websocket send. Modes:
+  keep-alive  one task per job with an emitter, sleeping 10 s between generic
+              elapsed-time statuses; the job waits for it to wake up before returning
+  shared      `JobProgress` counters, reported by the single `PROGRESS_REPORTER` ticker
+
+Reported per mode and job count:
+  statuses    status events emitted per job with an emitter and minute
+  extra tasks most asyncio tasks alive at once besides the jobs themselves
+  CPU ms      process CPU time of the run
+  finish ms   mean delay between a job's work ending and the job returning
+
+Usage:
+    python benchmarks/bench_progress.py [--jobs 10 100 1000] [--seconds 15]
+        [--no-emitter-share 0.5] [--emit-latency 0.01]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import common
+
+STEP_SECONDS = 0.5
+KEEPALIVE_SECONDS = 10
+ARRIVAL_SECONDS = 5.0
+
+
+class Emitter:
+    """Counts status events, taking `latency` seconds per event."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.events = 0
+
+    async def __call__(self, event: dict) -> None:
+        self.events += 1
+        await asyncio.sleep(self.latency)
+
+
+async def work(seconds: float, progress=None) -> None:
+    """Stand-in for synthesis: a segment and 30 s of audio every step."""
+    for _ in range(int(seconds / STEP_SECONDS)):
+        await asyncio.sleep(STEP_SECONDS)
+        if progress is not None:
+            progress.segments_done += 1
+            progress.audio_seconds += 30.0
+
+
+async def keepalive_job(plugin, seconds: float, emitter) -> float:
+    """The per-job keep-alive `_generate_podcast` used before `ProgressReporter`."""
+    generation_complete = asyncio.Event()
+    started = time.time()
+
+    async def send_keepalive():
+        while not generation_complete.is_set():
+            await asyncio.sleep(KEEPALIVE_SECONDS)
+            if not generation_complete.is_set():
+                elapsed_seconds = int(time.time() - started)
+                await emitter({
+                    "type": "status",
+                    "data": {"description": f"Generating podcast audio... elapsed time: {elapsed_seconds}s", "done": False},
+                })
+
+    keepalive_task = asyncio.create_task(send_keepalive()) if emitter else None
+    await work(seconds)
+    end = time.perf_counter()
+    generation_complete.set()
+    if keepalive_task:
+        await keepalive_task
+    return time.perf_counter() - end
+
+
+async def shared_job(plugin, seconds: float, emitter) -> float:
+    estimate = plugin.RenderEstimate(
+        characters=0, turns=0, segments=int(seconds / STEP_SECONDS), audio_seconds=seconds / STEP_SECONDS * 30,
+        synthesis_seconds=seconds,
+    )
+    progress = plugin.JobProgress(emitter, estimate, estimate.segments)
+    plugin.PROGRESS_REPORTER.track(progress)
+    try:
+        await work(seconds, progress)
+    finally:
+        end = time.perf_counter()
+        plugin.PROGRESS_REPORTER.untrack(progress)
+    return time.perf_counter() - end
+
+
+async def run(plugin, job, jobs: int, seconds: float, no_emitter_share: float, latency: float):
+    emitter = Emitter(latency)
+    with_emitter = jobs - int(jobs * no_emitter_share)
+    peak_tasks = 0
+    running = True
+
+    async def sample_tasks():
+        nonlocal peak_tasks
+        while running:
+            peak_tasks = max(peak_tasks, len(asyncio.all_tasks()))
+            await asyncio.sleep(0.1)
+
+    async def arrive(index: int, offset: float) -> float:
+        await asyncio.sleep(offset)
+        return await job(plugin, seconds, emitter if index < with_emitter else None)
+
+    rng = random.Random(0)
+    sampler = asyncio.create_task(sample_tasks())
+    cpu = time.process_time()
+    delays = await asyncio.gather(*(arrive(index, rng.uniform(0, ARRIVAL_SECONDS)) for index in range(jobs)))
+    cpu = time.process_time() - cpu
+    running = False
+    await sampler
+    statuses = emitter.events / max(with_emitter, 1) / (seconds / 60)
+    # Besides the jobs, the sampler and the run itself are always alive
+    return statuses, peak_tasks - jobs - 2, cpu, statistics.mean(delays)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=15.0, help="Duration of each job")
+    parser.add_argument("--no-emitter-share", type=float, default=0.5, help="Share of jobs without an event emitter")
+    parser.add_argument("--emit-latency", type=float, default=0.01, help="Seconds per emitted event")
+    args = parser.parse_args()
+
+    plugin = common.load_plugin()
+
+    print(f"{'jobs':>6}  {'mode':<12}{'statuses':>9}{'extra tasks':>12}{'CPU ms':>9}{'finish ms':>11}")
+    for jobs in args.jobs:
+        for mode, job in (("keep-alive", keepalive_job), ("shared", shared_job)):
+            statuses, peak_tasks, cpu, delay = asyncio.run(
+                run(plugin, job, jobs, args.seconds, args.no_emitter_share, args.emit_latency)
+            )
+            print(f"{jobs:>6}  {mode:<12}{statuses:>9.1f}{peak_tasks:>12}{cpu * 1000:>9.0f}{delay * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
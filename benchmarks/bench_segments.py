@@ -0,0 +1,133 @@
+"""
+Benchmark segment sizing: fixed `segment_max_chars` against adaptive planning.
+
+A series of different transcripts is rendered one after another against a fake Gemini
+whose requests take a fixed overhead plus time proportional to their audio, and whose
+streams break off halfway with a probability growing with the segment size (a broken
+segment fails the render pass, which resumes from the checkpoints). Modes:
+  fixed     `adaptive_segments = "No"`, segments packed up to `segment_max_chars`
+  adaptive  sizes chosen from `SEGMENT_TIMING`, which starts empty and learns from the
+            renders of the series (persisted like across worker restarts)
+
+Reported per mode, as the median over the series (the first render runs on the prior):
+  synthesis   seconds of the "synthesis" stage recorded through `METRICS`
+  segments    segments synthesized (final plan)
+  streams     Gemini requests, including broken ones
+  breaks      streams that broke off
+  loop lag    largest event loop lag seen by `LOOP_LAG_MONITOR`, in milliseconds
+
+Usage:
+    python benchmarks/bench_segments.py [--lines 40 200] [--renders 4] [--concurrency 4]
+        [--first-chunk-latency 1.5] [--realtime-factor 10] [--break-rate 0.0002]
+        [--requests-per-minute 0]
+
+Long transcripts, where adaptive planning must not cost more than it saves:
+    python benchmarks/bench_segments.py --lines 10000 --renders 1 --concurrency 8
+        --first-chunk-latency 0.2 --realtime-factor 400 --break-rate 0
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+
+import common
+
+
+class SynthesisClock:
+    """Metrics sink keeping the durations of the "synthesis" stage."""
+
+    def __init__(self) -> None:
+        self.seconds: list[float] = []
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        if labels.get("stage") == "synthesis":
+            self.seconds.append(value)
+
+    def increment(self, name: str, amount: float, labels: dict[str, str]) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+
+async def render(action, transcript: str) -> None:
+    async def emit(event: dict) -> None:
+        pass
+
+    await action.action(
+        {"messages": [{"content": transcript}]},
+        __user__={"id": "bench-user"},
+        __event_emitter__=emit,
+        __event_call__=emit,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[40, 200], help="Transcript sizes in speaker lines")
+    parser.add_argument("--renders", type=int, default=4, help="Transcripts rendered per size and mode")
+    parser.add_argument("--concurrency", type=int, default=4, help="max_concurrent_segments")
+    parser.add_argument("--first-chunk-latency", type=float, default=1.5, help="Fake seconds of overhead per request")
+    parser.add_argument("--realtime-factor", type=float, default=10.0, help="Fake audio seconds streamed per wall second")
+    parser.add_argument("--break-rate", type=float, default=0.0002, help="Fake probability per character that a stream breaks")
+    parser.add_argument("--requests-per-minute", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="podcast_it_bench_"))
+    plugin = common.load_plugin()
+    clock = SynthesisClock()
+    plugin.METRICS.add_sink("bench", clock)
+
+    print(f"{'lines':>6}  {'mode':<10}{'synthesis':>11}{'segments':>10}{'streams':>9}{'breaks':>8}{'loop lag':>10}")
+    for lines in args.lines:
+        for mode in ("fixed", "adaptive"):
+            timing_path = os.path.join(tempfile.mkdtemp(prefix="podcast_it_timing_"), "segment_timing.json")
+            plugin.SEGMENT_TIMING = plugin.SegmentTimingModel(timing_path)
+            rows = []
+            for seed in range(args.renders):
+                common.install_fakes(
+                    plugin,
+                    common.FakeGeminiConfig(
+                        first_chunk_latency=args.first_chunk_latency,
+                        realtime_factor=args.realtime_factor,
+                        break_rate_per_char=args.break_rate,
+                        seed=seed,
+                    ),
+                )
+                action = plugin.Action()
+                valves = action.valves
+                valves.API_KEY = "bench"
+                valves.adaptive_segments = "Yes" if mode == "adaptive" else "No"
+                valves.max_concurrent_segments = args.concurrency
+                valves.requests_per_minute = args.requests_per_minute
+                valves.characters_per_minute = 0
+                valves.max_resume_attempts = 10
+                valves.reuse_identical_renders = "No"
+                valves.segment_cache_max_mb = 0
+
+                clock.seconds.clear()
+                plugin.LOOP_LAG_MONITOR.max_lag = 0.0
+                asyncio.run(render(action, common.make_transcript(lines, seed=seed)))
+                stats = common.FakeGeminiClient.stats
+                # Without caches every segment is synthesized by exactly one unbroken stream
+                rows.append(
+                    (
+                        clock.seconds[-1],
+                        stats.streams - stats.breaks,
+                        stats.streams,
+                        stats.breaks,
+                        plugin.LOOP_LAG_MONITOR.max_lag * 1000,
+                    )
+                )
+
+            print(
+                f"{lines:>6}  {mode:<10}"
+                + "".join(f"{statistics.median(row[column] for row in rows):>{width}.{digits}f}"
+                          for column, width, digits in ((0, 11, 2), (1, 10, 1), (2, 9, 1), (3, 8, 1), (4, 10, 1)))
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark saving large podcast files to S3: one upload request against parallel parts.
+
+`_save_file` uploads WAV files of each size to a `FakeS3Storage`, whose requests take a
+round trip plus their payload at a per-connection bandwidth:
+  single     `upload_part_size_mb = 0`, Open WebUI's `S3StorageProvider.upload_file` path
+             (local copy, one request, contents read back)
+  multipart  `MultipartUploader` with `--part-size-mb` parts, `--concurrency` in flight
+
+Stored objects are compared with the input. With `--part-failure-rate` some part
+requests fail and are retried on their own; the retries column counts them.
+
+Usage:
+    python benchmarks/bench_upload.py [--sizes-mb 16 64 256] [--part-size-mb 16]
+        [--concurrency 4] [--request-latency 0.05] [--bandwidth 20]
+        [--part-failure-rate 0] [--repeat 3]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import common
+
+BLOCK = os.urandom(1024 * 1024)
+
+
+def make_file(size_mb: int):
+    file = tempfile.TemporaryFile()
+    for _ in range(size_mb):
+        file.write(BLOCK)
+    file.seek(0)
+    return file
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--part-size-mb", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=4, help="Parts uploaded at the same time")
+    parser.add_argument("--request-latency", type=float, default=0.05, help="Seconds of round trip per request")
+    parser.add_argument("--bandwidth", type=float, default=20.0, help="MB/s of a single connection")
+    parser.add_argument("--part-failure-rate", type=float, default=0.0, help="Probability a part request fails")
+    parser.add_argument("--repeat", type=int, default=3, help="Uploads per size and mode, the median is reported")
+    args = parser.parse_args()
+
+    plugin = common.load_plugin()
+    common.install_fakes(plugin)
+    upload_dir = tempfile.mkdtemp(prefix="podcast_it_uploads_")
+    action = plugin.Action()
+    action.valves.max_concurrent_upload_parts = args.concurrency
+
+    print(f"{'MB':>6}  {'mode':<10}{'seconds':>9}{'MB/s':>8}{'requests':>10}{'retries':>9}{'peak MB':>9}")
+    for size_mb in args.sizes_mb:
+        for mode, part_size_mb in (("single", 0), ("multipart", args.part_size_mb)):
+            action.valves.upload_part_size_mb = part_size_mb
+            config = common.FakeObjectStoreConfig(
+                request_latency=args.request_latency,
+                bandwidth_mb_per_second=args.bandwidth,
+                part_failure_rate=args.part_failure_rate if part_size_mb else 0.0,
+            )
+            client = common.FakeS3Client(config)
+            plugin.Storage = common.FakeS3Storage(client, upload_dir)
+
+            timings = []
+            peak = 0
+            for _ in range(args.repeat):
+                with make_file(size_mb) as file:
+                    tracemalloc.start()
+                    start = time.perf_counter()
+                    saved = action._save_file(file, "bench-user", f"bench_{size_mb}", records=[])
+                    timings.append(time.perf_counter() - start)
+                    peak = max(peak, tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+
+                    file.seek(0)
+                    key = next(key for bucket, key in client.objects if key.startswith(saved.id))
+                    with open(client.objects[(plugin.Storage.bucket_name, key)], "rb") as stored:
+                        same = stored.read() == file.read()
+                    client.delete_object(Bucket=plugin.Storage.bucket_name, Key=key)
+                    if not same:
+                        raise SystemExit(f"Stored object differs from the input ({mode}, {size_mb} MB)")
+                for name in os.listdir(upload_dir):
+                    os.remove(os.path.join(upload_dir, name))
+
+            seconds = statistics.median(timings)
+            requests = (sum(client.requests.values()) - client.requests["delete_object"]) / args.repeat
+            retries = client.failed_parts / args.repeat
+            print(
+                f"{size_mb:>6}  {mode:<10}{seconds:>9.2f}{size_mb / seconds:>8.1f}{requests:>10.1f}"
+                f"{retries:>9.1f}{peak / 1e6:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
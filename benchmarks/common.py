@@ -0,0 +1,408 @@
+"""
+Shared helpers for the Podcast It! benchmarks.
+
+`load_plugin()` imports `main.py` outside of Open WebUI: when the `open_webui` package is
+not installed, minimal in-memory stand-ins for `Files` and `Storage` are registered first.
+`install_fakes()` swaps the plugin's `Files`, `Storage` and Gemini client for in-memory
+fakes with configurable latency, so whole renders run offline. `FakeS3Storage` over a
+`FakeS3Client` stands in for S3 storage, with per-request latency, per-connection
+bandwidth and failing upload parts.
+`speech_like_pcm()` synthesizes deterministic 16-bit PCM with speech-like structure
+(voiced harmonics under formant envelopes, syllable rhythm, pauses and breath noise),
+so codec benchmarks see realistic compressibility instead of pure tones or silence.
+"""
+
+import importlib
+import importlib.util
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+import zlib
+
+import numpy as np
+from pydantic import BaseModel
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE = 24000
+PCM_MIME_TYPE = f"audio/L16;codec=pcm;rate={SAMPLE_RATE}"
+STYLE = "Read aloud in a warm, welcoming tone\nKeep the pace relaxed"
+
+
+class FileForm(BaseModel):
+    id: str
+    hash: str | None = None
+    filename: str
+    path: str
+    data: dict = {}
+    meta: dict = {}
+    access_control: dict | None = None
+
+
+class FileModel(FileForm):
+    user_id: str
+
+
+class InMemoryFiles:
+    """`Files` table stand-in keeping rows in a dict, with an optional per-call latency."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.files: dict[str, FileModel] = {}
+        self.calls: dict[str, int] = {"insert_new_file": 0, "get_file_by_id": 0, "delete_file_by_id": 0}
+
+    def insert_new_file(self, user_id: str, form_data) -> FileModel:
+        self.calls["insert_new_file"] += 1
+        time.sleep(self.latency)
+        file = FileModel(user_id=user_id, **form_data.model_dump())
+        self.files[file.id] = file
+        return file
+
+    def get_file_by_id(self, id: str) -> FileModel | None:
+        self.calls["get_file_by_id"] += 1
+        time.sleep(self.latency)
+        return self.files.get(id)
+
+    def delete_file_by_id(self, id: str) -> bool:
+        self.calls["delete_file_by_id"] += 1
+        time.sleep(self.latency)
+        return self.files.pop(id, None) is not None
+
+
+class InMemoryStorage:
+    """`Storage` provider stand-in keeping uploaded objects in a dict, with an optional per-call latency."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.objects: dict[str, bytes] = {}
+
+    def upload_file(self, file, filename: str, tags: dict) -> tuple[bytes, str]:
+        time.sleep(self.latency)
+        contents = file.read()
+        self.objects[filename] = contents
+        return contents, f"memory://{filename}"
+
+    def delete_file(self, file_path: str) -> None:
+        self.objects.pop(file_path.removeprefix("memory://"), None)
+
+
+class FakeObjectStoreConfig(BaseModel):
+    """Behaviour of `FakeS3Client` requests."""
+
+    request_latency: float = 0.05  # Seconds of round trip per request
+    bandwidth_mb_per_second: float = 20.0  # Throughput of a single connection
+    part_failure_rate: float = 0.0  # Probability an `upload_part` request fails
+    seed: int = 0
+
+
+class FakeS3Client:
+    """
+    Local object store with the boto3 S3 client calls Open WebUI and the plugin use.
+
+    Every request sleeps for a round trip plus its payload at the per-connection
+    bandwidth, so parallel requests finish sooner than one large one, as on real
+    object storage. Objects and uploaded parts are files in a temporary directory,
+    so the store itself doesn't add to the memory of the process under test.
+    """
+
+    def __init__(self, config: FakeObjectStoreConfig | None = None) -> None:
+        self.config = config or FakeObjectStoreConfig()
+        self.rng = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+        self.directory = tempfile.mkdtemp(prefix="podcast_it_objects_")
+        self.objects: dict[tuple[str, str], str] = {}  # (bucket, key) -> path of the object
+        self.uploads: dict[str, dict[int, str]] = {}  # upload ID -> part number -> path of the part
+        self.requests: dict[str, int] = {}
+        self.failed_parts = 0
+
+    def _store(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def _request(self, name: str, size: int = 0) -> None:
+        with self.lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+        time.sleep(self.config.request_latency + size / (self.config.bandwidth_mb_per_second * 1e6))
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str) -> None:
+        self._request("upload_file", os.path.getsize(Filename))
+        path = os.path.join(self.directory, Key.replace("/", "_"))
+        shutil.copyfile(Filename, path)
+        self.objects[(Bucket, Key)] = path
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **kwargs) -> dict:
+        self._request("create_multipart_upload")
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes) -> dict:
+        self._request("upload_part", len(Body))
+        with self.lock:
+            fail = self.rng.random() < self.config.part_failure_rate
+        if fail:
+            with self.lock:
+                self.failed_parts += 1
+            raise ConnectionError(f"fake connection reset during part {PartNumber}")
+        self.uploads[UploadId][PartNumber] = self._store(f"{UploadId}.{PartNumber}", Body)
+        return {"ETag": f'"{zlib.crc32(Body):08x}"'}
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: dict) -> dict:
+        self._request("complete_multipart_upload")
+        parts = self.uploads.pop(UploadId)
+        path = os.path.join(self.directory, Key.replace("/", "_"))
+        with open(path, "wb") as out:
+            for part in MultipartUpload["Parts"]:
+                with open(parts[part["PartNumber"]], "rb") as f:
+                    shutil.copyfileobj(f, out)
+        for part_path in parts.values():
+            os.remove(part_path)
+        self.objects[(Bucket, Key)] = path
+        return {}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str) -> dict:
+        self._request("abort_multipart_upload")
+        for part_path in self.uploads.pop(UploadId, {}).values():
+            os.remove(part_path)
+        return {}
+
+    def delete_object(self, Bucket: str, Key: str) -> dict:
+        self._request("delete_object")
+        path = self.objects.pop((Bucket, Key), None)
+        if path:
+            os.remove(path)
+        return {}
+
+
+class FakeS3Storage:
+    """
+    `S3StorageProvider` stand-in over a `FakeS3Client`.
+
+    `upload_file` does what Open WebUI's does: write the whole file to the local upload
+    directory, upload it from there in one request and return the contents read back.
+    """
+
+    def __init__(self, client: FakeS3Client, upload_dir: str, bucket_name: str = "podcasts") -> None:
+        self.s3_client = client
+        self.bucket_name = bucket_name
+        self.key_prefix = ""
+        self.upload_dir = upload_dir
+
+    def upload_file(self, file, filename: str, tags: dict) -> tuple[bytes, str]:
+        file_path = os.path.join(self.upload_dir, filename)
+        with open(file_path, "wb") as f:
+            f.write(file.read())
+        s3_key = os.path.join(self.key_prefix, filename)
+        self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
+        with open(file_path, "rb") as f:
+            return f.read(), f"s3://{self.bucket_name}/{s3_key}"
+
+    def delete_file(self, file_path: str) -> None:
+        self.s3_client.delete_object(Bucket=self.bucket_name, Key=file_path.split("/", 3)[-1])
+
+
+def install_open_webui_standins() -> None:
+    """Register in-memory `open_webui.models.files` / `open_webui.storage.provider` modules."""
+    if "open_webui" in sys.modules or importlib.util.find_spec("open_webui") is not None:
+        return
+
+    files_module = types.ModuleType("open_webui.models.files")
+    files_module.FileForm = FileForm
+    files_module.FileModel = FileModel
+    files_module.Files = InMemoryFiles()
+    provider_module = types.ModuleType("open_webui.storage.provider")
+    provider_module.Storage = InMemoryStorage()
+
+    for name in ("open_webui", "open_webui.models", "open_webui.storage"):
+        sys.modules[name] = types.ModuleType(name)
+    sys.modules["open_webui.models.files"] = files_module
+    sys.modules["open_webui.storage.provider"] = provider_module
+
+
+def load_plugin():
+    """Import the plugin module (`main.py`) from the repository root."""
+    install_open_webui_standins()
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    return importlib.import_module("main")
+
+
+def speech_like_pcm(seconds: float, seed: int = 0) -> bytes:
+    """
+    Synthesize deterministic speech-like mono 16-bit PCM at `SAMPLE_RATE`.
+
+    Args:
+        seconds: Duration of the audio.
+        seed: Random seed, the same seed always yields the same audio.
+
+    Returns:
+        bytes: Little-endian 16-bit PCM samples.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+
+    # Pitch contour wandering between ~100 and ~220 Hz
+    f0 = 160 + 60 * np.sin(2 * np.pi * 0.3 * t + rng.uniform(0, np.pi)) + 10 * np.sin(2 * np.pi * 2.1 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+
+    # Harmonics weighted by two slowly moving formants
+    voiced = np.zeros(n)
+    formant_1 = 700 + 300 * np.sin(2 * np.pi * 1.7 * t)
+    formant_2 = 1800 + 500 * np.sin(2 * np.pi * 1.1 * t + 1.0)
+    for harmonic in range(1, 16):
+        frequency = harmonic * f0
+        weight = np.exp(-((frequency - formant_1) / 250) ** 2) + 0.5 * np.exp(-((frequency - formant_2) / 350) ** 2)
+        voiced += weight * np.sin(harmonic * phase) / harmonic**0.5
+
+    # ~4 syllables per second, phrases of ~2.5 s separated by ~0.4 s pauses
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t + rng.uniform(0, np.pi)), 0, None) ** 0.7
+    phrases = ((t % 2.9) < 2.5).astype(float)
+    envelope = syllables * phrases
+
+    breath = rng.normal(0, 0.02, n)
+    signal = envelope * voiced / np.max(np.abs(voiced)) * 0.6 + breath
+    return (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def make_transcript(lines: int, seed: int = 0) -> str:
+    """Build a transcript with `lines` speaker lines plus some blank and CRLF lines."""
+    rng = random.Random(seed)
+    words = "the a podcast audio voice speaker segment render today really about signal".split()
+    out = [STYLE, ""]
+    for i in range(lines):
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(4, 24)))
+        ending = "\r" if i % 7 == 0 else ""
+        out.append(f"Speaker {i % 2 + 1}: {sentence.capitalize()}.{ending}")
+        if i % 11 == 0:
+            out.append("  ")
+    return "\n".join(out)
+
+
+class FakeGeminiConfig(BaseModel):
+    """Behaviour of `FakeGeminiClient` streams."""
+
+    first_chunk_latency: float = 0.5  # Seconds before the first chunk of a stream
+    realtime_factor: float = 20.0  # Seconds of audio streamed per second of wall time
+    chunk_seconds: float = 1.0  # Audio per streamed chunk
+    seconds_per_char: float = 0.06  # Audio produced per transcript character
+    failure_rate: float = 0.0  # Probability a stream fails with a 429 before its first chunk
+    break_rate_per_char: float = 0.0  # Per transcript character, probability a stream breaks off halfway
+    seed: int = 0
+
+
+class FakeGeminiStats:
+    """Per-process counters and timings recorded by `FakeGeminiClient` streams."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.streams = 0
+        self.failures = 0
+        self.breaks = 0
+        self.chunks = 0
+        self.bytes = 0
+        self.first_chunk_at: list[float] = []  # perf_counter() of each stream's first chunk
+        self.last_chunk_at = 0.0  # perf_counter() of the latest chunk of any stream
+
+    def reset(self) -> None:
+        self.__init__()
+
+
+class FakeModels:
+    def __init__(self, config: FakeGeminiConfig, stats: FakeGeminiStats, rng: random.Random) -> None:
+        self.config = config
+        self.stats = stats
+        self.rng = rng
+
+    def generate_content_stream(self, model: str, contents, config):
+        from google.genai import types as genai_types
+
+        text = contents[0].parts[0].text
+        with self.stats.lock:
+            self.stats.streams += 1
+            fail = self.rng.random() < self.config.failure_rate
+            if fail:
+                self.stats.failures += 1
+            breaks = self.rng.random() < 1 - (1 - self.config.break_rate_per_char) ** len(text)
+            if breaks:
+                self.stats.breaks += 1
+        time.sleep(self.config.first_chunk_latency)
+        if fail:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED: fake quota exceeded")
+
+        total_seconds = len(text) * self.config.seconds_per_char
+        pcm = speech_like_pcm(min(self.config.chunk_seconds, total_seconds) or 0.01)
+        sent = 0.0
+        first = True
+        while sent < total_seconds:
+            if breaks and sent >= total_seconds / 2:
+                raise RuntimeError("500 INTERNAL: fake stream reset")
+            seconds = min(self.config.chunk_seconds, total_seconds - sent)
+            data = pcm[: int(seconds * SAMPLE_RATE) * 2]
+            if not first:
+                time.sleep(seconds / self.config.realtime_factor)
+            with self.stats.lock:
+                if first:
+                    self.stats.first_chunk_at.append(time.perf_counter())
+                self.stats.chunks += 1
+                self.stats.bytes += len(data)
+                self.stats.last_chunk_at = time.perf_counter()
+            first = False
+            sent += seconds
+            yield genai_types.GenerateContentResponse(
+                candidates=[
+                    genai_types.Candidate(
+                        content=genai_types.Content(
+                            role="model",
+                            parts=[genai_types.Part(inline_data=genai_types.Blob(data=data, mime_type=PCM_MIME_TYPE))],
+                        )
+                    )
+                ]
+            )
+
+
+class FakeGeminiClient:
+    """`genai.Client` stand-in whose `models.generate_content_stream` streams synthetic PCM."""
+
+    config = FakeGeminiConfig()
+    stats = FakeGeminiStats()
+
+    def __init__(self, api_key: str | None = None, **kwargs) -> None:
+        self.models = FakeModels(self.config, self.stats, random.Random(self.config.seed))
+
+
+def install_fakes(
+    plugin,
+    gemini: FakeGeminiConfig | None = None,
+    storage_latency: float = 0.0,
+    db_latency: float = 0.0,
+) -> tuple[InMemoryStorage, InMemoryFiles]:
+    """
+    Point the plugin at in-memory `Storage`/`Files` and the fake Gemini client.
+
+    Args:
+        plugin: Module returned by `load_plugin()`.
+        gemini: Stream behaviour, defaults to `FakeGeminiConfig()`.
+        storage_latency: Seconds added to every `Storage.upload_file` call.
+        db_latency: Seconds added to every `Files` call.
+
+    Returns:
+        tuple[InMemoryStorage, InMemoryFiles]: The installed stand-ins.
+    """
+    storage = InMemoryStorage(storage_latency)
+    files = InMemoryFiles(db_latency)
+    plugin.Storage = storage
+    plugin.Files = files
+    FakeGeminiClient.config = gemini or FakeGeminiConfig()
+    FakeGeminiClient.stats.reset()
+    from google import genai
+
+    genai.Client = FakeGeminiClient
+    plugin.GEMINI_RUNTIME.invalidate()
+    return storage, files
@@ -14,23 +14,42 @@ description:
 """
 # requirements: google-genai
 
+import array
 import asyncio
+import atexit
 import concurrent.futures
+import contextlib
+import functools
+import hashlib
+import heapq
+import importlib.util
 import io
+import json
 import logging
+import math
 import mimetypes
+import os
+import random
 import re
+import shutil
+import socket
 import struct
+import sys
+import tempfile
+import threading
 import time
+import urllib.parse
 import uuid
+import zlib
+from collections import OrderedDict
+from typing import BinaryIO, Callable, Coroutine, Iterable, NamedTuple
 
 # from typing import Any, Optional
-from google import genai
-from google.genai import types
 from pydantic import BaseModel, Field
 
-from open_webui.models.files import FileForm, Files
-from open_webui.storage.provider import Storage
+# The Gemini SDK and Open WebUI's file layers are imported on first use (see
+# `import_open_webui()` and `warm_up()`), so loading the plugin stays fast
+FileForm = Files = Storage = None
 
 log = logging.getLogger(__name__)
 
@@ -97,8 +116,82 @@ SPEAKERS = {
 
 DEFAULT_GEMINI_API_KEY_PLACEHOLDER = "REPLACE WITH YOUR GEMINI API KEY!!!"
 
+# Podcast audio output formats. Compressed formats are encoded with libsndfile
+# ("format"/"subtype") through the optional `soundfile` package.
+OUTPUT_FORMATS = {
+    "WAV": {"extension": ".wav", "mime": "audio/wav"},
+    "FLAC (lossless)": {"extension": ".flac", "mime": "audio/flac", "format": "FLAC", "subtype": "PCM_16"},
+    "Opus (lossy)": {"extension": ".ogg", "mime": "audio/ogg", "format": "OGG", "subtype": "OPUS"},
+    "MP3 (lossy)": {"extension": ".mp3", "mime": "audio/mpeg", "format": "MP3", "subtype": "MPEG_LAYER_III"},
+}
+
+# Streaming pipeline limits: chunks buffered between the Gemini thread and the event
+# loop, and between the event loop and the render's encoder thread (audio kept in memory
+# beyond that is bounded by the `audio_memory_budget_mb` valve)
+STREAM_QUEUE_MAX_CHUNKS = 4
+ENCODE_QUEUE_MAX_CHUNKS = 16
+
+# Threads running blocking Gemini streams, shared by all renders in the process
+GEMINI_EXECUTOR_MAX_WORKERS = 32
+
+# Threads running blocking storage uploads and database calls, shared by all renders
+IO_EXECUTOR_MAX_WORKERS = 8
+
+# Threads stitching and encoding audio (CPU-bound), shared by all renders
+ENCODE_EXECUTOR_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# How often the event loop lag is sampled while podcasts are generated, in seconds
+LOOP_LAG_SAMPLE_INTERVAL = 0.1
+
+# Minimum seconds between two progress statuses of the same podcast
+PROGRESS_STATUS_INTERVAL = 5.0
+
+# Local working directory for caches, inside Open WebUI's data directory when available
+PODCAST_IT_DATA_DIR = os.path.join(
+    os.environ.get("DATA_DIR", tempfile.gettempdir()), "cache", "podcast_it"
+)
+
+# Checkpoints of renders that were never completed are removed after this long
+CHECKPOINT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+# A detached job of another process that hasn't reported a status for this long is
+# considered interrupted (its statuses normally arrive every few seconds)
+JOB_HEARTBEAT_TIMEOUT = 5 * 60
+
+# With progressive playback the first segment is kept this short, so the first part
+# is published within seconds
+PROGRESSIVE_FIRST_SEGMENT_MAX_CHARS = 400
+
+# Measured request latency and failure rate per TTS model, used to size segments
+SEGMENT_TIMING_FILE = os.path.join(PODCAST_IT_DATA_DIR, "segment_timing.json")
+
+# Smallest segment the adaptive planner considers, in characters
+ADAPTIVE_SEGMENT_MIN_CHARS = 250
+
+# Adaptive sizing re-plans the segments not started yet once the expected time of a
+# segment at the current size limit moved by this fraction, at most every this many
+# seconds, and no sooner than this many times as long as the previous re-plan took
+ADAPTIVE_REPLAN_MIN_CHANGE = 0.1
+ADAPTIVE_REPLAN_MIN_INTERVAL_SECONDS = 5.0
+ADAPTIVE_REPLAN_INTERVAL_COST_FACTOR = 20
+
+# Prometheus text exposition written by the "Prometheus" metrics sink
+METRICS_TEXTFILE = os.path.join(PODCAST_IT_DATA_DIR, "metrics.prom")
+
+# Log line format of the batch renderer, which runs several worker processes
+BATCH_LOG_FORMAT = "%(asctime)s %(processName)s %(levelname)s %(message)s"
 
-def document_content_template(file_content_url: str, filename: str) -> str:
+# Valves a batch item may override, with their allowed values
+BATCH_ITEM_OVERRIDES = {
+    "speaker_1": SPEAKERS,
+    "speaker_2": SPEAKERS,
+    "podcast_output_language": LANGUAGES,
+}
+
+
+def document_content_template(
+    file_content_url: str, filename: str, content_type: str = "audio/wav"
+) -> str:
     """
     Generates an HTML template string for embedding a podcast audio player with a download link.
 
@@ -108,6 +201,7 @@ def document_content_template(file_content_url: str, filename: str) -> str:
     Args:
         file_content_url (str): The URL to the audio file content.
         filename (str): The filename to use for the download link.
+        content_type (str): MIME type of the audio file, used as the `<source>` type.
 
     Returns:
         str: An HTML string containing the styled audio player and download link.
@@ -184,188 +278,3021 @@ def document_content_template(file_content_url: str, filename: str) -> str:
         </a>
     </div>
     <audio controls class="podcast-audio">
-        <source src="{file_content_url}" type="audio/wav">
+        <source src="{file_content_url}" type="{content_type}">
         Your browser does not support the audio element.
     </audio>
 </div>
 """
 
 
-class Action:
-    class Valves(BaseModel):
-        # fmt: off
-        API_KEY: str = Field(default=DEFAULT_GEMINI_API_KEY_PLACEHOLDER, description="Your Gemini API Key")
-        # fmt:on
-        tts_model: str = "gemini-2.5-flash-preview-tts"
-        custom_style_instructions: str = "Read aloud in a warm, welcoming tone"
-        speaker_1: str = Field(
-            default="Zephyr (Female)",
-            description="Select the voice for Speaker 1",
-            json_schema_extra={"enum": list(SPEAKERS.keys())},
+# One transcript line per match: surrounding whitespace is skipped, "line" is the stripped
+# line and "text" the dialogue after an optional "Speaker N:" prefix. Whitespace classes
+# exclude "\n" so a match never runs into the next line.
+TRANSCRIPT_LINE_PATTERN = re.compile(
+    r"[^\S\n]*(?P<line>(?:Speaker (?P<speaker>[12]):[^\S\n]*)?(?P<text>(?:\S(?:[^\n]*\S)?)?))[^\S\n]*(?:\n|\Z)"
+)
+
+TRANSCRIPT_LEADING_SPACE_PATTERN = re.compile(r"\s*")
+
+
+class ParsedTranscript:
+    """
+    Compact result of `parse_transcript`.
+
+    Dialogues are kept as speaker numbers and (start, end) offsets into the original
+    transcript instead of one dict of copied substrings per line, so a long transcript
+    costs a few bytes per line. Item access (`parsed["dialogues"]`, ...) and `to_dict()`
+    return exactly the dictionary `_validate_transcript_format` has always returned.
+    """
+
+    __slots__ = (
+        "text",
+        "valid",
+        "error",
+        "warning",
+        "style",
+        "has_style",
+        "speaker_1_count",
+        "speaker_2_count",
+        "_speakers",
+        "_starts",
+        "_ends",
+    )
+
+    FIELDS = (
+        "valid",
+        "error",
+        "warning",
+        "style",
+        "dialogues",
+        "has_style",
+        "speaker_1_count",
+        "speaker_2_count",
+    )
+
+    def __init__(self, text: str):
+        self.text = text
+        self.valid = False
+        self.error: str | None = None
+        self.warning: str | None = None
+        self.style = ""
+        self.has_style = False
+        self.speaker_1_count = 0
+        self.speaker_2_count = 0
+        self._speakers = array.array("B")
+        self._starts = array.array("q")
+        self._ends = array.array("q")
+
+    def __len__(self) -> int:
+        """Number of dialogues, 0 when the transcript is invalid."""
+        return len(self._speakers) if self.valid else 0
+
+    def iter_dialogues(self):
+        """
+        Yield the dialogues as ("1"|"2", text) pairs without building the dict list.
+
+        Yields:
+            tuple[str, str]: Speaker number and dialogue text, in transcript order.
+        """
+        if not self.valid:
+            return
+        text = self.text
+        for speaker, start, end in zip(self._speakers, self._starts, self._ends):
+            yield ("1" if speaker == 1 else "2"), text[start:end]
+
+    @property
+    def dialogues(self) -> list[dict]:
+        """Parsed dialogues as [{"speaker": "1"|"2", "text": str}, ...]."""
+        return [{"speaker": speaker, "text": text} for speaker, text in self.iter_dialogues()]
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self.FIELDS else default
+
+    def to_dict(self) -> dict:
+        """Return the result as the plain dictionary documented on `_validate_transcript_format`."""
+        return {key: self[key] for key in self.FIELDS}
+
+
+def parse_transcript(text: str, default_style: str) -> ParsedTranscript:
+    """
+    Validate and parse a transcript in a single pass.
+
+    See `Action._validate_transcript_format` for the format and the checks. Lines are
+    numbered after stripping the transcript, and the last unexpected line after the
+    first speaker line is reported as a warning.
+
+    Args:
+        text: The raw transcript text.
+        default_style: Style instructions used when the transcript has none.
+
+    Returns:
+        ParsedTranscript: The parse result, with `valid` and `error` set.
+    """
+    result = ParsedTranscript(text or "")
+
+    # Bounds of the stripped transcript, found without copying it
+    start = TRANSCRIPT_LEADING_SPACE_PATTERN.match(text).end() if text else 0
+    end = len(result.text)
+    while end > start and result.text[end - 1].isspace():
+        end -= 1
+
+    # Check for empty input
+    if start == end:
+        log.warning("Transcript is empty")
+        result.error = "Transcript is empty"
+        return result
+
+    speakers = result._speakers
+    add_speaker = speakers.append
+    add_start = result._starts.append
+    add_end = result._ends.append
+    style_lines: list[str] = []
+    unexpected = None  # (line number, stripped line) of the last malformed line
+
+    for line_num, match in enumerate(TRANSCRIPT_LINE_PATTERN.finditer(text, start, end), 1):
+        speaker = match.group("speaker")
+        text_start, text_end = match.span("text")
+        if speaker and text_end > text_start:
+            add_speaker(1 if speaker == "1" else 2)
+            add_start(text_start)
+            add_end(text_end)
+        elif not speaker and text_end == text_start:
+            # Skip empty lines
+            continue
+        elif not speakers:
+            # Before first speaker = style instructions
+            style_lines.append(match.group("line").rstrip())
+        else:
+            # After speakers = malformed
+            unexpected = (line_num, match.group("line").rstrip())
+
+    if unexpected:
+        result.warning = (
+            f"Line {unexpected[0]}: Unexpected text after speakers started: '{unexpected[1][:50]}...'"
         )
-        speaker_2: str = Field(
-            default="Puck (Male)",
-            description="Select the voice for Speaker 2",
-            json_schema_extra={"enum": list(SPEAKERS.keys())},
+
+    # Count speakers
+    dialogue_count = len(speakers)
+    result.speaker_1_count = speakers.count(1)
+    result.speaker_2_count = dialogue_count - result.speaker_1_count
+
+    # Validation checks
+    if dialogue_count == 0:
+        result.error = (
+            "No speaker dialogues found. Expected format:\nSpeaker 1: text\nSpeaker 2: text"
         )
-        podcast_output_language: str = Field(
-            default="English (United States)",
-            description="Select the output language for the podcast. (Only GA languages are listed)",
-            json_schema_extra={"enum": list(LANGUAGES.keys())},
+        return result
+
+    if dialogue_count < 2:
+        result.error = (
+            f"Need at least 2 speaker lines for a conversation, found only {dialogue_count}"
         )
-        save_transcript: str = Field(
-            default="Yes",
-            description="Whether to save the processed Podcast transcript or not",
-            json_schema_extra={"enum": ["Yes", "No"]},
+        return result
+
+    if result.speaker_1_count == 0:
+        result.error = "Missing Speaker 1 lines"
+        return result
+
+    if result.speaker_2_count == 0:
+        result.error = "Missing Speaker 2 lines"
+        return result
+
+    # Style instructions check
+    if style_lines:
+        result.has_style = True
+        result.style = "\n".join(style_lines)
+    else:
+        result.warning = (
+            "No style instructions found. Using default style from settings. Consider adding tone/style guidance before speaker lines to customize the tone of the conversation"
         )
+        result.has_style = False  # No user-provided style, using default
+        result.style = default_style
 
-    def __init__(self) -> None:
-        """Initialize the Action class with default Valves configuration."""
-        self.valves = self.Valves()
+    # and the success
+    result.valid = True
+
+    log.info(
+        "Transcript validation successful - Speaker 1: %d lines, Speaker 2: %d lines, Total dialogues: %d",
+        result.speaker_1_count,
+        result.speaker_2_count,
+        dialogue_count,
+    )
+    log.debug("Has custom style: %s", result.has_style)
+
+    return result
+
+
+def build_wav_header(data_size: int, bits_per_sample: int, sample_rate: int) -> bytes:
+    """
+    Build a 44-byte mono PCM WAV/RIFF header for a payload of `data_size` bytes.
+
+    Format specification: http://soundfile.sapp.org/doc/WaveFormat/
+
+    Args:
+        data_size: Size of the PCM payload in bytes.
+        bits_per_sample: Sample width in bits (e.g., 16).
+        sample_rate: Sample rate in Hz (e.g., 24000).
+
+    Returns:
+        bytes: The WAV header.
+    """
+    num_channels = 1
+    bytes_per_sample = bits_per_sample // 8
+    block_align = num_channels * bytes_per_sample
+    byte_rate = sample_rate * block_align
+    chunk_size = 36 + data_size  # 36 bytes for header fields before data chunk size
+
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",  # ChunkID
+        chunk_size,  # ChunkSize (total file size - 8 bytes)
+        b"WAVE",  # Format
+        b"fmt ",  # Subchunk1ID
+        16,  # Subchunk1Size (16 for PCM)
+        1,  # AudioFormat (1 for PCM)
+        num_channels,  # NumChannels
+        sample_rate,  # SampleRate
+        byte_rate,  # ByteRate
+        block_align,  # BlockAlign
+        bits_per_sample,  # BitsPerSample
+        b"data",  # Subchunk2ID
+        data_size,  # Subchunk2Size (size of audio data)
+    )
+
+
+class WavAssembler:
+    """
+    Incrementally assemble a single PCM WAV file from chunks of unknown total size.
+
+    A header with zero sizes is written up front, PCM chunks are appended as they
+    arrive (bytes and memoryviews are written as-is, never concatenated) and the RIFF
+    and data chunk sizes are patched in place by `finalize`.
+    """
 
-    def _validate_transcript_format(self, text: str) -> dict:
+    RIFF_SIZE_OFFSET = 4
+    DATA_SIZE_OFFSET = 40
+
+    def __init__(self, file: BinaryIO, mime_type: str, bits_per_sample: int, sample_rate: int) -> None:
         """
-        Validate and parse transcript format with detailed feedback.
+        Args:
+            file: Seekable binary file the WAV is written to, positioned at its start.
+            mime_type: MIME type of the PCM being assembled; later chunks must match.
+            bits_per_sample: Sample width in bits.
+            sample_rate: Sample rate in Hz.
+        """
+        self.file = file
+        self.mime_type = mime_type
+        self.data_size = 0
+        self.file.write(build_wav_header(0, bits_per_sample, sample_rate))
+
+    def write(self, data: bytes | memoryview, mime_type: str) -> None:
+        """Append a PCM chunk, rejecting chunks whose format differs from the first one."""
+        if mime_type != self.mime_type:
+            raise ValueError(
+                f"Cannot stitch audio with different formats: {self.mime_type} and {mime_type}"
+            )
+        self.data_size += self.file.write(data)
 
-        Parses the transcript to ensure it follows the required format for podcast generation.
-        Validates speaker line formatting, counts speaker occurrences, and extracts style
-        instructions if present. Falls back to default style instructions when none provided.
+    def finalize(self) -> int:
+        """
+        Patch the final sizes into the header and rewind the file.
 
-        Expected format:
-            {Style instructions} (optional)
-            Speaker 1: dialogue
-            Speaker 2: dialogue
-            ...
+        Returns:
+            int: Total WAV file size in bytes (header + PCM).
+        """
+        self.file.seek(self.RIFF_SIZE_OFFSET)
+        self.file.write(struct.pack("<I", 36 + self.data_size))
+        self.file.seek(self.DATA_SIZE_OFFSET)
+        self.file.write(struct.pack("<I", self.data_size))
+        self.file.seek(0)
+        return 44 + self.data_size
 
+
+class SoundFileEncoder:
+    """
+    Streaming compressed encoder stage (FLAC, Ogg/Opus, MP3) backed by libsndfile.
+
+    Uses the optional `soundfile` package, which Open WebUI ships with. PCM chunks are
+    encoded as they arrive, so the uncompressed podcast never exists as a whole.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        mime_type: str,
+        bits_per_sample: int,
+        sample_rate: int,
+        format: str,
+        subtype: str,
+    ) -> None:
+        """
         Args:
-            text: The raw transcript text to validate and parse.
+            file: Seekable binary file the encoded audio is written to.
+            mime_type: MIME type of the incoming PCM; later chunks must match.
+            bits_per_sample: Sample width in bits, only 16-bit PCM is supported.
+            sample_rate: Sample rate in Hz.
+            format: libsndfile container format (e.g., "FLAC", "OGG", "MP3").
+            subtype: libsndfile subtype (e.g., "PCM_16", "OPUS", "MPEG_LAYER_III").
+
+        Raises:
+            ImportError: If `soundfile` is not installed.
+            ValueError: If the PCM is not 16-bit.
+        """
+        import soundfile
+
+        if bits_per_sample != 16:
+            raise ValueError(f"Compressed output needs 16-bit PCM, got {bits_per_sample}-bit")
+
+        self.file = file
+        self.mime_type = mime_type
+        # Odd trailing byte of a chunk, completed by the next one
+        self._carry = b""
+        self.sound_file = soundfile.SoundFile(
+            file,
+            mode="w",
+            samplerate=sample_rate,
+            channels=1,
+            format=format,
+            subtype=subtype,
+        )
+
+    def write(self, data: bytes | memoryview, mime_type: str) -> None:
+        """Encode a PCM chunk, rejecting chunks whose format differs from the first one."""
+        if mime_type != self.mime_type:
+            raise ValueError(
+                f"Cannot stitch audio with different formats: {self.mime_type} and {mime_type}"
+            )
+        if self._carry:
+            data = self._carry + bytes(data)
+            self._carry = b""
+        if len(data) % 2:
+            self._carry = bytes(data[-1:])
+            data = data[:-1]
+        if data:
+            self.sound_file.buffer_write(data, dtype="int16")
+
+    def finalize(self) -> int:
+        """
+        Flush the encoder and rewind the file.
 
         Returns:
-            dict: A dictionary containing validation results and parsed data:
-                {
-                    "valid": bool - Whether the transcript is valid
-                    "error": str | None - Error message if validation failed
-                    "warning": str | None - Warning message for non-critical issues
-                    "style": str - Style instructions (user-provided or default)
-                    "dialogues": list[dict] - Parsed speaker dialogues [{"speaker": "1"|"2", "text": str}, ...]
-                    "has_style": bool - Whether style instructions were found
-                    "speaker_1_count": int - Number of Speaker 1 lines
-                    "speaker_2_count": int - Number of Speaker 2 lines
-                }
+            int: Total encoded file size in bytes.
         """
-        log.debug("Starting transcript validation")
-        log.debug(f"Transcript length: {len(text) if text else 0} characters")
-
-        result = {
-            "valid": False,
-            "error": None,
-            "warning": None,
-            "style": "",
-            "dialogues": [],
-            "has_style": False,
-            "speaker_1_count": 0,
-            "speaker_2_count": 0,
+        self.sound_file.close()
+        size = self.file.seek(0, io.SEEK_END)
+        self.file.seek(0)
+        return size
+
+
+class PcmStitcher:
+    """
+    Streaming cleanup of 16-bit mono PCM in front of an encoder stage.
+
+    Segments are synthesized separately, so joined as-is they differ in loudness and
+    carry padded silences at their edges. Per segment this stage
+      - trims leading and trailing silence to at most `max_edge_silence` seconds
+        (pauses inside a segment are kept),
+      - matches its loudness to the first segment: the RMS of the non-silent frames
+        in its first `gain_analysis` seconds sets a gain, limited to `max_gain_db`,
+      - crossfades the join with the previous segment over `crossfade` seconds.
+
+    Everything works on 10 ms frames with NumPy, in blocks of at most one second,
+    so memory is bounded by the analysis window plus held silence (up to
+    `SILENCE_HOLD_SECONDS`), whatever the length of the podcast. Segment boundaries
+    are signalled with `end_segment`. Needs `numpy`.
+    """
+
+    FRAME_SECONDS = 0.01
+    BLOCK_SECONDS = 1.0
+    SILENCE_HOLD_SECONDS = 10.0
+
+    def __init__(
+        self,
+        encoder: "WavAssembler | SoundFileEncoder",
+        mime_type: str,
+        sample_rate: int,
+        silence_threshold_db: float = -50.0,
+        max_edge_silence: float = 0.3,
+        crossfade: float = 0.02,
+        gain_analysis: float = 3.0,
+        max_gain_db: float = 6.0,
+    ) -> None:
+        """
+        Args:
+            encoder: Stage the processed PCM is written to.
+            mime_type: MIME type of the incoming PCM; later chunks must match.
+            sample_rate: Sample rate in Hz.
+            silence_threshold_db: Frames with an RMS below this (dBFS) are silence.
+            max_edge_silence: Seconds of silence kept at the start and end of a segment.
+            crossfade: Length of the crossfade at segment joins, in seconds.
+            gain_analysis: Seconds at the start of a segment its loudness is measured on.
+            max_gain_db: Largest gain correction applied to a segment, either way.
+
+        Raises:
+            ImportError: If `numpy` is not installed.
+        """
+        import numpy
+
+        self.np = numpy
+        self.encoder = encoder
+        self.mime_type = mime_type
+        self.frame = max(1, int(sample_rate * self.FRAME_SECONDS))
+        self.block = self.frame * max(1, int(self.BLOCK_SECONDS / self.FRAME_SECONDS))
+        self.threshold = 32768.0 * 10 ** (silence_threshold_db / 20)
+        self.edge = int(sample_rate * max_edge_silence)
+        self.hold = max(self.edge, int(sample_rate * self.SILENCE_HOLD_SECONDS))
+        self.analysis = int(sample_rate * gain_analysis)
+        self.max_gain = 10 ** (max_gain_db / 20)
+        self.crossfade = int(sample_rate * crossfade)
+
+        self.reference_rms: float | None = None
+        self.input_samples = 0
+        self.output_samples = 0
+        self._carry = b""
+        # Output held back for the crossfade with the next segment
+        self._delay = numpy.zeros(0, dtype=numpy.float32)
+        self._tail: "numpy.ndarray | None" = None
+        self._start_segment()
+
+    def _start_segment(self) -> None:
+        np = self.np
+        self._silence: list = []  # Silent frames since the last sound
+        self._silence_samples = 0
+        self._sound_seen = False
+        self._analysis: list | None = []  # Audio kept until the gain is known
+        self._analysis_samples = 0
+        self._gain = 1.0
+        self._partial = np.zeros(0, dtype=np.float32)
+
+    def write(self, data: bytes | memoryview, mime_type: str) -> None:
+        """Process a PCM chunk, rejecting chunks whose format differs from the first one."""
+        if mime_type != self.mime_type:
+            raise ValueError(
+                f"Cannot stitch audio with different formats: {self.mime_type} and {mime_type}"
+            )
+        np = self.np
+        if self._carry:
+            data = self._carry + bytes(data)
+            self._carry = b""
+        if len(data) % 2:
+            self._carry = bytes(data[-1:])
+            data = data[:-1]
+        samples = np.frombuffer(data, dtype="<i2")
+        self.input_samples += len(samples)
+        for start in range(0, len(samples), self.block):
+            block = samples[start : start + self.block].astype(np.float32)
+            if len(self._partial):
+                block = np.concatenate((self._partial, block))
+            whole = len(block) - len(block) % self.frame
+            self._partial = block[whole:]
+            if whole:
+                self._frames(block[:whole])
+
+    def end_segment(self) -> None:
+        """Mark the end of a segment: trim its trailing silence and prepare the join."""
+        if len(self._partial):
+            self._frames(self._partial)
+        if self._silence and self._sound_seen:
+            trailing = self.np.concatenate(self._silence)
+            self._segment_output(trailing[: self.edge])
+        self._flush_analysis()
+        # The end of this segment is crossfaded with the start of the next one
+        if len(self._delay):
+            self._tail = self._delay
+            self._delay = self.np.zeros(0, dtype=self.np.float32)
+        self._start_segment()
+
+    def finalize(self) -> int:
+        """
+        Flush the last segment and finalize the encoder stage.
+
+        Returns:
+            int: Total output file size in bytes.
+        """
+        self.end_segment()
+        if self._tail is not None:
+            self._encode(self._tail)
+            self._tail = None
+        return self.encoder.finalize()
+
+    def _frames(self, samples) -> None:
+        """Route whole frames (or the last partial frame) through silence trimming."""
+        np = self.np
+        frames = len(samples) // self.frame
+        if frames:
+            energy = np.square(samples[: frames * self.frame]).reshape(frames, self.frame).mean(axis=1)
+            loud = np.flatnonzero(energy >= self.threshold**2)
+        else:
+            loud = np.flatnonzero(np.abs(samples) >= self.threshold)[:1]
+        if not len(loud):
+            self._hold_silence(samples)
+            return
+
+        first = loud[0] * self.frame if frames else 0
+        last = (loud[-1] + 1) * self.frame if frames else len(samples)
+        self._hold_silence(samples[:first])
+        if self._silence:
+            silence = np.concatenate(self._silence)
+            if not self._sound_seen:
+                # Leading silence is cut down to the edge, pauses between sounds are kept
+                silence = silence[max(0, len(silence) - self.edge) :]
+            self._segment_output(silence)
+            self._silence = []
+            self._silence_samples = 0
+        self._sound_seen = True
+        self._segment_output(samples[first:last])
+        self._hold_silence(samples[last:])
+
+    def _hold_silence(self, samples) -> None:
+        if not len(samples):
+            return
+        self._silence.append(samples)
+        self._silence_samples += len(samples)
+        if self._silence_samples > self.hold:
+            # A pause this long is kept apart from what the edges may need
+            silence = self.np.concatenate(self._silence)
+            excess = len(silence) - self.hold
+            if self._sound_seen:
+                self._segment_output(silence[:excess])
+            self._silence = [silence[excess:]]
+            self._silence_samples = self.hold
+
+    def _segment_output(self, samples) -> None:
+        if not len(samples):
+            return
+        if self._analysis is None:
+            self._output(samples * self._gain)
+            return
+        self._analysis.append(samples)
+        self._analysis_samples += len(samples)
+        if self._analysis_samples >= self.analysis:
+            self._flush_analysis()
+
+    def _flush_analysis(self) -> None:
+        """Set the segment gain from the analysed audio and release it."""
+        if self._analysis is None:
+            return
+        np = self.np
+        analysed = np.concatenate(self._analysis) if self._analysis else np.zeros(0, dtype=np.float32)
+        self._analysis = None
+        frames = len(analysed) // self.frame
+        if frames:
+            energy = np.square(analysed[: frames * self.frame]).reshape(frames, self.frame).mean(axis=1)
+            active = energy[energy >= self.threshold**2]
+            if len(active):
+                rms = float(np.sqrt(active.mean()))
+                if self.reference_rms is None:
+                    self.reference_rms = rms
+                else:
+                    self._gain = min(self.max_gain, max(1 / self.max_gain, self.reference_rms / rms))
+        if len(analysed):
+            self._output(analysed * self._gain)
+
+    def _output(self, samples) -> None:
+        """Crossfade with the previous segment's tail, holding back this segment's own tail."""
+        np = self.np
+        if self._tail is not None:
+            if len(samples) < len(self._tail):
+                # Too little audio for a full crossfade, join as-is
+                self._encode(self._tail)
+            else:
+                # Equal-power crossfade
+                fade = len(self._tail)
+                ramp = (np.arange(fade, dtype=np.float32) + 0.5) * (np.pi / 2 / fade)
+                head = samples[:fade] * np.sin(ramp) + self._tail * np.cos(ramp)
+                samples = np.concatenate((head, samples[fade:]))
+            self._tail = None
+        if self.crossfade:
+            samples = np.concatenate((self._delay, samples)) if len(self._delay) else samples
+            keep = min(len(samples), self.crossfade)
+            self._delay = samples[len(samples) - keep :]
+            samples = samples[: len(samples) - keep]
+        self._encode(samples)
+
+    def _encode(self, samples) -> None:
+        if not len(samples):
+            return
+        pcm = self.np.clip(self.np.rint(samples), -32768, 32767).astype("<i2")
+        self.output_samples += len(pcm)
+        self.encoder.write(pcm.tobytes(), self.mime_type)
+
+
+class AudioMemoryBudget:
+    """
+    Bytes of audio one render may keep in memory before its buffers spill to disk.
+
+    Spools created by `spool()` count their in-memory size against the budget and roll
+    over to a temp file on the first write that would exceed it. Chunks waiting in the
+    stream queues are counted through `hold`/`release` but can't spill (there are at
+    most `STREAM_QUEUE_MAX_CHUNKS` per concurrent segment), so `peak` may exceed
+    `max_bytes` by that much. Thread-safe, part files are encoded in worker threads.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Args:
+            max_bytes: In-memory audio allowed for the render, 0 keeps all spools on disk.
+        """
+        self.max_bytes = max(0, max_bytes)
+        self.in_memory = 0
+        self.peak = 0
+        self.spilled = 0
+        self._lock = threading.Lock()
+
+    def spool(self) -> "AudioSpool":
+        """Return a new spool counted against this budget."""
+        return AudioSpool(self)
+
+    def reserve(self, size: int) -> bool:
+        """Take `size` bytes from the budget, returning False (taking nothing) if they don't fit."""
+        with self._lock:
+            if self.in_memory + size > self.max_bytes:
+                return False
+            self.in_memory += size
+            self.peak = max(self.peak, self.in_memory)
+            return True
+
+    def hold(self, size: int) -> None:
+        """Count `size` bytes that stay in memory whether or not they fit."""
+        with self._lock:
+            self.in_memory += size
+            self.peak = max(self.peak, self.in_memory)
+
+    def release(self, size: int) -> None:
+        with self._lock:
+            self.in_memory -= size
+
+    def add_spilled(self, size: int) -> None:
+        with self._lock:
+            self.spilled += size
+
+
+class AudioSpool(io.IOBase):
+    """
+    Seekable temp file held in memory while an `AudioMemoryBudget` allows it.
+
+    Starts as a `BytesIO` and moves its content to a `tempfile.TemporaryFile` on the
+    first write that doesn't fit the budget. Unlike a `SpooledTemporaryFile` with a
+    fixed `max_size`, the rollover depends on what the other spools of the render hold,
+    so the render as a whole stays within its budget however many segments are spooled
+    at once.
+    """
+
+    def __init__(self, budget: AudioMemoryBudget) -> None:
+        """
+        Args:
+            budget: Budget the in-memory size is counted against.
+        """
+        self.budget = budget
+        self.file: BinaryIO = io.BytesIO()
+        self.rolled = False
+        self._in_memory = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def write(self, data: bytes | memoryview) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        if not self.rolled:
+            size = data.nbytes if isinstance(data, memoryview) else len(data)
+            # Overwrites (header patches) don't grow the buffer
+            growth = max(0, self.file.tell() + size - self._in_memory)
+            if growth and not self.budget.reserve(growth):
+                self.rollover()
+            else:
+                self._in_memory += growth
+        return self.file.write(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self.file.read(size)
+
+    def readinto(self, buffer) -> int:
+        return self.file.readinto(buffer)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def fileno(self) -> int:
+        # Only a file on disk has a descriptor
+        self.rollover()
+        return self.file.fileno()
+
+    def rollover(self) -> None:
+        """Move the content to a temp file on disk, keeping the position."""
+        if self.rolled:
+            return
+        memory = self.file
+        disk = tempfile.TemporaryFile()
+        with memory.getbuffer() as view:
+            disk.write(view)
+        disk.seek(memory.tell())
+        memory.close()
+        self.file = disk
+        self.rolled = True
+        self.budget.release(self._in_memory)
+        self._in_memory = 0
+
+    def close(self) -> None:
+        if not self.closed:
+            if self.rolled:
+                self.budget.add_spilled(os.fstat(self.file.fileno()).st_size)
+            self.budget.release(self._in_memory)
+            self._in_memory = 0
+            self.file.close()
+        super().close()
+
+
+class OrderedSegmentWriter:
+    """
+    Stitch concurrently synthesized segments into one audio file in playback order.
+
+    Chunks of the segment at the head of the playback order go straight into the
+    encoder stage (`WavAssembler` or `SoundFileEncoder`, optionally behind a
+    `PcmStitcher` that is told where segments end). Chunks of segments that run
+    ahead are spooled until every earlier segment has finished, then copied over.
+    Not thread-safe: a render drives it through an `EncoderStage`, which runs one
+    operation at a time in `ENCODE_EXECUTOR`.
+    """
+
+    def __init__(
+        self,
+        encoder_factory: Callable[[str], "WavAssembler | SoundFileEncoder | PcmStitcher"],
+        budget: AudioMemoryBudget,
+    ) -> None:
+        """
+        Args:
+            encoder_factory: Creates the encoder stage for the PCM MIME type of the first
+                             chunk; the encoder owns the output file.
+            budget: Memory budget of the render, segment spools spill to disk past it.
+        """
+        self.encoder_factory = encoder_factory
+        self.budget = budget
+        self.encoder: WavAssembler | SoundFileEncoder | PcmStitcher | None = None
+        self.head = 0
+        self.spools: dict[int, tuple[AudioSpool, str | None]] = {}
+        self.finished: set[int] = set()
+
+    def write(self, index: int, data: bytes, mime_type: str) -> None:
+        """Route a chunk of segment `index` to the WAV file or to the segment's spool."""
+        if index == self.head:
+            self._append(data, mime_type)
+            return
+
+        spool, _ = self.spools.get(index, (None, None))
+        if spool is None:
+            spool = self.budget.spool()
+        spool.write(data)
+        self.spools[index] = (spool, mime_type)
+
+    def finish(self, index: int) -> None:
+        """Mark segment `index` complete and flush every segment that is now in order."""
+        self.finished.add(index)
+        while self.head in self.finished:
+            if isinstance(self.encoder, PcmStitcher):
+                self.encoder.end_segment()
+            self.head += 1
+            self._flush(self.head)
+
+    def finalize(self) -> int:
+        """
+        Finalize the encoder stage once all segments are finished.
+
+        Returns:
+            int: Total output file size in bytes, or 0 if no audio was written.
+        """
+        if self.encoder is None:
+            return 0
+        return self.encoder.finalize()
+
+    def close(self) -> None:
+        """Release any spools left behind by failed segments."""
+        for spool, _ in self.spools.values():
+            spool.close()
+        self.spools.clear()
+
+    def _append(self, data: bytes | memoryview, mime_type: str) -> None:
+        if self.encoder is None:
+            self.encoder = self.encoder_factory(mime_type)
+        self.encoder.write(data, mime_type)
+
+    def _flush(self, index: int) -> None:
+        spool, mime_type = self.spools.pop(index, (None, None))
+        if spool is None:
+            return
+        with spool:
+            spool.seek(0)
+            while block := spool.read(1024 * 1024):
+                self._append(block, mime_type)  # type: ignore
+
+
+class EncoderStage:
+    """
+    Run an `OrderedSegmentWriter`, and with it stitching and encoding, off the event loop.
+
+    Operations are queued in order and executed one after another in `ENCODE_EXECUTOR`,
+    so the event loop only hands off bytes: encoding Opus or MP3 runs at a few dozen
+    times real time and would otherwise stall every other request of the worker. The
+    bounded queue applies backpressure to the segments when encoding falls behind.
+    Once an operation failed the rest are skipped and the error is raised to callers.
+    """
+
+    def __init__(self, writer: OrderedSegmentWriter) -> None:
+        """
+        Args:
+            writer: Writer of the render, only touched from the stage's operations.
+        """
+        self.writer = writer
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=ENCODE_QUEUE_MAX_CHUNKS)
+        self._error: Exception | None = None
+        self._closing = False
+        self._task = asyncio.ensure_future(self._run())
+
+    @property
+    def head(self) -> int:
+        """Index of the first segment not yet written in playback order."""
+        return self.writer.head
+
+    async def write(self, index: int, data: bytes, mime_type: str) -> None:
+        """Queue a chunk of segment `index`, waiting only while the queue is full."""
+        # Queued chunks count against the render's memory budget until they are written
+        self.writer.budget.hold(len(data))
+        await self._submit(functools.partial(self.writer.write, index, data, mime_type), len(data))
+
+    async def run(self, function: Callable, *args):
+        """Run `function(*args)` in the stage after the queued operations and return its result."""
+        done = asyncio.get_running_loop().create_future()
+        await self._submit(functools.partial(function, *args), done=done)
+        return await done
+
+    async def finish(self, index: int) -> None:
+        """Mark segment `index` complete once its queued chunks are written."""
+        await self.run(self.writer.finish, index)
+
+    async def finalize(self) -> int:
+        """Finalize the encoder once everything queued is written, see `OrderedSegmentWriter.finalize`."""
+        return await self.run(self.writer.finalize)
+
+    async def close(self) -> None:
+        """Skip the queued operations, wait for the running one and release the writer's spools."""
+        if not self._closing and not self._task.done():
+            self._closing = True
+            await self._queue.put(None)
+            await asyncio.shield(self._task)
+        self.writer.close()
+
+    async def _submit(self, operation: Callable, size: int = 0, done: asyncio.Future | None = None) -> None:
+        if self._error is not None or self._closing:
+            if size:
+                self.writer.budget.release(size)
+            raise self._error or RuntimeError("Encoder stage is closed")
+        await self._queue.put((operation, size, done))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while (item := await self._queue.get()) is not None:
+            operation, size, done = item
+            try:
+                result = None
+                if self._error is None and not self._closing:
+                    try:
+                        result = await loop.run_in_executor(ENCODE_EXECUTOR, operation)
+                    except Exception as e:
+                        self._error = e
+                if done is not None and not done.done():
+                    if self._error is not None:
+                        done.set_exception(self._error)
+                    elif self._closing:
+                        done.cancel()
+                    else:
+                        done.set_result(result)
+            finally:
+                if size:
+                    self.writer.budget.release(size)
+
+
+class SegmentCache:
+    """
+    Size-bounded, content-addressed disk cache of synthesized segment PCM.
+
+    Entries are keyed by a hash of everything that affects the audio of a segment
+    (text including style, voices, language and model) and evicted least recently used
+    first once the total size exceeds `max_bytes`. Recency is mirrored into file mtimes
+    so the LRU order survives process restarts.
+
+    Each entry file holds a 2-byte length-prefixed MIME type followed by the raw PCM.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """
+        Args:
+            directory: Directory holding the cache entries (created if missing).
+            max_bytes: Maximum total size of all entries.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        existing = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(".pcm"):
+                stat = entry.stat()
+                existing.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        for _, key, size in sorted(existing):
+            self._entries[key] = size
+            self._size += size
+        log.debug("Segment cache loaded - %s entries, %s bytes", len(self._entries), self.size)
+
+    @staticmethod
+    def key(text: str, voices: tuple[str, ...], language: str, model: str) -> str:
+        """Compute the content address of a segment render."""
+        payload = json.dumps([text, list(voices), language, model], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def size(self) -> int:
+        """Total size of all cached entries in bytes."""
+        return self._size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pcm")
+
+    def get(self, key: str, record_stats: bool = True) -> tuple[str, BinaryIO] | None:
+        """
+        Look up a segment and count the hit or miss.
+
+        Args:
+            key: Content address from `key`.
+            record_stats: Count the lookup in the hit/miss statistics.
+
+        Returns:
+            tuple[str, BinaryIO] | None: The MIME type and an open file positioned at the
+                                         start of the PCM, or None on a miss.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += record_stats
+                return None
+            try:
+                file = open(self._path(key), "rb")
+            except FileNotFoundError:
+                # Removed behind our back, treat as a miss
+                self._size -= self._entries.pop(key)
+                self.misses += record_stats
+                return None
+            self._entries.move_to_end(key)
+            self.hits += record_stats
+
+        os.utime(file.fileno())
+        (mime_length,) = struct.unpack("<H", file.read(2))
+        mime_type = file.read(mime_length).decode("ascii")
+        return mime_type, file
+
+    def open_entry(self, key: str) -> "SegmentCacheEntry":
+        """Start writing a new entry; it only becomes visible once committed."""
+        return SegmentCacheEntry(self, key)
+
+    def _commit(self, key: str, temp_path: str, size: int) -> None:
+        os.replace(temp_path, self._path(key))
+        with self._lock:
+            self._size += size - self._entries.get(key, 0)
+            self._entries[key] = size
+            self._entries.move_to_end(key)
+            evicted = []
+            while self._entries and self._size > self.max_bytes:
+                evicted_key, evicted_size = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                evicted.append(evicted_key)
+            self.evictions += len(evicted)
+        for evicted_key in evicted:
+            try:
+                os.remove(self._path(evicted_key))
+            except FileNotFoundError:
+                pass
+        if evicted:
+            log.debug("Segment cache evicted %s entries, now %s bytes", len(evicted), self.size)
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss/eviction counters and the current cache size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.size,
         }
 
-        # Check for empty input
-        if not text or not text.strip():
-            log.warning("Transcript is empty")
-            result["error"] = "Transcript is empty"
-            return result
 
-        lines: list = text.strip().split("\n")
-        # Pattern for speaker lines
-        speaker_pattern = r"^Speaker ([12]):\s*(.+)$"
+class SegmentCacheEntry:
+    """A cache entry being written while its segment streams in."""
 
-        # style_lines = ""
-        style_lines = []
-        dialogues = []
-        first_speaker_found = False
+    def __init__(self, cache: SegmentCache, key: str) -> None:
+        self.cache = cache
+        self.key = key
+        self.mime_type: str | None = None
+        self.file = tempfile.NamedTemporaryFile(
+            dir=cache.directory, suffix=".tmp", delete=False
+        )
 
-        for line_num, line in enumerate(lines, 1):
-            line: str = line.strip()
+    def write(self, data: bytes, mime_type: str) -> None:
+        """Append a PCM chunk; the MIME type header is written with the first chunk."""
+        if self.mime_type is None:
+            self.mime_type = mime_type
+            encoded = mime_type.encode("ascii")
+            self.file.write(struct.pack("<H", len(encoded)) + encoded)
+        self.file.write(data)
+
+    def commit(self) -> None:
+        """Publish the entry into the cache (entries without audio are dropped)."""
+        size = self.file.tell()
+        self.file.close()
+        if self.mime_type is None:
+            os.remove(self.file.name)
+            return
+        self.cache._commit(self.key, self.file.name, size)
+
+    def discard(self) -> None:
+        """Drop a partially written entry."""
+        self.file.close()
+        try:
+            os.remove(self.file.name)
+        except FileNotFoundError:
+            pass
 
-            # Skip empty lines
-            if not line:
-                continue
 
-            match = re.match(speaker_pattern, line)
-            if match:
-                first_speaker_found = True
-                speaker_num = match.group(1)
-                content = match.group(2).strip()
+class RenderIndex:
+    """
+    Persistent memo of finished renders: request fingerprint -> saved file IDs.
+
+    One small JSON file per fingerprint, replaced atomically, so concurrent workers
+    sharing the data directory never see a torn index.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Args:
+            directory: Directory holding the index entries (created if missing).
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(
+        parsed_transcript: ParsedTranscript, render_settings: dict, user_id: str
+    ) -> str:
+        """
+        Compute the canonical fingerprint of a render request.
+
+        Args:
+            parsed_transcript: Result of `_validate_transcript_format`; its stripped
+                               style and dialogues make the fingerprint insensitive to
+                               blank lines and surrounding whitespace.
+            render_settings: Every setting that changes the rendered output.
+            user_id: Owner of the render, entries are never shared between users.
+
+        Returns:
+            str: Hex SHA-256 fingerprint.
+        """
+        payload = json.dumps(
+            {
+                "style": parsed_transcript.style,
+                "dialogues": [list(dialogue) for dialogue in parsed_transcript.iter_dialogues()],
+                "settings": render_settings,
+                "user_id": user_id,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f"{fingerprint}.json")
+
+    def get(self, fingerprint: str) -> list[str] | None:
+        """Return the file IDs recorded for `fingerprint`, or None if unknown."""
+        try:
+            with open(self._path(fingerprint), encoding="utf-8") as f:
+                return json.load(f)["file_ids"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def put(self, fingerprint: str, file_ids: list[str]) -> None:
+        """Record the file IDs produced for `fingerprint`."""
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.directory, suffix=".tmp", delete=False, encoding="utf-8"
+        ) as f:
+            json.dump({"file_ids": file_ids, "created_at": int(time.time())}, f)
+        os.replace(f.name, self._path(fingerprint))
+
+    def remove(self, fingerprint: str) -> None:
+        """Forget a stale entry."""
+        try:
+            os.remove(self._path(fingerprint))
+        except FileNotFoundError:
+            pass
+
+
+class SegmentTimingModel:
+    """
+    Observed Gemini request latency, failure rate and audio length, persisted as JSON.
+
+    The time of a request for a segment of `n` characters is modelled per TTS model as
+    `overhead + seconds_per_char * n`, fitted by regression over exponentially decaying
+    statistics (each observation weighs `DECAY` times less than the next), so the model
+    follows changes in API behaviour. Failures that abort a segment are modelled as a
+    hazard per character: a segment fails with probability `1 - exp(-hazard * n)` and
+    is then synthesized again. The audio length of a segment is modelled per TTS model
+    and language as `audio_per_char * n + audio_per_turn * turns`. Until a few requests
+    have been measured, prior values weighing `PRIOR_WEIGHT` observations dominate.
+    """
+
+    DECAY = 0.97
+    PRIOR_WEIGHT = 1.0
+    # Spread of segment sizes the prior slope counts as measured over, in characters
+    PRIOR_CHARS_SPREAD = 500
+    PRIOR_OVERHEAD_SECONDS = 4.0
+    PRIOR_SECONDS_PER_CHAR = 0.015
+    # One failure in this many characters
+    PRIOR_CHARS_PER_FAILURE = 500_000
+    # Speech at ~15 characters per second plus a short pause per speaker turn
+    PRIOR_AUDIO_SECONDS_PER_CHAR = 0.065
+    PRIOR_AUDIO_SECONDS_PER_TURN = 0.3
+    PRIOR_TURNS_SPREAD = 10
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: JSON file the statistics are loaded from and saved to.
+        """
+        self.path = path
+        self._stats: dict[str, dict[str, dict[str, float]]] | None = None
+        self._lock = threading.Lock()
+
+    def _entry(self, section: str, key: str, fields: tuple[str, ...]) -> dict[str, float]:
+        if self._stats is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._stats = json.load(f)
+            except (OSError, ValueError):
+                self._stats = {}
+        entries = self._stats.setdefault(section, {})
+        stats = entries.get(key)
+        if stats is None:
+            stats = entries[key] = dict.fromkeys(fields, 0.0)
+        return stats
+
+    def _model_stats(self, tts_model: str) -> dict[str, float]:
+        return self._entry(
+            "timing",
+            tts_model,
+            ("weight", "chars", "seconds", "chars_squared", "chars_seconds", "failures", "attempted_chars"),
+        )
+
+    def _audio_stats(self, tts_model: str, language: str) -> dict[str, float]:
+        return self._entry(
+            "audio",
+            f"{tts_model}/{language}",
+            ("weight", "chars_squared", "chars_turns", "turns_squared", "chars_audio", "turns_audio"),
+        )
+
+    def observe(self, tts_model: str, chars: int, seconds: float) -> None:
+        """Record a successful request for a segment of `chars` characters."""
+        with self._lock:
+            stats = self._model_stats(tts_model)
+            for name in stats:
+                stats[name] *= self.DECAY
+            stats["weight"] += 1
+            stats["chars"] += chars
+            stats["seconds"] += seconds
+            stats["chars_squared"] += chars * chars
+            stats["chars_seconds"] += chars * seconds
+            stats["attempted_chars"] += chars
+
+    def observe_failure(self, tts_model: str, chars: int) -> None:
+        """Record a request for a segment of `chars` characters that failed."""
+        with self._lock:
+            stats = self._model_stats(tts_model)
+            stats["failures"] = stats["failures"] * self.DECAY + 1
+            stats["attempted_chars"] = stats["attempted_chars"] * self.DECAY + chars
+
+    def parameters(self, tts_model: str) -> tuple[float, float, float]:
+        """
+        Return the fitted `(overhead, seconds_per_char, hazard)` of `tts_model`.
+
+        The slope is a ridge regression towards the prior slope, so it stays defined
+        while all measured segments had about the same size; the overhead is then
+        blended with the prior overhead by weight.
+        """
+        with self._lock:
+            stats = dict(self._model_stats(tts_model))
+        weight = stats["weight"]
+        seconds_per_char = self.PRIOR_SECONDS_PER_CHAR
+        overhead = self.PRIOR_OVERHEAD_SECONDS
+        if weight > 0:
+            mean_chars = stats["chars"] / weight
+            mean_seconds = stats["seconds"] / weight
+            chars_variance = max(stats["chars_squared"] - weight * mean_chars**2, 0.0)
+            covariance = stats["chars_seconds"] - weight * mean_chars * mean_seconds
+            ridge = self.PRIOR_WEIGHT * self.PRIOR_CHARS_SPREAD**2
+            seconds_per_char = (covariance + ridge * seconds_per_char) / (chars_variance + ridge)
+            seconds_per_char = max(seconds_per_char, 1e-5)
+            measured_overhead = max(mean_seconds - seconds_per_char * mean_chars, 0.0)
+            overhead = (weight * measured_overhead + self.PRIOR_WEIGHT * overhead) / (weight + self.PRIOR_WEIGHT)
+        hazard = (stats["failures"] + 1) / (stats["attempted_chars"] + self.PRIOR_CHARS_PER_FAILURE)
+        return overhead, seconds_per_char, hazard
+
+    def observe_audio(self, tts_model: str, language: str, chars: int, turns: int, audio_seconds: float) -> None:
+        """Record that `chars` characters of dialogue in `turns` speaker turns gave `audio_seconds` of audio."""
+        with self._lock:
+            stats = self._audio_stats(tts_model, language)
+            for name in stats:
+                stats[name] *= self.DECAY
+            stats["weight"] += 1
+            stats["chars_squared"] += chars * chars
+            stats["chars_turns"] += chars * turns
+            stats["turns_squared"] += turns * turns
+            stats["chars_audio"] += chars * audio_seconds
+            stats["turns_audio"] += turns * audio_seconds
+
+    def audio_seconds(self, tts_model: str, language: str, chars: int, turns: int) -> float:
+        """
+        Predict the audio length of `chars` characters of dialogue in `turns` speaker turns.
+
+        Both rates are a ridge regression towards their priors, which count as an
+        observation of `PRIOR_CHARS_SPREAD` characters and `PRIOR_TURNS_SPREAD` turns.
+        """
+        with self._lock:
+            stats = dict(self._audio_stats(tts_model, language))
+        chars_ridge = self.PRIOR_WEIGHT * self.PRIOR_CHARS_SPREAD**2
+        turns_ridge = self.PRIOR_WEIGHT * self.PRIOR_TURNS_SPREAD**2
+        # Normal equations of the two-parameter fit, solved by Cramer's rule
+        a = stats["chars_squared"] + chars_ridge
+        b = stats["chars_turns"]
+        d = stats["turns_squared"] + turns_ridge
+        u = stats["chars_audio"] + chars_ridge * self.PRIOR_AUDIO_SECONDS_PER_CHAR
+        v = stats["turns_audio"] + turns_ridge * self.PRIOR_AUDIO_SECONDS_PER_TURN
+        determinant = a * d - b * b
+        per_char = max((u * d - b * v) / determinant, 0.0)
+        per_turn = max((a * v - b * u) / determinant, 0.0)
+        return per_char * chars + per_turn * turns
+
+    def estimator(self, tts_model: str) -> Callable[[int], float]:
+        """Return a function giving the expected seconds to synthesize `n` characters, retries included."""
+        overhead, seconds_per_char, hazard = self.parameters(tts_model)
+
+        def expected_seconds(chars: int) -> float:
+            # Geometric number of attempts, each taking the full request time
+            return (overhead + seconds_per_char * chars) * math.exp(min(hazard * chars, 50.0))
+
+        return expected_seconds
+
+    def save(self) -> None:
+        """Write the statistics to `path` (atomically)."""
+        with self._lock:
+            if not self._stats:
+                return
+            payload = json.dumps(self._stats)
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(payload)
+        os.replace(temp_path, self.path)
+
+
+SEGMENT_TIMING = SegmentTimingModel(SEGMENT_TIMING_FILE)
+
+
+class SegmentPlanner:
+    """
+    Splits the dialogue lines of one render into segments, as ranges of line indices.
+
+    Consecutive speaker turns are packed into a segment until adding the next turn
+    would exceed the size limit, or earlier at a content-defined cut point so segment
+    boundaries stay stable when a single line is edited. Turns are never split, so a
+    single turn longer than the limit becomes a segment of its own. Every segment text
+    is prefixed with the style instructions so the tone stays consistent across
+    segment boundaries.
+
+    `choose_max_chars` picks the size limit with the shortest expected wall-clock
+    time, simulating how the packed segments would run on the available workers.
+    """
+
+    def __init__(self, dialogues: Iterable[tuple[str, str]], style: str) -> None:
+        """
+        Args:
+            dialogues: Parsed dialogues as ("1"|"2", text) pairs, see
+                       `ParsedTranscript.iter_dialogues`.
+            style: Style instructions to prefix each segment with.
+        """
+        # The "Speaker N: text" lines are only built for the segments in `text()`
+        self.dialogues = list(dialogues)
+        self.style = style
+        self.prefix = f"{style}\n\n" if style else ""
+        # Line lengths including the newline, and content-defined cut points: lines
+        # whose hash hits 1 in 4 (the CRC continues from the one of the speaker label)
+        labels = {speaker: f"Speaker {speaker}: " for speaker in ("1", "2")}
+        label_crcs = {speaker: zlib.crc32(label.encode("utf-8")) for speaker, label in labels.items()}
+        self.lengths = array.array(
+            "q", (len(labels[speaker]) + len(text) + 1 for speaker, text in self.dialogues)
+        )
+        self.cut_points = bytes(
+            zlib.crc32(text.encode("utf-8"), label_crcs[speaker]) % 4 == 0 for speaker, text in self.dialogues
+        )
+
+    def pack(
+        self, max_chars: int, first_segment_max_chars: int | None = None, start: int = 0
+    ) -> list[tuple[int, int]]:
+        """
+        Pack lines from `start` on into segments of at most `max_chars` characters.
+
+        Args:
+            max_chars: Size limit of a segment (style prefix not counted).
+            first_segment_max_chars: Lower limit for the first segment only, so it
+                                     finishes quickly (progressive playback).
+            start: Index of the first line to pack.
+
+        Returns:
+            list[tuple[int, int]]: `(start, end)` line ranges in playback order.
+        """
+        max_chars = max(1, max_chars)
+        ranges: list[tuple[int, int]] = []
+        segment_start = start
+        chars = 0
+        for index in range(start, len(self.dialogues)):
+            length = self.lengths[index]
+            limit = first_segment_max_chars if first_segment_max_chars and not ranges else max_chars
+            if index > segment_start and chars + length > min(limit, max_chars):
+                ranges.append((segment_start, index))
+                segment_start = index
+                chars = 0
+            chars += length
+
+            # Past half the limit, cut after content-defined cut points. Editing one line
+            # then only moves the boundaries of its own segment, so the other segments
+            # keep their cache keys.
+            if chars >= max_chars // 2 and self.cut_points[index]:
+                ranges.append((segment_start, index + 1))
+                segment_start = index + 1
+                chars = 0
+
+        if segment_start < len(self.dialogues):
+            ranges.append((segment_start, len(self.dialogues)))
+        return ranges
+
+    def text(self, segment_range: tuple[int, int]) -> str:
+        """Return the transcript of a segment in the "{style}\\n\\nSpeaker N: text\\n..." format."""
+        start, end = segment_range
+        return self.prefix + "\n".join(
+            f"Speaker {speaker}: {text}" for speaker, text in self.dialogues[start:end]
+        )
+
+    def chars(self, segment_range: tuple[int, int]) -> int:
+        """Return the length of `text(segment_range)`."""
+        return len(self.prefix) + self.dialogue_chars(*segment_range) - 1
+
+    def dialogue_chars(self, start: int = 0, end: int | None = None) -> int:
+        """Return the characters of the dialogue lines from `start` to `end`, without the style."""
+        return sum(self.lengths[start:end])
+
+    def load_ranges(self, path: str) -> list[tuple[int, int]] | None:
+        """Read ranges saved with `save_ranges`, or None if missing or not a plan of these lines."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                ranges = [(int(start), int(end)) for start, end in json.load(f)]
+        except (OSError, ValueError, TypeError):
+            return None
+        expected_start = 0
+        for start, end in ranges:
+            if start != expected_start or end <= start:
+                return None
+            expected_start = end
+        return ranges if expected_start == len(self.dialogues) else None
+
+    def save_ranges(self, path: str, ranges: list[tuple[int, int]]) -> None:
+        """Write `ranges` to `path` (atomically)."""
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(ranges, file)
+        os.replace(temp_path, path)
+
+    def makespan(
+        self,
+        ranges: list[tuple[int, int]],
+        expected_seconds: Callable[[int], float],
+        concurrency: int,
+        requests_per_minute: int = 0,
+    ) -> float:
+        """
+        Simulate the wall-clock seconds to synthesize `ranges` in order on `concurrency`
+        workers, with requests spaced out to `requests_per_minute` (0 for no limit).
+        """
+        interval = 60 / requests_per_minute if requests_per_minute > 0 else 0.0
+        workers = [0.0] * max(1, concurrency)
+        finish = 0.0
+        for index, segment_range in enumerate(ranges):
+            start = max(heapq.heappop(workers), index * interval)
+            end = start + expected_seconds(self.chars(segment_range))
+            heapq.heappush(workers, end)
+            finish = max(finish, end)
+        return finish
+
+    def choose_max_chars(
+        self,
+        expected_seconds: Callable[[int], float],
+        upper: int,
+        concurrency: int,
+        requests_per_minute: int = 0,
+        first_segment_max_chars: int | None = None,
+        start: int = 0,
+    ) -> tuple[int, float]:
+        """
+        Pick the segment size limit with the shortest simulated wall-clock time.
+
+        Candidates grow by a factor of sqrt(2) from `ADAPTIVE_SEGMENT_MIN_CHARS` up to
+        `upper`, so the chosen limit (and with it the segment cache keys) only changes
+        when the measurements move noticeably.
+
+        Returns:
+            tuple[int, float]: The size limit and the simulated seconds for lines from
+                               `start` on. Ties go to the larger limit (fewer requests).
+        """
+        upper = max(1, upper)
+        candidates = {upper}
+        size = ADAPTIVE_SEGMENT_MIN_CHARS
+        while size < upper:
+            candidates.add(int(size))
+            size *= math.sqrt(2)
+
+        best = (upper, math.inf)
+        for candidate in sorted(candidates, reverse=True):
+            ranges = self.pack(candidate, first_segment_max_chars, start)
+            seconds = self.makespan(ranges, expected_seconds, concurrency, requests_per_minute)
+            if seconds < best[1] * 0.999:
+                best = (candidate, seconds)
+        return best
+
+
+class RenderEstimate(NamedTuple):
+    """Pre-flight prediction for a render, see `Action._estimate_render`."""
+
+    characters: int
+    turns: int
+    segments: int
+    audio_seconds: float
+    synthesis_seconds: float
+
+
+class SavedFile(NamedTuple):
+    """A file saved by `_save_file`, with the metadata its citation needs."""
+
+    id: str
+    name: str
+    content_type: str
+    size: int
+    path: str = ""
+
+
+def import_open_webui() -> bool:
+    """
+    Import Open WebUI's file model and storage layers on first use.
+
+    Fills `FileForm`, `Files` and `Storage`, keeping names that are already set (e.g. to
+    stand-ins). Outside of Open WebUI (the batch renderer writing to a local directory)
+    they stay None.
+
+    Returns:
+        bool: True if all three are available.
+    """
+    global FileForm, Files, Storage
+    if FileForm is None or Files is None or Storage is None:
+        try:
+            from open_webui.models import files as files_module
+            from open_webui.storage import provider
+        except ImportError:
+            return False
+        if FileForm is None:
+            FileForm = files_module.FileForm
+        if Files is None:
+            Files = files_module.Files
+        if Storage is None:
+            Storage = provider.Storage
+    return True
+
+
+def insert_file_records(user_id: str, forms: "list[FileForm]") -> None:
+    """
+    Insert the database records of several saved files.
+
+    Each record goes through Open WebUI's public `Files.insert_new_file`, so its own
+    timestamps and field handling apply whatever the installed Open WebUI version.
+
+    Args:
+        user_id: Owner of the files.
+        forms: Records built by `_save_file`, in insertion order.
+
+    Raises:
+        RuntimeError: If a record could not be inserted.
+    """
+    import_open_webui()
+    for form in forms:
+        if Files.insert_new_file(user_id=user_id, form_data=form) is None:
+            raise RuntimeError(f"Could not insert the database record of file {form.id}")
+
+
+class LocalFileStore:
+    """
+    Saves podcast files into a local directory, in place of Open WebUI's `Storage`.
+
+    Used by the batch renderer: files keep the names `_save_file` gives them, without the
+    file ID prefix that keeps names unique in Open WebUI's storage, and get no database
+    record. Files are written under a temporary name and renamed when complete, so an
+    interrupted batch never leaves a truncated file under its final name.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def upload_file(self, file: BinaryIO, filename: str, tags: dict[str, str]) -> tuple[None, str]:
+        """Write `file` to the directory, with the same signature as `Storage.upload_file`."""
+        filename = filename.removeprefix(f"{tags.get('OpenWebUI-File-Id', '')}_")
+        path = os.path.join(self.directory, filename)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".upload_")
+        try:
+            with os.fdopen(fd, "wb") as target:
+                shutil.copyfileobj(file, target, 1024 * 1024)
+            os.replace(temp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+            raise
+        return None, path
+
+    def delete_file(self, path: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+class MultipartUploader:
+    """
+    Uploads large files to S3-compatible object storage as a multipart upload.
+
+    Parts are read from the file one at a time and up to `max_concurrent_parts` of them
+    are in flight at once, so memory stays at that many parts. A failed part is retried
+    on its own with jittered exponential backoff; if a part still fails, the upload is
+    aborted so no incomplete parts are left in the bucket.
+
+    `client` is a boto3 S3 client (or anything with the same multipart calls), as held
+    by Open WebUI's `S3StorageProvider`.
+    """
+
+    RETRY_BASE_SECONDS = 0.5
+    RETRY_MAX_SECONDS = 10.0
+
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        key_prefix: str = "",
+        part_size: int = 16 * 1024 * 1024,
+        max_concurrent_parts: int = 4,
+        max_part_retries: int = 3,
+        tag_value: Callable[[str], str] | None = None,
+    ) -> None:
+        """
+        Args:
+            client: S3 client used for the multipart calls.
+            bucket: Destination bucket.
+            key_prefix: Prefix of the object keys, as configured for Open WebUI.
+            part_size: Bytes per part, S3 requires at least 5 MiB for all but the last.
+            max_concurrent_parts: Parts uploaded at the same time.
+            max_part_retries: Retries of a failed part before the upload is aborted.
+            tag_value: Sanitizes tag keys and values; without it objects are not tagged.
+        """
+        self.client = client
+        self.bucket = bucket
+        self.key_prefix = key_prefix
+        self.part_size = part_size
+        self.max_concurrent_parts = max(1, max_concurrent_parts)
+        self.max_part_retries = max(0, max_part_retries)
+        self.tag_value = tag_value
+
+    @classmethod
+    def for_storage(cls, storage, **kwargs) -> "MultipartUploader | None":
+        """
+        Return an uploader writing where `storage` does, or None if it isn't S3 storage.
+
+        Objects are tagged like `S3StorageProvider.upload_file` tags them, i.e. only with
+        Open WebUI's `S3_ENABLE_TAGGING` setting.
+        """
+        client = getattr(storage, "s3_client", None)
+        bucket = getattr(storage, "bucket_name", None)
+        if client is None or not bucket:
+            return None
+        try:
+            from open_webui.config import S3_ENABLE_TAGGING
+        except ImportError:
+            S3_ENABLE_TAGGING = False
+        return cls(
+            client,
+            bucket,
+            key_prefix=getattr(storage, "key_prefix", "") or "",
+            tag_value=getattr(storage, "sanitize_tag_value", str) if S3_ENABLE_TAGGING else None,
+            **kwargs,
+        )
+
+    def upload(self, file: BinaryIO, filename: str, tags: dict[str, str]) -> str:
+        """
+        Upload the rest of `file` as object `filename` (under the key prefix).
+
+        Returns:
+            str: Path of the object in Open WebUI's `s3://bucket/key` form.
+
+        Raises:
+            Exception: The error of a part that failed after all its retries.
+        """
+        key = os.path.join(self.key_prefix, filename)
+        extra = {}
+        if self.tag_value and tags:
+            extra["Tagging"] = urllib.parse.urlencode(
+                {self.tag_value(k): self.tag_value(v) for k, v in tags.items()}
+            )
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key, **extra)["UploadId"]
+        try:
+            parts = []
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_concurrent_parts, thread_name_prefix="podcast-it-upload"
+            ) as pool:
+                in_flight: set[concurrent.futures.Future] = set()
+                part_number = 0
+                while True:
+                    # A part is only read once there is room for it
+                    if len(in_flight) >= self.max_concurrent_parts:
+                        done, in_flight = concurrent.futures.wait(
+                            in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                        )
+                        parts.extend(future.result() for future in done)
+                    data = file.read(self.part_size)
+                    if not data:
+                        break
+                    part_number += 1
+                    in_flight.add(pool.submit(self._upload_part, key, upload_id, part_number, data))
+                parts.extend(future.result() for future in in_flight)
+
+            parts.sort(key=lambda part: part["PartNumber"])
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            try:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            except Exception as e:
+                log.warning("Aborting multipart upload of %s failed: %s", key, e)
+            raise
+        log.debug("Uploaded %s in %s parts", key, len(parts))
+        return f"s3://{self.bucket}/{key}"
+
+    def _upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> dict:
+        attempt = 0
+        while True:
+            try:
+                response = self.client.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=data
+                )
+                return {"PartNumber": part_number, "ETag": response["ETag"]}
+            except Exception as e:
+                if attempt >= self.max_part_retries:
+                    raise
+                delay = random.uniform(0, min(self.RETRY_MAX_SECONDS, self.RETRY_BASE_SECONDS * 2**attempt))
+                attempt += 1
+                METRICS.increment("retries", reason="upload_part")
+                log.warning(
+                    "Part %s of %s failed (%s), retry %s in %.1fs", part_number, key, e, attempt, delay
+                )
+                time.sleep(delay)
+
+
+@functools.lru_cache(maxsize=32)
+def build_generate_content_config(
+    voice_1: str, voice_2: str, language_code: str, model: str
+) -> "types.GenerateContentConfig":
+    """
+    Build (once per distinct key) the multi-speaker generation config.
+
+    The result is shared between concurrent renders and must be treated as read-only.
+    `language_code` and `model` are part of the cache key so a config is never reused
+    across renders it wasn't built for, even though the model is passed per request.
+
+    Args:
+        voice_1: Prebuilt voice name for "Speaker 1" (a value of `SPEAKERS`).
+        voice_2: Prebuilt voice name for "Speaker 2" (a value of `SPEAKERS`).
+        language_code: Output language code (a value of `LANGUAGES`).
+        model: TTS model name.
+
+    Returns:
+        types.GenerateContentConfig: Audio-modality config with the speech config.
+    """
+    from google.genai import types
+
+    speech_config = types.SpeechConfig(
+        multi_speaker_voice_config=types.MultiSpeakerVoiceConfig(
+            speaker_voice_configs=[
+                types.SpeakerVoiceConfig(
+                    speaker="Speaker 1",
+                    voice_config=types.VoiceConfig(
+                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                            voice_name=voice_1
+                        )
+                    ),
+                ),
+                types.SpeakerVoiceConfig(
+                    speaker="Speaker 2",
+                    voice_config=types.VoiceConfig(
+                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                            voice_name=voice_2
+                        )
+                    ),
+                ),
+            ]
+        )
+    )
+    return types.GenerateContentConfig(
+        temperature=1, response_modalities=["audio"], speech_config=speech_config
+    )
+
+
+class GeminiRuntime:
+    """
+    Process-wide Gemini resources shared by every `Action` invocation.
+
+    Holds one `genai.Client` per API key (so HTTP connections are reused between
+    renders) and a long-lived, bounded thread pool for the blocking streaming calls.
+    Clients for a key that is no longer configured are dropped via `invalidate`, and
+    everything is released by `shutdown`, which runs at interpreter exit.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        """
+        Args:
+            max_workers: Upper bound on threads running Gemini streams, across all renders.
+        """
+        self.max_workers = max_workers
+        self._clients: dict[str, "genai.Client"] = {}
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def client(self, api_key: str) -> "genai.Client":
+        """Return the pooled client for `api_key`, creating it (and importing the SDK) on first use."""
+        from google import genai
+
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                log.debug("Creating pooled Gemini client")
+                client = self._clients[api_key] = genai.Client(api_key=api_key)
+            return client
+
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """Return the shared executor, starting it on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="podcast-it-gemini"
+                )
+            return self._executor
+
+    def invalidate(self, api_key: str | None = None) -> None:
+        """
+        Drop pooled clients, all of them or only the one for `api_key`.
+
+        Dropped clients aren't closed here, renders still streaming with them finish
+        normally and the client is released once the last reference goes away.
+        """
+        with self._lock:
+            if api_key is None:
+                self._clients.clear()
+            else:
+                self._clients.pop(api_key, None)
+        build_generate_content_config.cache_clear()
+
+    def shutdown(self) -> None:
+        """Close every pooled client and stop the executor."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            executor, self._executor = self._executor, None
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                log.debug("Closing Gemini client failed: %s", e)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+GEMINI_RUNTIME = GeminiRuntime(max_workers=GEMINI_EXECUTOR_MAX_WORKERS)
+atexit.register(GEMINI_RUNTIME.shutdown)
+
+# Uploads and database calls run here, so a slow storage backend or database never
+# blocks the event loop of the Open WebUI worker
+IO_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=IO_EXECUTOR_MAX_WORKERS, thread_name_prefix="podcast-it-io"
+)
+atexit.register(IO_EXECUTOR.shutdown)
+
+# Stitching and encoding of every render (`EncoderStage`), kept apart from the I/O threads
+# so a long encode doesn't hold up uploads
+ENCODE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=ENCODE_EXECUTOR_MAX_WORKERS, thread_name_prefix="podcast-it-encode"
+)
+atexit.register(ENCODE_EXECUTOR.shutdown)
+
+
+async def run_io(function: Callable, *args, **kwargs):
+    """Await a blocking call (storage, database, transcript parsing) running in `IO_EXECUTOR`."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(IO_EXECUTOR, functools.partial(function, *args, **kwargs))
+
+
+def warm_up() -> None:
+    """
+    Do the imports that are otherwise deferred until the first podcast.
+
+    Imports the Gemini SDK (most of the plugin's load time) and Open WebUI's file layers.
+    Opt-in with the environment variable `PODCAST_IT_WARM_UP=1`, which runs it in a
+    background thread right after the plugin is loaded.
+    """
+    from google.genai import types  # noqa: F401 (imports the whole SDK)
+
+    import_open_webui()
+
+
+class TokenBucket:
+    """
+    Reservation-based token bucket refilled continuously at `per_minute` tokens a minute.
+
+    `reserve` always succeeds and returns how long the caller must wait before using
+    what it reserved, so waiting callers are served in reservation order. A limit of
+    0 disables the bucket.
+    """
+
+    def __init__(self, per_minute: int) -> None:
+        self.per_minute = per_minute
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def configure(self, per_minute: int) -> None:
+        """Change the limit, keeping the current fill level within the new capacity."""
+        if per_minute != self.per_minute:
+            self.per_minute = per_minute
+            self.tokens = min(self.tokens, float(per_minute))
+
+    def reserve(self, amount: int) -> float:
+        """
+        Take `amount` tokens (capped at the bucket capacity), possibly going into debt.
+
+        Returns:
+            float: Seconds until the reserved tokens are covered by the refill.
+        """
+        if self.per_minute <= 0:
+            return 0.0
+        now = time.monotonic()
+        rate = self.per_minute / 60
+        self.tokens = min(float(self.per_minute), self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        self.tokens -= min(amount, self.per_minute)
+        return 0.0 if self.tokens >= 0 else -self.tokens / rate
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    `TokenBucket` whose fill level lives in shared memory, for one quota across processes.
+
+    Created before the batch renderer's worker processes start and handed to each of
+    them, so their Gemini requests together stay within the per-minute limit.
+    """
+
+    def __init__(self, per_minute: int) -> None:
+        import multiprocessing
+
+        super().__init__(per_minute)
+        # Fill level and time of the last refill, guarded by the array's lock
+        self.state = multiprocessing.Array("d", [self.tokens, self.updated])
+
+    def configure(self, per_minute: int) -> None:
+        with self.state.get_lock():
+            self.tokens = self.state[0]
+            super().configure(per_minute)
+            self.state[0] = self.tokens
+
+    def reserve(self, amount: int) -> float:
+        with self.state.get_lock():
+            self.tokens, self.updated = self.state[:]
+            delay = super().reserve(amount)
+            self.state[:] = [self.tokens, self.updated]
+        return delay
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Return True if `error` is a Gemini quota / rate-limit (HTTP 429) error."""
+    if getattr(error, "code", None) == 429:
+        return True
+    message = str(error)
+    return "RESOURCE_EXHAUSTED" in message or "429" in message
+
+
+class JobScheduler:
+    """
+    Process-wide admission control in front of podcast generation.
+
+    Jobs are admitted under a global and a per-user concurrency cap. When a slot frees
+    up, the waiting job of the user with the fewest running jobs goes first (ties by
+    arrival), so one user queueing many renders can't starve the others. Deferred jobs
+    (estimated over the budget) wait behind all others. Individual
+    Gemini requests additionally go through token buckets for requests and characters
+    per minute, and rate-limit errors are retried with exponential backoff and full
+    jitter.
+    """
+
+    # Seconds between queue position updates while a job waits
+    QUEUE_STATUS_INTERVAL = 10
+    BACKOFF_BASE_SECONDS = 2.0
+    BACKOFF_MAX_SECONDS = 60.0
+
+    def __init__(self) -> None:
+        self.max_jobs = 0
+        self.max_jobs_per_user = 0
+        self.request_bucket = TokenBucket(0)
+        self.character_bucket = TokenBucket(0)
+        self.running: dict[str, int] = {}
+        # (user ID, arrival time, deferred) of each job waiting for a slot
+        self.waiting: list[tuple[str, float, bool]] = []
+        # Moving average of job durations, for queue ETAs
+        self.average_job_seconds: float | None = None
+        self._condition: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def configure(
+        self,
+        max_jobs: int,
+        max_jobs_per_user: int,
+        requests_per_minute: int,
+        characters_per_minute: int,
+    ) -> None:
+        """Apply the current valve limits (0 or less disables a cap or limit)."""
+        self.max_jobs = max(0, max_jobs)
+        self.max_jobs_per_user = max(0, max_jobs_per_user)
+        self.request_bucket.configure(requests_per_minute)
+        self.character_bucket.configure(characters_per_minute)
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+
+    def _queue_order(self) -> list[tuple[str, float, bool]]:
+        return sorted(self.waiting, key=lambda w: (w[2], self.running.get(w[0], 0), w[1]))
+
+    def _can_admit(self, waiter: tuple[str, float, bool]) -> bool:
+        if self.max_jobs and sum(self.running.values()) >= self.max_jobs:
+            return False
+        for candidate in self._queue_order():
+            if not self.max_jobs_per_user or self.running.get(candidate[0], 0) < self.max_jobs_per_user:
+                return candidate is waiter
+        return False
+
+    def queue_eta(self, position: int) -> float | None:
+        """Estimated seconds until the job at `position` (1-based) starts, if known."""
+        if self.average_job_seconds is None:
+            return None
+        return math.ceil(position / max(1, self.max_jobs)) * self.average_job_seconds
+
+    @contextlib.asynccontextmanager
+    async def job(self, user_id: str, on_queued=None, deferred: bool = False):
+        """
+        Hold a job slot for the duration of the `async with` block.
+
+        Args:
+            user_id: Owner of the job, for the per-user cap and fairness.
+            on_queued: Optional `async (position, eta_seconds | None)` callback, called
+                       while the job waits for a slot.
+            deferred: Queue the job behind every job that isn't deferred.
+        """
+        condition = self._get_condition()
+        waiter = (user_id, time.monotonic(), deferred)
+        async with condition:
+            self.waiting.append(waiter)
+
+        try:
+            while True:
+                async with condition:
+                    if self._can_admit(waiter):
+                        self.waiting.remove(waiter)
+                        self.running[user_id] = self.running.get(user_id, 0) + 1
+                        condition.notify_all()
+                        break
+                    position = self._queue_order().index(waiter) + 1
+
+                if on_queued:
+                    await on_queued(position, self.queue_eta(position))
+
+                async with condition:
+                    if not self._can_admit(waiter):
+                        try:
+                            await asyncio.wait_for(
+                                condition.wait(), timeout=self.QUEUE_STATUS_INTERVAL
+                            )
+                        except asyncio.TimeoutError:
+                            pass
+        except BaseException:
+            async with condition:
+                if waiter in self.waiting:
+                    self.waiting.remove(waiter)
+                condition.notify_all()
+            raise
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.average_job_seconds = (
+                elapsed
+                if self.average_job_seconds is None
+                else 0.8 * self.average_job_seconds + 0.2 * elapsed
+            )
+            async with condition:
+                self.running[user_id] -= 1
+                if not self.running[user_id]:
+                    del self.running[user_id]
+                condition.notify_all()
+
+    async def acquire_request(self, characters: int) -> None:
+        """Wait until one more Gemini request of `characters` fits in the per-minute quotas."""
+        delay = max(
+            self.request_bucket.reserve(1),
+            self.character_bucket.reserve(characters),
+        )
+        if delay > 0:
+            log.debug("Rate limiter delaying Gemini request by %.1fs", delay)
+            await asyncio.sleep(delay)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for retry number `attempt` (from 0)."""
+        return random.uniform(
+            0, min(self.BACKOFF_MAX_SECONDS, self.BACKOFF_BASE_SECONDS * 2**attempt)
+        )
+
+
+JOB_SCHEDULER = JobScheduler()
+
+
+# Upper bounds of the stage duration histogram buckets, in seconds
+METRICS_DURATION_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# Histograms measured in bytes instead of seconds, with buckets from 1 to 512 MiB
+METRICS_BYTES_BUCKETS = tuple(2**power * 1024 * 1024 for power in range(10))
+METRICS_BYTES_HISTOGRAMS = frozenset({"audio_memory_peak_bytes"})
+
+# Exported metrics, names are prefixed with "podcast_it_" by the sinks
+METRIC_DESCRIPTIONS = {
+    "stage_duration_seconds": "Duration of render stages",
+    "stage_errors": "Render stages that raised an exception",
+    "audio_bytes": "Audio bytes received from Gemini",
+    "audio_chunks": "Audio chunks received from Gemini",
+    "retries": "Segment retries after rate limits and render resumes",
+    "cache_hits": "Segments and renders served without calling Gemini",
+    "cache_misses": "Segments that had to be synthesized",
+    "jobs": "Podcast requests by outcome",
+    "event_loop_lag_seconds": "Delay of event loop wake-ups while podcasts are generated",
+    "audio_memory_peak_bytes": "Most audio bytes a podcast held in memory at once",
+    "audio_spilled_bytes": "Audio bytes spooled to temp files past the memory budget",
+}
+
+
+class MetricsSink:
+    """
+    Destination for the metrics recorded through `Metrics`.
+
+    Sinks receive every update as it happens and must be thread-safe, updates come
+    from the event loop as well as from Gemini worker threads. `flush` is called after
+    each podcast request.
+    """
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        """Record one histogram observation."""
+
+    def increment(self, name: str, amount: float, labels: dict[str, str]) -> None:
+        """Add `amount` to a counter."""
+
+    def flush(self) -> None:
+        """Export what was recorded so far, if the sink needs to."""
+
+
+class PrometheusSink(MetricsSink):
+    """
+    Aggregates metrics in memory and renders them in the Prometheus text exposition format.
+
+    With a `path` the exposition is (atomically) written to that file on `flush`, in the
+    layout the node_exporter textfile collector reads.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._histograms: dict[tuple[str, tuple], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        bounds = METRICS_BYTES_BUCKETS if name in METRICS_BYTES_HISTOGRAMS else METRICS_DURATION_BUCKETS
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts (made cumulative when rendered), sum, count
+                histogram = self._histograms[key] = [[0] * len(bounds), 0.0, 0]
+            for index, bound in enumerate(bounds):
+                if value <= bound:
+                    histogram[0][index] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    def increment(self, name: str, amount: float, labels: dict[str, str]) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @staticmethod
+    def _labels(labels: tuple, extra: str = "") -> str:
+        pairs = [
+            '{}="{}"'.format(
+                name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            )
+            for name, value in labels
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, [list(h[0]), h[1], h[2]]) for key, h in self._histograms.items())
+
+        lines: list[str] = []
+        previous = None
+        for (name, labels), value in counters:
+            metric = f"podcast_it_{name}_total"
+            if name != previous:
+                lines.append(f"# HELP {metric} {METRIC_DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {metric} counter")
+                previous = name
+            lines.append(f"{metric}{self._labels(labels)} {value:.15g}")
+
+        previous = None
+        for (name, labels), (buckets, total, count) in histograms:
+            metric = f"podcast_it_{name}"
+            if name != previous:
+                lines.append(f"# HELP {metric} {METRIC_DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {metric} histogram")
+                previous = name
+            cumulative = 0
+            bounds = METRICS_BYTES_BUCKETS if name in METRICS_BYTES_HISTOGRAMS else METRICS_DURATION_BUCKETS
+            for bound, bucket in zip(bounds, buckets):
+                cumulative += bucket
+                bucket_labels = self._labels(labels, f'le="{bound:.15g}"')
+                lines.append(f"{metric}_bucket{bucket_labels} {cumulative}")
+            inf_labels = self._labels(labels, 'le="+Inf"')
+            lines.append(f"{metric}_bucket{inf_labels} {count}")
+            lines.append(f"{metric}_sum{self._labels(labels)} {total:.6f}")
+            lines.append(f"{metric}_count{self._labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(temp_path, self.path)
+
+
+class OpenTelemetrySink(MetricsSink):
+    """
+    Forwards metrics to OpenTelemetry instruments of the global meter provider.
+
+    Needs the optional `opentelemetry-api` package; Open WebUI configures the provider
+    and its exporter when its own OpenTelemetry support is enabled.
+    """
+
+    def __init__(self, meter=None) -> None:
+        if meter is None:
+            from opentelemetry import metrics as otel_metrics
+
+            meter = otel_metrics.get_meter("podcast_it")
+        self._meter = meter
+        self._instruments: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _instrument(self, name: str, create: Callable, **kwargs):
+        instrument = self._instruments.get(name)
+        if instrument is None:
+            with self._lock:
+                instrument = self._instruments.get(name)
+                if instrument is None:
+                    instrument = self._instruments[name] = create(
+                        f"podcast_it_{name}", description=METRIC_DESCRIPTIONS.get(name, name), **kwargs
+                    )
+        return instrument
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        unit = "By" if name in METRICS_BYTES_HISTOGRAMS else "s"
+        self._instrument(name, self._meter.create_histogram, unit=unit).record(value, attributes=labels)
+
+    def increment(self, name: str, amount: float, labels: dict[str, str]) -> None:
+        self._instrument(name, self._meter.create_counter).add(amount, attributes=labels)
+
+
+class Metrics:
+    """
+    Process-wide timing spans and counters, fanned out to the registered sinks.
+
+    Spans measure render stages into the `stage_duration_seconds` histogram (label
+    `stage`); counters take free-form labels. Without sinks every call is a no-op
+    apart from reading the clock.
+    """
+
+    def __init__(self) -> None:
+        self.sinks: dict[str, MetricsSink] = {}
+
+    def add_sink(self, name: str, sink: MetricsSink) -> None:
+        """Register `sink` under `name`, replacing a sink registered under the same name."""
+        self.sinks = {**self.sinks, name: sink}
+
+    def remove_sink(self, name: str) -> None:
+        if name in self.sinks:
+            self.sinks = {key: sink for key, sink in self.sinks.items() if key != name}
+
+    def observe(self, stage: str, seconds: float, **labels: str) -> None:
+        """Record that `stage` took `seconds`."""
+        self.record("stage_duration_seconds", seconds, stage=stage, **labels)
+
+    def record(self, name: str, value: float, **labels: str) -> None:
+        """Add an observation to the histogram `name` (a key of `METRIC_DESCRIPTIONS`)."""
+        if self.sinks:
+            for sink in self.sinks.values():
+                sink.observe(name, value, labels)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Add `amount` to the counter `name` (a key of `METRIC_DESCRIPTIONS`)."""
+        if self.sinks:
+            for sink in self.sinks.values():
+                sink.increment(name, amount, labels)
+
+    @contextlib.contextmanager
+    def span(self, stage: str, **labels: str):
+        """Time the body of a `with` block as `stage`, counting it as failed when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.increment("stage_errors", stage=stage, **labels)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def flush(self) -> None:
+        for sink in self.sinks.values():
+            try:
+                sink.flush()
+            except Exception as e:
+                log.warning("Flushing metrics sink %s failed: %s", type(sink).__name__, e)
+
+
+METRICS = Metrics()
+
+
+class LoopLagMonitor:
+    """
+    Samples how late the event loop wakes up a sleeping task.
+
+    Anything blocking the loop (a synchronous upload, a long computation) delays every
+    coroutine of the worker by that long; the delay shows up here as lag. One sampling
+    task runs while at least one podcast is being generated, each sample is recorded
+    in the `event_loop_lag_seconds` histogram and the largest is kept in `max_lag`.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.max_lag = 0.0
+        self._watchers = 0
+        self._task: asyncio.Task | None = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.max_lag = max(self.max_lag, lag)
+            METRICS.record("event_loop_lag_seconds", lag)
+
+    @contextlib.asynccontextmanager
+    async def watch(self):
+        """Sample the running loop for the duration of an `async with` block."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._watchers = 0
+            self._task = loop.create_task(self._sample())
+        self._watchers += 1
+        try:
+            yield self
+        finally:
+            self._watchers -= 1
+            if self._watchers == 0 and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+
+LOOP_LAG_MONITOR = LoopLagMonitor(LOOP_LAG_SAMPLE_INTERVAL)
+
+
+class JobProgress:
+    """Progress of one podcast generation, updated by the render and reported by `ProgressReporter`."""
+
+    def __init__(self, emitter: Callable | None, estimate: RenderEstimate, segments_total: int) -> None:
+        """
+        Args:
+            emitter: The job's `__event_emitter__`; without one nothing is reported.
+            estimate: Pre-flight prediction the progress is measured against.
+            segments_total: Number of planned segments.
+        """
+        self.emitter = emitter
+        self.estimate = estimate
+        self.started = time.monotonic()
+        self.segments_total = segments_total
+        self.segments_done = 0
+        self.audio_seconds = 0.0
+        self.last_report = self.started
+        self.reporting: asyncio.Task | None = None
+
+    def restart(self) -> None:
+        """Start counting again for a new render pass."""
+        self.segments_done = 0
+        self.audio_seconds = 0.0
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def describe(self) -> str:
+        """Return the status text for the current progress."""
+        elapsed = self.elapsed()
+        # Progress by audio received against the predicted length; until the first
+        # audio arrives the remaining time is the predicted one
+        audio_total = self.estimate.audio_seconds
+        progress = min(self.audio_seconds / audio_total, 0.99) if audio_total else 0.0
+        if progress > 0:
+            remaining = elapsed * (1 - progress) / progress
+        else:
+            remaining = max(self.estimate.synthesis_seconds - elapsed, 0)
+        return (
+            f"Generating podcast audio... {progress:.0%} done, {self.segments_done} of {self.segments_total} segments, "
+            f"{int(self.audio_seconds)}s of audio received, about {int(remaining)}s left (elapsed time: {int(elapsed)}s)"
+        )
+
+
+class ProgressReporter:
+    """
+    Reports the progress of every generating podcast from one shared ticker.
+
+    Jobs only update counters on their `JobProgress`; a single task per process wakes
+    up every `TICK_SECONDS` and emits one status per job at most every `interval`
+    seconds, coalescing everything that happened in between. A status still being
+    sent is not stacked with a new one, so a slow client never queues up updates.
+    Jobs without an event emitter are never tracked.
+    """
+
+    TICK_SECONDS = 1.0
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.jobs: set[JobProgress] = set()
+        self._task: asyncio.Task | None = None
+
+    def track(self, progress: JobProgress) -> None:
+        """Start reporting `progress` (from the event loop)."""
+        if progress.emitter is None:
+            return
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self.jobs = set()
+            self._task = loop.create_task(self._tick())
+        self.jobs.add(progress)
+
+    def untrack(self, progress: JobProgress) -> None:
+        """Stop reporting `progress`, dropping a status that is still being sent."""
+        if progress not in self.jobs:
+            return
+        self.jobs.discard(progress)
+        if progress.reporting is not None:
+            progress.reporting.cancel()
+        if not self.jobs and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _tick(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.TICK_SECONDS)
+            now = time.monotonic()
+            for progress in self.jobs:
+                if now - progress.last_report < self.interval:
+                    continue
+                if progress.reporting is not None and not progress.reporting.done():
+                    continue
+                progress.last_report = now
+                progress.reporting = loop.create_task(self._report(progress))
+
+    async def _report(self, progress: JobProgress) -> None:
+        try:
+            await progress.emitter({"type": "status", "data": {"description": progress.describe(), "done": False}})
+        except Exception as e:
+            log.error("Progress status failed: %s", e)
+
+
+PROGRESS_REPORTER = ProgressReporter(PROGRESS_STATUS_INTERVAL)
+
+
+class JobRegistry:
+    """
+    Persistent registry of detached podcast jobs: render fingerprint -> job record.
+
+    Records are small JSON files replaced atomically, like `RenderIndex` entries, so they
+    survive restarts and are shared by all workers using the data directory. A record
+    holds the job's state ("queued", "running", "completed" or "failed"), owner, last
+    status description, timestamps and the process running it; the tasks of this
+    process's jobs are held in `tasks` until they finish. A queued or running job is
+    reported as "interrupted" once its process is gone: known for this process and
+    other processes on the same host, otherwise when it hasn't updated its record
+    within `JOB_HEARTBEAT_TIMEOUT`. Records are removed after `CHECKPOINT_MAX_AGE_SECONDS`.
+    """
+
+    ACTIVE_STATES = ("queued", "running")
+
+    def __init__(self, directory: str) -> None:
+        """
+        Args:
+            directory: Directory holding the job records (created on first write).
+        """
+        self.directory = directory
+        # Tells this process's records from those of an earlier process with the same PID
+        self.token = uuid.uuid4().hex
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _load(self, job_id: str) -> dict | None:
+        try:
+            with open(self._path(job_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _is_alive(self, job_id: str, record: dict) -> bool:
+        if record.get("token") == self.token:
+            task = self.tasks.get(job_id)
+            return task is not None and not task.done()
+        if record.get("host") == socket.gethostname():
+            try:
+                os.kill(record["pid"], 0)
+            except ProcessLookupError:
+                return False
+            except (OSError, KeyError):
+                pass
+        return time.time() - record.get("updated_at", 0) < JOB_HEARTBEAT_TIMEOUT
+
+    def get(self, job_id: str) -> dict | None:
+        """Return the record of `job_id`, with state "interrupted" if its process is gone."""
+        record = self._load(job_id)
+        if record is not None and record["state"] in self.ACTIVE_STATES and not self._is_alive(job_id, record):
+            record["state"] = "interrupted"
+        return record
+
+    def update(self, job_id: str, **fields) -> None:
+        """Merge `fields` into the record of `job_id` (created if missing), owned by this process."""
+        now = time.time()
+        record = self._load(job_id) or {"created_at": now}
+        record.update(fields, updated_at=now, host=socket.gethostname(), pid=os.getpid(), token=self.token)
+        os.makedirs(self.directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.directory, suffix=".tmp", delete=False, encoding="utf-8"
+        ) as f:
+            json.dump(record, f)
+        os.replace(f.name, self._path(job_id))
+
+    async def submit(self, job_id: str, user_id: str, job: Coroutine) -> asyncio.Task:
+        """Record `job` as queued (in `IO_EXECUTOR`) and run it in the background of this process."""
+        try:
+            await run_io(self._prune)
+            await run_io(
+                self.update,
+                job_id,
+                state="queued",
+                user_id=user_id,
+                created_at=time.time(),
+                status="Waiting for a free generation slot",
+                error=None,
+            )
+        except BaseException:
+            job.close()
+            raise
+        task = asyncio.create_task(job)
+        self.tasks[job_id] = task
+
+        def forget(done_task: asyncio.Task) -> None:
+            if self.tasks.get(job_id) is done_task:
+                del self.tasks[job_id]
+
+        task.add_done_callback(forget)
+        return task
+
+    def _prune(self) -> None:
+        cutoff = time.time() - CHECKPOINT_MAX_AGE_SECONDS
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(entry.path)
+
+
+JOB_REGISTRY = JobRegistry(os.path.join(PODCAST_IT_DATA_DIR, "jobs_registry"))
+
+
+class Action:
+    class Valves(BaseModel):
+        # fmt: off
+        API_KEY: str = Field(default=DEFAULT_GEMINI_API_KEY_PLACEHOLDER, description="Your Gemini API Key")
+        # fmt:on
+        tts_model: str = "gemini-2.5-flash-preview-tts"
+        custom_style_instructions: str = "Read aloud in a warm, welcoming tone"
+        speaker_1: str = Field(
+            default="Zephyr (Female)",
+            description="Select the voice for Speaker 1",
+            json_schema_extra={"enum": list(SPEAKERS.keys())},
+        )
+        speaker_2: str = Field(
+            default="Puck (Male)",
+            description="Select the voice for Speaker 2",
+            json_schema_extra={"enum": list(SPEAKERS.keys())},
+        )
+        podcast_output_language: str = Field(
+            default="English (United States)",
+            description="Select the output language for the podcast. (Only GA languages are listed)",
+            json_schema_extra={"enum": list(LANGUAGES.keys())},
+        )
+        save_transcript: str = Field(
+            default="Yes",
+            description="Whether to save the processed Podcast transcript or not",
+            json_schema_extra={"enum": ["Yes", "No"]},
+        )
+        segment_max_chars: int = Field(
+            default=3000,
+            description="Maximum characters per synthesized segment. Long transcripts are split at speaker-turn boundaries",
+        )
+        adaptive_segments: str = Field(
+            default="Yes",
+            description="Size segments (up to segment_max_chars) from the measured latency and failure rate of the TTS model, for the fastest render",
+            json_schema_extra={"enum": ["Yes", "No"]},
+        )
+        max_concurrent_segments: int = Field(
+            default=4,
+            description="Maximum number of segments synthesized concurrently",
+        )
+        audio_memory_budget_mb: int = Field(
+            default=16,
+            description="Audio a podcast may keep in memory while it is stitched and encoded, in MB; past it the buffers spill to temp files (0 keeps them all on disk)",
+        )
+        segment_cache_max_mb: int = Field(
+            default=512,
+            description="Disk space for reusing synthesized segments across renders, in MB (0 disables the cache)",
+        )
+        reuse_identical_renders: str = Field(
+            default="Yes",
+            description="Return the previously saved podcast when the same transcript is rendered again with the same settings",
+            json_schema_extra={"enum": ["Yes", "No"]},
+        )
+        output_format: str = Field(
+            default="WAV",
+            description="Audio format of the podcast. FLAC is lossless, Opus and MP3 are lossy but much smaller",
+            json_schema_extra={"enum": list(OUTPUT_FORMATS.keys())},
+        )
+        audio_cleanup: str = Field(
+            default="Yes",
+            description="Match the loudness of segments, trim long silences at their edges and crossfade the joins (needs numpy)",
+            json_schema_extra={"enum": ["Yes", "No"]},
+        )
+        max_concurrent_jobs: int = Field(
+            default=0,
+            description="Maximum number of podcasts generated at the same time across all users (0 disables the limit)",
+        )
+        max_concurrent_jobs_per_user: int = Field(
+            default=0,
+            description="Maximum number of podcasts generated at the same time for a single user (0 disables the limit)",
+        )
+        requests_per_minute: int = Field(
+            default=0,
+            description="Gemini requests allowed per minute across all users, match your API quota (0 disables the limit)",
+        )
+        characters_per_minute: int = Field(
+            default=0,
+            description="Transcript characters sent to Gemini per minute across all users (0 disables the limit)",
+        )
+        max_rate_limit_retries: int = Field(
+            default=5,
+            description="How often a segment is retried with exponential backoff after a rate-limit error",
+        )
+        max_resume_attempts: int = Field(
+            default=2,
+            description="How often a failed render is automatically resumed from its last completed segment",
+        )
+        max_estimated_minutes: int = Field(
+            default=0,
+            description="Budget for the estimated generation time of a podcast, in minutes, checked before any Gemini request (0 disables the budget)",
+        )
+        over_budget_jobs: str = Field(
+            default="Reject",
+            description="What happens to podcasts estimated to exceed max_estimated_minutes: rejected, or deferred behind every podcast within budget",
+            json_schema_extra={"enum": ["Reject", "Defer"]},
+        )
+        progressive_playback: str = Field(
+            default="No",
+            description="Publish the podcast in parts as soon as segments are ready, so playback can start before the whole episode is generated",
+            json_schema_extra={"enum": ["Yes", "No"]},
+        )
+        detached_jobs: str = Field(
+            default="No",
+            description="Return right away and generate the podcast in the background: the result appears in the chat when it is ready, even after leaving the page, and clicking again shows the job's status",
+            json_schema_extra={"enum": ["Yes", "No"]},
+        )
+        metrics_sink: str = Field(
+            default="None",
+            description="Where to export stage timings and counters: Prometheus text format in <DATA_DIR>/cache/podcast_it/metrics.prom, or OpenTelemetry (needs opentelemetry-api)",
+            json_schema_extra={"enum": ["None", "Prometheus", "OpenTelemetry"]},
+        )
+        upload_part_size_mb: int = Field(
+            default=16,
+            description="With S3 storage, audio files larger than this are uploaded in parts of this size, in MB (minimum 5, 0 uploads every file in one request)",
+        )
+        max_concurrent_upload_parts: int = Field(
+            default=4,
+            description="Parts of a multipart upload sent at the same time",
+        )
+        max_upload_part_retries: int = Field(
+            default=3,
+            description="How often a failed upload part is retried with exponential backoff before the upload is aborted",
+        )
+
+    def __init__(self, file_store: LocalFileStore | None = None) -> None:
+        """
+        Initialize the Action class with default Valves configuration.
+
+        Args:
+            file_store: Saves files into a local directory instead of Open WebUI's
+                        `Storage` and files table (batch renderer).
+        """
+        self.valves = self.Valves()
+        self._file_store = file_store
+        self._segment_cache: SegmentCache | None = None
+        self._render_index: RenderIndex | None = None
+        # The segment cache is created on first use, in an `IO_EXECUTOR` thread
+        self._segment_cache_lock = threading.Lock()
+        self._api_key_in_use: str | None = None
+
+    def _validate_transcript_format(self, text: str) -> ParsedTranscript:
+        """
+        Validate and parse transcript format with detailed feedback.
+
+        Parses the transcript to ensure it follows the required format for podcast generation.
+        Validates speaker line formatting, counts speaker occurrences, and extracts style
+        instructions if present. Falls back to default style instructions when none provided.
+
+        Expected format:
+            {Style instructions} (optional)
+            Speaker 1: dialogue
+            Speaker 2: dialogue
+            ...
+
+        Args:
+            text: The raw transcript text to validate and parse.
+
+        Returns:
+            ParsedTranscript: Validation results and parsed data, readable as the dictionary:
+                {
+                    "valid": bool - Whether the transcript is valid
+                    "error": str | None - Error message if validation failed
+                    "warning": str | None - Warning message for non-critical issues
+                    "style": str - Style instructions (user-provided or default)
+                    "dialogues": list[dict] - Parsed speaker dialogues [{"speaker": "1"|"2", "text": str}, ...]
+                    "has_style": bool - Whether style instructions were found
+                    "speaker_1_count": int - Number of Speaker 1 lines
+                    "speaker_2_count": int - Number of Speaker 2 lines
+                }
+        """
+        log.debug("Starting transcript validation")
+        log.debug("Transcript length: %d characters", len(text) if text else 0)
+
+        return parse_transcript(text, self.valves.custom_style_instructions)
+
+    def _segment_max_chars(
+        self,
+        planner: SegmentPlanner,
+        first_segment_max_chars: int | None = None,
+        start: int = 0,
+    ) -> int:
+        """
+        Choose the segment size limit for the dialogue lines from `start` on.
+
+        With `adaptive_segments`, the limit is chosen from the measured latency and
+        failure rate of `tts_model` (`SEGMENT_TIMING`) for the shortest expected
+        wall-clock time at `max_concurrent_segments` and `requests_per_minute`, with
+        `segment_max_chars` as the upper bound. Otherwise it is `segment_max_chars`.
+
+        Args:
+            planner: Segment planner over the parsed dialogues.
+            first_segment_max_chars: Lower limit for the first segment only, so it
+                                     finishes quickly (progressive playback).
+            start: Index of the first dialogue line to plan, for re-planning the tail.
+
+        Returns:
+            int: Size limit of a segment in characters (style prefix not counted).
+        """
+        max_chars = max(1, self.valves.segment_max_chars)
+        if self.valves.adaptive_segments == "Yes":
+            max_chars, expected_seconds = planner.choose_max_chars(
+                SEGMENT_TIMING.estimator(self.valves.tts_model),
+                upper=max_chars,
+                concurrency=max(1, self.valves.max_concurrent_segments),
+                requests_per_minute=self.valves.requests_per_minute,
+                first_segment_max_chars=first_segment_max_chars,
+                start=start,
+            )
+            log.debug("Segment size %s characters, expecting %.1fs of synthesis", max_chars, expected_seconds)
+        return max_chars
+
+    def _plan_segments(
+        self,
+        planner: SegmentPlanner,
+        first_segment_max_chars: int | None = None,
+        start: int = 0,
+    ) -> list[tuple[int, int]]:
+        """
+        Split the dialogue lines from `start` on into segments for independent synthesis.
+
+        Segments are packed up to the limit from `_segment_max_chars`.
+
+        Args:
+            planner: Segment planner over the parsed dialogues.
+            first_segment_max_chars: Lower limit for the first segment only, so it
+                                     finishes quickly (progressive playback).
+            start: Index of the first dialogue line to plan.
+
+        Returns:
+            list[tuple[int, int]]: `(start, end)` dialogue line ranges in playback order,
+                                   see `SegmentPlanner.text`.
+        """
+        max_chars = self._segment_max_chars(planner, first_segment_max_chars, start)
+        segment_ranges = planner.pack(max_chars, first_segment_max_chars, start)
+
+        log.debug(
+            "Planned %s segments from %s dialogues (max %s characters each)",
+            len(segment_ranges),
+            len(planner.dialogues) - start,
+            max_chars,
+        )
+        return segment_ranges
+
+    def _estimate_render(
+        self, planner: SegmentPlanner, segment_ranges: list[tuple[int, int]]
+    ) -> RenderEstimate:
+        """
+        Predict the audio length and synthesis time of a render before it starts.
+
+        Audio length comes from the characters and speaker turns of the transcript in
+        its language, synthesis time from simulating the planned segments on
+        `max_concurrent_segments` workers, both with the measurements in `SEGMENT_TIMING`.
+        Segments served from the checkpoints or the segment cache are not discounted.
+
+        Args:
+            planner: Segment planner over the parsed dialogues.
+            segment_ranges: Planned segments, see `_plan_segments`.
+
+        Returns:
+            RenderEstimate: The prediction.
+        """
+        characters = planner.dialogue_chars()
+        turns = len(planner.dialogues)
+        return RenderEstimate(
+            characters=characters,
+            turns=turns,
+            segments=len(segment_ranges),
+            audio_seconds=SEGMENT_TIMING.audio_seconds(
+                self.valves.tts_model, LANGUAGES[self.valves.podcast_output_language], characters, turns
+            ),
+            synthesis_seconds=planner.makespan(
+                segment_ranges,
+                SEGMENT_TIMING.estimator(self.valves.tts_model),
+                max(1, self.valves.max_concurrent_segments),
+                self.valves.requests_per_minute,
+            ),
+        )
+
+    def _configure_metrics(self) -> None:
+        """Register the metrics sink selected in `metrics_sink`, dropping the other built-in one."""
+        selected = self.valves.metrics_sink
+        if selected == "OpenTelemetry" and importlib.util.find_spec("opentelemetry") is None:
+            log.warning("OpenTelemetry metrics need the 'opentelemetry-api' package, metrics disabled")
+            selected = "None"
+        for name in ("Prometheus", "OpenTelemetry"):
+            if name != selected:
+                METRICS.remove_sink(name)
+        if selected == "Prometheus" and selected not in METRICS.sinks:
+            METRICS.add_sink(selected, PrometheusSink(METRICS_TEXTFILE))
+        elif selected == "OpenTelemetry" and selected not in METRICS.sinks:
+            METRICS.add_sink(selected, OpenTelemetrySink())
+
+    def _get_segment_cache(self) -> SegmentCache | None:
+        """
+        Return the segment cache, creating it on first use.
+
+        Creating it scans the cache directory to rebuild the LRU order, so renders call
+        it in `IO_EXECUTOR`.
+
+        Returns:
+            SegmentCache | None: The cache, or None when disabled via `segment_cache_max_mb`.
+        """
+        max_bytes = self.valves.segment_cache_max_mb * 1024 * 1024
+        if max_bytes <= 0:
+            return None
+        with self._segment_cache_lock:
+            if self._segment_cache is None:
+                self._segment_cache = SegmentCache(
+                    os.path.join(PODCAST_IT_DATA_DIR, "segments"), max_bytes
+                )
+        self._segment_cache.max_bytes = max_bytes
+        return self._segment_cache
+
+    def _open_checkpoints(self, job_id: str) -> SegmentCache:
+        """
+        Open the checkpoint spool of a render job, pruning abandoned jobs first.
+
+        Scans and may delete whole directories, so renders call it in `IO_EXECUTOR`.
+
+        Checkpoints use the `SegmentCache` entry format in a per-job directory without
+        a size bound; the directory is removed once the podcast is saved. Jobs that
+        were never completed are removed after `CHECKPOINT_MAX_AGE_SECONDS`.
+
+        Args:
+            job_id: Render fingerprint identifying the job.
+
+        Returns:
+            SegmentCache: Checkpoint store holding the job's completed segments.
+        """
+        jobs_dir = os.path.join(PODCAST_IT_DATA_DIR, "jobs")
+        os.makedirs(jobs_dir, exist_ok=True)
+        cutoff = time.time() - CHECKPOINT_MAX_AGE_SECONDS
+        for entry in os.scandir(jobs_dir):
+            if entry.is_dir() and entry.name != job_id and entry.stat().st_mtime < cutoff:
+                log.debug("Removing abandoned checkpoints of job %s", entry.name[:12])
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+        checkpoints = SegmentCache(os.path.join(jobs_dir, job_id), max_bytes=sys.maxsize)
+        if checkpoints.stats()["entries"]:
+            log.info(
+                "Found %s checkpointed segments for job %s",
+                checkpoints.stats()["entries"],
+                job_id[:12],
+            )
+        return checkpoints
 
-                # Check for empty dialogues
-                if not content:
-                    result["error"] = (
-                        f"Line {line_num}: Speaker {speaker_num} has no dialogue"
-                    )
-                    return result
+    def _get_render_index(self) -> RenderIndex:
+        """Return the render index, creating it on first use."""
+        if self._render_index is None:
+            self._render_index = RenderIndex(os.path.join(PODCAST_IT_DATA_DIR, "renders"))
+        return self._render_index
 
-                dialogues.append({"speaker": speaker_num, "text": content})
-            else:
-                # Non speaker line
-                if not first_speaker_found:
-                    # Before first speaker = style instructions
-                    # style_lines = line
-                    style_lines.append(line)
-                else:
-                    # After speakers = malformed
-                    result["warning"] = (
-                        f"Line {line_num}: Unexpected text after speakers started: '{line[:50]}...'"
-                    )
+    def _render_fingerprint(self, parsed_transcript: ParsedTranscript, user_id: str) -> str:
+        """
+        Fingerprint a render request from the parsed transcript and output-affecting valves.
 
-        # Count speakers
-        speaker_1_count = sum(1 for d in dialogues if d["speaker"] == "1")
-        speaker_2_count = sum(1 for d in dialogues if d["speaker"] == "2")
+        Args:
+            parsed_transcript: Result of `_validate_transcript_format`.
+            user_id: User requesting the render.
 
-        result["speaker_1_count"] = speaker_1_count
-        result["speaker_2_count"] = speaker_2_count
+        Returns:
+            str: Fingerprint used as the `RenderIndex` key.
+        """
+        render_settings = {
+            "speaker_1": self.valves.speaker_1,
+            "speaker_2": self.valves.speaker_2,
+            "podcast_output_language": self.valves.podcast_output_language,
+            "tts_model": self.valves.tts_model,
+            "custom_style_instructions": self.valves.custom_style_instructions,
+            "save_transcript": self.valves.save_transcript,
+            "output_format": self.valves.output_format,
+            "audio_cleanup": self.valves.audio_cleanup,
+        }
+        return RenderIndex.fingerprint(parsed_transcript, render_settings, user_id)
 
-        # Validation checks
-        if len(dialogues) == 0:
-            result["error"] = (
-                "No speaker dialogues found. Expected format:\nSpeaker 1: text\nSpeaker 2: text"
-            )
-            return result
+    def _find_previous_render(self, fingerprint: str, user_id: str) -> list[SavedFile] | None:
+        """
+        Look up the files of an identical earlier render.
 
-        if len(dialogues) < 2:
-            result["error"] = (
-                f"Need at least 2 speaker lines for a conversation, found only {len(dialogues)}"
-            )
-            return result
+        Every recorded file must still exist and be readable by the user, otherwise the
+        entry is dropped and the podcast is rendered again.
 
-        if speaker_1_count == 0:
-            result["error"] = "Missing Speaker 1 lines"
-            return result
+        Args:
+            fingerprint: Request fingerprint from `_render_fingerprint`.
+            user_id: User requesting the render.
 
-        if speaker_2_count == 0:
-            result["error"] = "Missing Speaker 2 lines"
-            return result
+        Returns:
+            list[SavedFile] | None: Files in citation order, or None if there is no usable render.
+        """
+        render_index = self._get_render_index()
+        file_ids = render_index.get(fingerprint)
+        if not file_ids:
+            return None
 
-        # Style instructions check
-        if style_lines:
-            result["has_style"] = True
-            result["style"] = "\n".join(style_lines)
-        else:
-            result["warning"] = (
-                "No style instructions found. Using default style from settings. Consider adding tone/style guidance before speaker lines to customize the tone of the conversation"
-            )
+        saved_files = self._load_saved_files(file_ids, user_id)
+        if saved_files is None:
+            log.info("Previous render %s is stale, rendering again", fingerprint[:12])
+            render_index.remove(fingerprint)
+            return None
 
-            result["has_style"] = False  # No user-provided style, using default
-            # use the default/custom self.valves.custom_style_instructions
-            result["style"] = self.valves.custom_style_instructions
+        log.info("Found previous render %s with file IDs: %s", fingerprint[:12], file_ids)
+        return saved_files
 
-        # and the success
-        result["valid"] = True
-        result["dialogues"] = dialogues
+    def _load_saved_files(self, file_ids: list[str], user_id: str) -> list[SavedFile] | None:
+        """
+        Look up saved files by ID, as `SavedFile`s to build citations from.
 
-        log.info(
-            f"Transcript validation successful - Speaker 1: {speaker_1_count} lines, Speaker 2: {speaker_2_count} lines, Total dialogues: {len(dialogues)}"
-        )
-        log.debug(f"Has custom style: {result['has_style']}")
+        Args:
+            file_ids: IDs of the files, in citation order.
+            user_id: User the files are shown to.
 
-        return result
+        Returns:
+            list[SavedFile] | None: The files, or None if any of them is gone or not
+                                    readable by the user.
+        """
+        import_open_webui()
+        saved_files = []
+        for file_id in file_ids:
+            file = Files.get_file_by_id(file_id)
+            readers = ((file.access_control or {}).get("read") or {}).get("user_ids", []) if file else []
+            if file is None or (file.user_id != user_id and user_id not in readers):
+                log.info("Saved file %s is gone or not readable by user %s", file_id, user_id)
+                return None
+            meta = file.meta or {}
+            saved_files.append(
+                SavedFile(
+                    id=file.id,
+                    name=meta.get("name", file.filename),
+                    content_type=meta.get("content_type", ""),
+                    size=meta.get("size", 0),
+                    path=file.path,
+                )
+            )
+        return saved_files
 
     async def _generate_podcast(
         self,
@@ -373,199 +3300,683 @@ class Action:
         user_id: str,
         podcast_name: str = "audio",
         __event_emitter__=None,
-    ) -> list[str]:
+        parsed_transcript: ParsedTranscript | None = None,
+        on_audio_part: Callable | None = None,
+        planner: SegmentPlanner | None = None,
+        segment_ranges: list[tuple[int, int]] | None = None,
+        fingerprint: str | None = None,
+    ) -> list[SavedFile]:
         """
         Convert transcript to podcast audio using Gemini TTS API.
 
-        Streams audio generation from the Gemini API with multi-speaker voice configuration.
-        Automatically converts non-WAV formats to WAV. Saves transcript file only after
-        successful audio generation to prevent orphaned files. Supports chunked audio output
-        for longer podcasts.
+        Splits the transcript into segments at speaker-turn boundaries and synthesizes them
+        concurrently (bounded by `max_concurrent_segments`) with multi-speaker voice
+        configuration. Segment sizes follow the measured latency of the TTS model
+        (`_plan_segments`), and segments not yet started are re-planned off the event
+        loop when the measurements move. Response chunks are streamed from the worker threads through a
+        bounded queue and stitched in playback order by an `OrderedSegmentWriter` as they
+        arrive, so memory stays at a few chunks per segment. Stitching and encoding run in
+        `ENCODE_EXECUTOR` (`EncoderStage`), so the event loop only hands off the chunks. Completed segments are
+        checkpointed on disk, so a failed render is resumed (automatically up to
+        `max_resume_attempts` times, or when the user retries) from the segments that
+        are still missing. The result is saved as a single file with a single database
+        record. Uploads and database calls run in `IO_EXECUTOR`, off the event loop. The
+        transcript is uploaded while the audio is synthesized, but its record is only
+        inserted (together with the audio's) after audio generation succeeded;
+        otherwise the uploaded transcript is deleted again so no orphaned files remain.
+
+        With `on_audio_part`, every time more segments are complete in playback order
+        they are saved as a playable part file (from their checkpoints) before the whole
+        episode is done, so playback can start early. The parts are deleted once the
+        episode is saved; after a failed render they stay as the only audio so far.
 
         Args:
             transcript: The formatted transcript text with speaker dialogues.
             user_id: User ID for file ownership and access control.
             podcast_name: Base name for the generated files (default: "audio").
-            __event_emitter__: Optional event emitter for keep-alive status updates.
+            __event_emitter__: Optional event emitter for progress status updates (`PROGRESS_REPORTER`).
+            parsed_transcript: Result of `_validate_transcript_format` for `transcript`.
+                               Parsed here when not provided.
+            on_audio_part: Optional async callback `(saved_file, part_number, ready_segments,
+                           total_segments)` awaited for each published part.
+            planner: Segment planner over `parsed_transcript`, created here when not provided.
+            segment_ranges: Segments planned with `planner` (`_plan_segments`), planned here
+                            when not provided. A resumed job keeps its saved plan instead.
+            fingerprint: Render fingerprint of the request (`_render_fingerprint`), the ID of
+                         its checkpoints. Computed here when not provided.
 
         Returns:
-            list[str]: List of file IDs in order - transcript file (if enabled) followed by
-                      audio file(s). Returns empty list if generation fails.
+            list[SavedFile]: Saved files in order - transcript file (if enabled) followed
+                             by the audio file. Returns empty list if generation fails.
 
         Raises:
             Exception: Propagates any errors from Gemini API or file storage operations.
         """
         log.info(
-            f"Starting podcast generation for user_id: {user_id}, podcast_name: {podcast_name}"
+            "Starting podcast generation for user_id: %s, podcast_name: %s", user_id, podcast_name
         )
-        log.debug(f"Transcript length: {len(transcript)} characters")
-        log.debug(f"TTS Model: {self.valves.tts_model}")
-        log.debug(f"Speakers: {self.valves.speaker_1} & {self.valves.speaker_2}")
-        log.debug(f"Language: {self.valves.podcast_output_language}")
-
-        file_ids = []
+        log.debug("Transcript length: %s characters", len(transcript))
+        log.debug("TTS Model: %s", self.valves.tts_model)
+        log.debug("Speakers: %s & %s", self.valves.speaker_1, self.valves.speaker_2)
+        log.debug("Language: %s", self.valves.podcast_output_language)
+
+        saved_files: list[SavedFile] = []
+        file_records: list[FileForm] = []
+
+        # Parsing, planning and fingerprinting are CPU-bound on long transcripts
+        if parsed_transcript is None:
+            parsed_transcript = await run_io(self._validate_transcript_format, text=transcript)
+        if planner is None:
+            planner = await run_io(SegmentPlanner, parsed_transcript.iter_dialogues(), parsed_transcript.style)
+        first_segment_max_chars = PROGRESSIVE_FIRST_SEGMENT_MAX_CHARS if on_audio_part else None
+        max_concurrent = max(1, self.valves.max_concurrent_segments)
+        output_format = self._resolve_output_format()
 
         # Generate audio first (don't save transcript until we know audio generation succeeds)
-        log.debug("Initializing Gemini client")
-        client = genai.Client(api_key=self.valves.API_KEY)
-
-        # Prepare content
-        contents = [
-            types.Content(role="user", parts=[types.Part.from_text(text=transcript)])
-        ]
-
-        # Prepare speech config
-        speech_config = types.SpeechConfig(
-            multi_speaker_voice_config=types.MultiSpeakerVoiceConfig(
-                speaker_voice_configs=[
-                    types.SpeakerVoiceConfig(
-                        speaker="Speaker 1",
-                        voice_config=types.VoiceConfig(
-                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                voice_name=SPEAKERS[self.valves.speaker_1]
-                            )
-                        ),
-                    ),
-                    types.SpeakerVoiceConfig(
-                        speaker="Speaker 2",
-                        voice_config=types.VoiceConfig(
-                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                voice_name=SPEAKERS[self.valves.speaker_2]
-                            )
-                        ),
-                    ),
-                ]
+        log.debug("Getting pooled Gemini client")
+        with METRICS.span("client_setup"):
+            # The SDK is imported on the first render (unless `warm_up` ran)
+            from google.genai import types
+
+            if self._api_key_in_use not in (None, self.valves.API_KEY):
+                # API key changed in the valves, stop reusing the old key's client
+                GEMINI_RUNTIME.invalidate(self._api_key_in_use)
+            self._api_key_in_use = self.valves.API_KEY
+            client = GEMINI_RUNTIME.client(self.valves.API_KEY)
+            executor = GEMINI_RUNTIME.executor()
+
+            # Speech config is built once per voices/language/model combination
+            generate_content_config = build_generate_content_config(
+                SPEAKERS[self.valves.speaker_1],
+                SPEAKERS[self.valves.speaker_2],
+                LANGUAGES[self.valves.podcast_output_language],
+                self.valves.tts_model,
             )
-        )
 
-        # Generate config
-        generate_content_config = types.GenerateContentConfig(
-            temperature=1, response_modalities=["audio"], speech_config=speech_config
+        # Checkpoints of finished segments, kept until the podcast is saved so a failed
+        # or interrupted render resumes where it stopped (job ID = render fingerprint)
+        job_id = fingerprint or await run_io(self._render_fingerprint, parsed_transcript, user_id)
+        # Pruning abandoned jobs may delete large checkpoint trees
+        checkpoints = await run_io(self._open_checkpoints, job_id)
+        cache = await run_io(self._get_segment_cache)
+        voices = (SPEAKERS[self.valves.speaker_1], SPEAKERS[self.valves.speaker_2])
+        language = LANGUAGES[self.valves.podcast_output_language]
+
+        plan_path = os.path.join(checkpoints.directory, "plan.json")
+
+        def segment_texts_and_keys(ranges: list[tuple[int, int]]) -> tuple[list[str], list[str]]:
+            texts = [planner.text(segment_range) for segment_range in ranges]
+            return texts, [SegmentCache.key(text, voices, language, self.valves.tts_model) for text in texts]
+
+        def load_plan() -> tuple[list[tuple[int, int]], list[str], list[str]]:
+            # A resumed job keeps the plan its checkpoints were synthesized with
+            ranges = planner.load_ranges(plan_path) if checkpoints.stats()["entries"] else None
+            if ranges is None:
+                # Re-planning the tail replaces ranges in place
+                ranges = list(segment_ranges or self._plan_segments(planner, first_segment_max_chars))
+                planner.save_ranges(plan_path, ranges)
+            return ranges, *segment_texts_and_keys(ranges)
+
+        # Planning, segment texts and their cache keys grow with the transcript
+        segment_ranges, segments, segment_keys = await run_io(load_plan)
+        log.info(
+            "Transcript split into %s segments, synthesizing up to %s concurrently",
+            len(segments),
+            max_concurrent,
         )
-
-        # Stream and save audio chunks
-        log.debug("Starting to stream audio chunks from Gemini API")
-
-        # Create a flag to stop the keep-alive task when generation completes
-        generation_complete = asyncio.Event()
-        generation_start_time = time.time()
-        file_index = 0
-
-        # Background task to send periodic keep-alive messages
-        async def send_keepalive():
-            keepalive_interval = 10  # Send every 10 seconds
-            while not generation_complete.is_set():
-                await asyncio.sleep(keepalive_interval)
-                if not generation_complete.is_set():
-                    elapsed_seconds = int(time.time() - generation_start_time)
-                    if __event_emitter__:
-                        try:
-                            await __event_emitter__(
-                                {
-                                    "type": "status",
-                                    "data": {
-                                        "description": f"Generating podcast audio... elapsed time: {elapsed_seconds}s",
-                                        "done": False,
-                                    },
-                                }
-                            )
-                            log.info(f"Keep-alive sent at {elapsed_seconds}s")
-                        except Exception as e:
-                            log.error(f"Keep-alive failed: {e}")
-
-        # Start the keep-alive task in background
-        keepalive_task = (
-            asyncio.create_task(send_keepalive()) if __event_emitter__ else None
+        estimate = await run_io(self._estimate_render, planner, segment_ranges)
+        log.info(
+            "Expecting %.0fs of audio in %.0fs of synthesis",
+            estimate.audio_seconds,
+            estimate.synthesis_seconds,
         )
-        if keepalive_task:
-            log.info("Keep-alive background task started")
-        else:
-            log.warning("Keep-alive task NOT started - no event emitter")
-
-        # Helper function to run the blocking Gemini API call
-        def _run_gemini_generation():
-            """Run the blocking Gemini API call in a thread pool"""
-            chunks = []
-            for chunk in client.models.generate_content_stream(
-                model=self.valves.tts_model,
-                contents=contents,  # type: ignore
-                config=generate_content_config,
+
+        # Segments and audio stitched in the current render pass, reported by the
+        # shared `PROGRESS_REPORTER` ticker
+        progress = JobProgress(__event_emitter__, estimate, len(segments))
+        byte_rates: dict[str, float] = {}
+        # Audio held in memory by this render (spools, queued chunks) across its passes
+        memory_budget = AudioMemoryBudget(self.valves.audio_memory_budget_mb * 1024 * 1024)
+
+        def audio_seconds_of(size: int, mime_type: str) -> float:
+            byte_rate = byte_rates.get(mime_type)
+            if byte_rate is None:
+                parameters = self._parse_audio_mime_type(mime_type)
+                byte_rate = byte_rates[mime_type] = parameters["rate"] * parameters["bits_per_sample"] / 8
+            return size / byte_rate
+
+        # Adaptive sizing re-plans the segments not started yet as timing measurements
+        # come in (`replan` in `render_pass`). Measurements since the last plan:
+        observations_since_plan = 0
+        # Size limit of the current plan (None for a received or resumed plan) and the
+        # expected seconds of a segment of that size when it was chosen
+        plan_max_chars: int | None = None
+        planned_seconds = SEGMENT_TIMING.estimator(self.valves.tts_model)(self.valves.segment_max_chars)
+        replan_not_before = time.monotonic() + ADAPTIVE_REPLAN_MIN_INTERVAL_SECONDS
+        # Held while the tail is rebuilt, so none of its segments is claimed meanwhile
+        plan_lock = asyncio.Lock()
+
+        def replan_due() -> bool:
+            """Cheap check whether the measurements moved enough since the last plan."""
+            if (
+                self.valves.adaptive_segments != "Yes"
+                or observations_since_plan < max_concurrent
+                or time.monotonic() < replan_not_before
             ):
-                chunks.append(chunk)
-            return chunks
+                return False
+            expected = SEGMENT_TIMING.estimator(self.valves.tts_model)(plan_max_chars or self.valves.segment_max_chars)
+            return abs(expected - planned_seconds) >= ADAPTIVE_REPLAN_MIN_CHANGE * planned_seconds
+
+        def build_tail(start: int, max_chars: int) -> tuple[list[tuple[int, int]], list[str], list[str]] | None:
+            """
+            Pack the segments from index `start` on up to `max_chars` and save the plan.
+
+            Runs in `IO_EXECUTOR` while `plan_lock` is held. Returns the new ranges, texts and
+            cache keys of the tail, or None if its boundaries don't move.
+            """
+            tail = planner.pack(max_chars, first_segment_max_chars if start == 0 else None, segment_ranges[start][0])
+            if tail == segment_ranges[start:]:
+                return None
+            texts, keys = segment_texts_and_keys(tail)
+            planner.save_ranges(plan_path, segment_ranges[:start] + tail)
+            return tail, texts, keys
+
+        # The transcript upload overlaps with synthesis
+        transcript_records: list[FileForm] = []
+        transcript_upload = (
+            asyncio.ensure_future(
+                run_io(
+                    self._save_file,
+                    file_bytes=transcript.encode("utf-8"),
+                    user_id=user_id,
+                    name=podcast_name,
+                    mime="text/plain",
+                    records=transcript_records,
+                )
+            )
+            if self.valves.save_transcript == "Yes"
+            else None
+        )
 
-        try:
-            # Run the blocking Gemini call in a thread pool to not block the event loop
-            # Note: client.aio has issues with chunk size and async iteration, so we use ThreadPoolExecutor
-            log.debug("Starting Gemini API call in thread pool")
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                chunks = await loop.run_in_executor(executor, _run_gemini_generation)
-
-            log.debug(f"Gemini API call completed, processing {len(chunks)} chunks")
-
-            # Process all chunks
-            for chunk in chunks:
-                if (
-                    chunk.candidates is None
-                    or chunk.candidates[0].content is None
-                    or chunk.candidates[0].content.parts is None
+        PROGRESS_REPORTER.track(progress)
+
+        loop = asyncio.get_event_loop()
+
+        # Producer: runs the blocking Gemini stream in a worker thread and hands each
+        # chunk's PCM to the event loop through a bounded queue. Blocking on a full
+        # queue applies backpressure, so the stream is never buffered as a whole.
+        def _run_gemini_generation(
+            segment_index: int,
+            segment_text: str,
+            queue: asyncio.Queue,
+            stop_event: threading.Event,
+        ):
+            """Run the blocking Gemini API call for a segment in a thread pool"""
+            contents = [
+                types.Content(
+                    role="user", parts=[types.Part.from_text(text=segment_text)]
+                )
+            ]
+            try:
+                for chunk in client.models.generate_content_stream(
+                    model=self.valves.tts_model,
+                    contents=contents,  # type: ignore
+                    config=generate_content_config,
                 ):
-                    log.debug("Skipping chunk with no content")
-                    continue
+                    if stop_event.is_set():
+                        log.debug("Segment %s: consumer stopped, aborting stream", segment_index)
+                        return
+
+                    if (
+                        chunk.candidates is None
+                        or chunk.candidates[0].content is None
+                        or chunk.candidates[0].content.parts is None
+                    ):
+                        log.debug("Segment %s: skipping chunk with no content", segment_index)
+                        continue
 
-                if (
-                    chunk.candidates[0].content.parts[0].inline_data
-                    and chunk.candidates[0].content.parts[0].inline_data.data
-                ):
                     inline_data = chunk.candidates[0].content.parts[0].inline_data
-                    data_buffer = inline_data.data
-                    file_extension = mimetypes.guess_extension(inline_data.mime_type)  # type: ignore
+                    if inline_data and inline_data.data:
+                        memory_budget.hold(len(inline_data.data))
+                        asyncio.run_coroutine_threadsafe(
+                            queue.put((inline_data.data, inline_data.mime_type)), loop
+                        ).result()
+                    else:
+                        # Text response (shouldn't happen with audio modality)
+                        log.warning(
+                            "Segment %s: unexpected text chunk received: %s",
+                            segment_index,
+                            chunk.text,
+                        )
+            finally:
+                asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
+
+        # Consumer: hands each chunk's PCM to the encoder stage as it arrives
+        async def synthesize(
+            stage: EncoderStage, segment_index: int, segment_text: str
+        ):
+            nonlocal observations_since_plan
+            entries = [
+                store.open_entry(segment_keys[segment_index])
+                for store in (checkpoints, cache)
+                if store
+            ]
+            attempt = 0
+            while True:
+                await JOB_SCHEDULER.acquire_request(len(segment_text))
+                queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_MAX_CHUNKS)
+                stop_event = threading.Event()
+                chunk_count = 0
+                segment_audio_seconds = 0.0
+                request_start = time.perf_counter()
+                producer = loop.run_in_executor(
+                    executor,
+                    _run_gemini_generation,
+                    segment_index,
+                    segment_text,
+                    queue,
+                    stop_event,
+                )
+                try:
+                    while (item := await queue.get()) is not None:
+                        data, mime_type = item
+                        memory_budget.release(len(data))
+                        # Stitching works on raw PCM only, containers can't be concatenated
+                        if mimetypes.guess_extension(mime_type) is not None:
+                            raise ValueError(
+                                f"Unexpected audio format from Gemini: {mime_type}"
+                            )
+                        if chunk_count == 0:
+                            METRICS.observe("first_chunk", time.perf_counter() - request_start)
+                        await stage.write(segment_index, data, mime_type)
+                        for entry in entries:
+                            entry.write(data, mime_type)
+                        chunk_audio_seconds = audio_seconds_of(len(data), mime_type)
+                        segment_audio_seconds += chunk_audio_seconds
+                        progress.audio_seconds += chunk_audio_seconds
+                        chunk_count += 1
+                        METRICS.increment("audio_chunks")
+                        METRICS.increment("audio_bytes", len(data))
+                    await producer
+                    break
+                except BaseException as e:
+                    # Unblock the producer so its worker thread can finish
+                    stop_event.set()
+                    while True:
+                        while not queue.empty():
+                            if (item := queue.get_nowait()) is not None:
+                                memory_budget.release(len(item[0]))
+                        if producer.done():
+                            break
+                        await asyncio.sleep(0.05)
+
+                    # Rate limits are retried, but only before any audio of the
+                    # segment was stitched since it can't be taken back
+                    if (
+                        isinstance(e, Exception)
+                        and is_rate_limit_error(e)
+                        and chunk_count == 0
+                        and attempt < self.valves.max_rate_limit_retries
+                    ):
+                        delay = JOB_SCHEDULER.backoff_delay(attempt)
+                        attempt += 1
+                        METRICS.increment("retries", reason="rate_limit")
+                        log.warning(
+                            "Segment %s rate limited, retry %s in %.1fs",
+                            segment_index,
+                            attempt,
+                            delay,
+                        )
+                        await asyncio.sleep(delay)
+                        continue
 
-                    log.debug(
-                        f"Processing audio chunk {file_index}, MIME type: {inline_data.mime_type}, data size: {len(data_buffer)} bytes"  # type: ignore
-                    )
+                    if isinstance(e, Exception) and not is_rate_limit_error(e):
+                        SEGMENT_TIMING.observe_failure(self.valves.tts_model, len(segment_text))
+                    for entry in entries:
+                        entry.discard()
+                    raise
 
-                    # Convert to WAV if needed
-                    if file_extension is None:
-                        log.debug(f"Converting chunk {file_index} to WAV format")
-                        file_extension = ".wav"
-                        data_buffer = self._convert_to_wav(
-                            inline_data.data,  # type: ignore
-                            inline_data.mime_type,  # type: ignore
+            SEGMENT_TIMING.observe(
+                self.valves.tts_model, len(segment_text), time.perf_counter() - request_start
+            )
+            start, end = segment_ranges[segment_index]
+            SEGMENT_TIMING.observe_audio(
+                self.valves.tts_model, language, planner.dialogue_chars(start, end), end - start, segment_audio_seconds
+            )
+            observations_since_plan += 1
+
+            for entry in entries:
+                entry.commit()
+            progress.segments_done += 1
+            await stage.finish(segment_index)
+            schedule_part(stage)
+            log.debug("Segment %s synthesized - %s chunks", segment_index, chunk_count)
+
+        def copy_stored(writer: OrderedSegmentWriter, segment_index: int) -> tuple[str, int, str] | None:
+            """Stitch a checkpointed or cached segment, run as an operation of the encoder stage."""
+            for source, store in (("checkpoint", checkpoints), ("cache", cache)):
+                stored = store.get(segment_keys[segment_index]) if store else None
+                if stored is not None:
+                    break
+            else:
+                return None
+            mime_type, stored_file = stored
+            size = 0
+            with stored_file:
+                while block := stored_file.read(1024 * 1024):
+                    writer.write(segment_index, block, mime_type)
+                    size += len(block)
+            writer.finish(segment_index)
+            return source, size, mime_type
+
+        async def serve_stored(stage: EncoderStage, segment_index: int) -> str | None:
+            """Stitch a checkpointed or cached segment, returning where it came from (None if neither)."""
+            # Reading the entry is left to the stage's thread along with the encoding
+            stored = await stage.run(copy_stored, stage.writer, segment_index)
+            if stored is None:
+                return None
+            source, size, mime_type = stored
+            progress.audio_seconds += audio_seconds_of(size, mime_type)
+            progress.segments_done += 1
+            schedule_part(stage)
+            METRICS.increment("cache_hits", cache="segment" if source == "cache" else source)
+            log.debug("Segment %s served from %s", segment_index, source)
+            return source
+
+        # One pass over all segments: checkpointed and cached segments are read back
+        # from disk, the rest is claimed in playback order by `max_concurrent` workers.
+        # Once every worker has reported a new timing measurement, the segments after
+        # the last claimed (or stored) one are re-planned with the updated model.
+        async def render_pass(stage: EncoderStage) -> None:
+            progress.restart()
+            reused = {"checkpoint": 0, "cache": 0}
+            pending_segments = []
+            for segment_index in range(len(segments)):
+                source = await serve_stored(stage, segment_index)
+                if source is None:
+                    pending_segments.append(segment_index)
+                else:
+                    reused[source] += 1
+
+            if pending_segments:
+                METRICS.increment("cache_misses", len(pending_segments))
+            if pending_segments and reused["checkpoint"]:
+                description = f"Resuming from segment {pending_segments[0] + 1} of {len(segments)}"
+            elif reused["cache"]:
+                description = f"Reusing {reused['cache']} of {len(segments)} segments from cache"
+            else:
+                description = None
+            if description and __event_emitter__:
+                await __event_emitter__(
+                    {"type": "status", "data": {"description": description, "done": False}}
+                )
+
+            served = set(range(len(segments))).difference(pending_segments)
+            # Re-planned segments must come after every segment served above
+            last_served = max(served, default=-1)
+            # Segments from here on were re-planned and may be stored already
+            replanned_from = len(segments)
+            next_index = 0
+            errors: list[BaseException] = []
+            replan_task: asyncio.Task | None = None
+
+            async def replan() -> None:
+                """
+                Re-plan the segments not claimed yet with the current timing measurements.
+
+                The size limit is chosen in `IO_EXECUTOR` while the workers keep claiming
+                segments; only when it moves by a sqrt(2) step are the tail's ranges, texts
+                and cache keys rebuilt (also in `IO_EXECUTOR`, holding `plan_lock`). Re-plans
+                are at least `ADAPTIVE_REPLAN_MIN_INTERVAL_SECONDS` and
+                `ADAPTIVE_REPLAN_INTERVAL_COST_FACTOR` times the last one's duration apart.
+
+                Moving the boundaries of the tail also moves its segment cache keys: a render
+                of an edited transcript only reuses the segments of the tail when the timing
+                model picks the same limit again. The plan is saved so a resumed render keeps
+                its boundaries.
+                """
+                nonlocal observations_since_plan, plan_max_chars, planned_seconds, replan_not_before
+                nonlocal replanned_from
+                observations_since_plan = 0
+                started = time.perf_counter()
+                start = next_index
+                if not last_served < start < len(segments):
+                    return
+                max_chars = await run_io(
+                    self._segment_max_chars,
+                    planner,
+                    first_segment_max_chars if start == 0 else None,
+                    segment_ranges[start][0],
+                )
+                if max_chars != plan_max_chars:
+                    async with plan_lock:
+                        start = next_index
+                        rebuilt = (
+                            await run_io(build_tail, start, max_chars)
+                            if last_served < start < len(segments)
+                            else None
                         )
+                        if rebuilt is not None:
+                            tail, texts, keys = rebuilt
+                            log.info(
+                                "Re-planned segments %s-%s into %s segments of up to %s characters",
+                                start + 1,
+                                len(segment_ranges),
+                                len(tail),
+                                max_chars,
+                            )
+                            segment_ranges[start:] = tail
+                            segments[start:] = texts
+                            segment_keys[start:] = keys
+                            progress.segments_total = len(segments)
+                            replanned_from = min(replanned_from, start)
+                    plan_max_chars = max_chars
+                planned_seconds = SEGMENT_TIMING.estimator(self.valves.tts_model)(max_chars)
+                replan_not_before = time.monotonic() + max(
+                    ADAPTIVE_REPLAN_MIN_INTERVAL_SECONDS,
+                    ADAPTIVE_REPLAN_INTERVAL_COST_FACTOR * (time.perf_counter() - started),
+                )
+
+            async def worker() -> None:
+                nonlocal next_index, replan_task
+                while True:
+                    if (
+                        (replan_task is None or replan_task.done())
+                        and last_served < next_index < len(segments)
+                        and replan_due()
+                    ):
+                        replan_task = asyncio.ensure_future(replan())
+                    # Waits while the tail is rebuilt
+                    async with plan_lock:
+                        while next_index in served:
+                            next_index += 1
+                        if next_index >= len(segments):
+                            return
+                        segment_index = next_index
+                        next_index += 1
+                    if segment_index >= replanned_from and await serve_stored(stage, segment_index):
+                        continue
+                    try:
+                        await synthesize(stage, segment_index, segments[segment_index])
+                    except Exception as e:
+                        errors.append(e)
+
+            try:
+                await asyncio.gather(*(worker() for _ in range(min(max_concurrent, len(pending_segments)))))
+            finally:
+                if replan_task is not None:
+                    try:
+                        await replan_task
+                    except Exception as e:
+                        log.warning("Re-planning the segments failed: %s", e)
+            if errors:
+                raise errors[0]
+            log.debug("Gemini API calls completed for %s segments", len(segments) - len(served))
+
+        # Progressive playback: segments complete in playback order are re-encoded from
+        # their checkpoints (or the segment cache) into a part file and published while
+        # the rest is still being synthesized. Parts are serialized and coalesced, a
+        # part covers everything that became ready since the previous one.
+        part_tasks: list[asyncio.Task] = []
+        part_lock = asyncio.Lock()
+        ready_segments = 0
+        published_segments = 0
+        published_parts = 0
+        part_files: list[SavedFile] = []
+
+        def encode_part(start: int, end: int) -> AudioSpool | None:
+            part_file = memory_budget.spool()
+            encoder = None
+            for segment_index in range(start, end):
+                key = segment_keys[segment_index]
+                stored = checkpoints.get(key, record_stats=False) or (
+                    cache.get(key, record_stats=False) if cache else None
+                )
+                if stored is None:
+                    part_file.close()
+                    return None
+                mime_type, stored_file = stored
+                with stored_file:
+                    if encoder is None:
+                        encoder = self._create_audio_encoder(part_file, output_format, mime_type)
+                    while block := stored_file.read(1024 * 1024):
+                        encoder.write(block, mime_type)
+                if isinstance(encoder, PcmStitcher):
+                    encoder.end_segment()
+            if encoder is None or not encoder.finalize():
+                part_file.close()
+                return None
+            return part_file
+
+        async def publish_part() -> None:
+            nonlocal published_segments, published_parts
+            async with part_lock:
+                start, end = published_segments, ready_segments
+                if end <= start or end >= len(segments):
+                    return
+                try:
+                    with METRICS.span("publish_part"):
+                        part_file = await loop.run_in_executor(ENCODE_EXECUTOR, encode_part, start, end)
+                        if part_file is None:
+                            log.debug("Segments %s-%s are no longer stored, part skipped", start, end)
+                            return
+                        part_number = published_parts + 1
+                        with part_file:
+                            part = await run_io(
+                                self._save_file,
+                                file_bytes=part_file,
+                                user_id=user_id,
+                                name=f"{podcast_name}_part{part_number}",
+                                mime=OUTPUT_FORMATS[output_format]["mime"],
+                            )
+                    published_segments = end
+                    published_parts = part_number
+                    part_files.append(part)
+                    log.info("Published part %s with segments %s-%s: %s", part_number, start + 1, end, part.id)
+                    await on_audio_part(part, part_number, end, len(segments))
+                except Exception as e:
+                    # A missing preview part never fails the render
+                    log.warning("Publishing segments %s-%s failed: %s", start + 1, end, e)
+
+        def schedule_part(stage: EncoderStage) -> None:
+            nonlocal ready_segments
+            if on_audio_part is None or stage.head <= ready_segments:
+                return
+            ready_segments = stage.head
+            if ready_segments < len(segments):
+                part_tasks.append(asyncio.create_task(publish_part()))
 
-                    # Save audio file with index if multiple chunks
-                    chunk_name = (
-                        f"{podcast_name}_{file_index}"
-                        if file_index > 0
-                        else podcast_name
+        try:
+            # Run the blocking Gemini calls in a thread pool to not block the event loop
+            # Note: client.aio has issues with chunk size and async iteration, so we use ThreadPoolExecutor
+            log.debug("Starting Gemini API calls in thread pool")
+            resume_attempts = max(0, self.valves.max_resume_attempts)
+            synthesis_start = time.perf_counter()
+            for pass_number in range(resume_attempts + 1):
+                audio_file = memory_budget.spool()
+                # Stitching and encoding run in `ENCODE_EXECUTOR`, not on the event loop
+                stage = EncoderStage(
+                    OrderedSegmentWriter(
+                        lambda mime_type: self._create_audio_encoder(
+                            audio_file, output_format, mime_type
+                        ),
+                        memory_budget,
                     )
-                    audio_file_id = self._save_file(
-                        file_bytes=data_buffer,  # type: ignore
-                        user_id=user_id,
-                        name=chunk_name,
-                        mime="audio/wav",
+                )
+                try:
+                    await render_pass(stage)
+                    break
+                except Exception as e:
+                    await stage.close()
+                    await run_io(audio_file.close)
+                    if pass_number == resume_attempts:
+                        METRICS.increment("stage_errors", stage="synthesis")
+                        raise
+                    METRICS.increment("retries", reason="resume")
+                    delay = JOB_SCHEDULER.backoff_delay(pass_number)
+                    log.warning(
+                        "Render pass %s failed (%s: %s), resuming from checkpoints in %.1fs",
+                        pass_number + 1,
+                        type(e).__name__,
+                        e,
+                        delay,
                     )
-                    log.info(
-                        f"Audio chunk {file_index} saved - file_id: {audio_file_id}"
+                    await asyncio.sleep(delay)
+
+            METRICS.observe("synthesis", time.perf_counter() - synthesis_start)
+            # Parts still being published go out before the complete episode
+            await asyncio.gather(*part_tasks)
+            if cache:
+                log.info("Segment cache stats: %s", cache.stats())
+
+            try:
+                # Segments were stitched in playback order as they streamed in
+                with METRICS.span("encode", format=output_format):
+                    audio_size = await stage.finalize()
+                if audio_size:
+                    log.debug(
+                        "Stitched %s segments into a %s bytes %s file",
+                        len(segments),
+                        audio_size,
+                        output_format,
                     )
-                    file_ids.append(audio_file_id)
-                    file_index += 1
-
+                    audio = await run_io(
+                        self._save_file,
+                        file_bytes=audio_file,
+                        user_id=user_id,
+                        name=podcast_name,
+                        mime=OUTPUT_FORMATS[output_format]["mime"],
+                        records=file_records,
+                    )
+                    log.info("Podcast audio uploaded - file_id: %s", audio.id)
+                    saved_files.append(audio)
                 else:
-                    # Text response (shouldn't happen with audio modality)
-                    log.warning(f"Unexpected text chunk received: {chunk.text}")
-
+                    log.warning("Gemini returned no audio data for any segment")
+            finally:
+                await stage.close()
+                # Freeing a long episode's temp file takes a while
+                await run_io(audio_file.close)
         finally:
-            # Signal keep-alive task to stop
-            generation_complete.set()
-            if keepalive_task:
-                await keepalive_task
-                log.debug("Keep-alive background task stopped")
+            if part_tasks:
+                await asyncio.gather(*part_tasks, return_exceptions=True)
+            try:
+                await run_io(SEGMENT_TIMING.save)
+            except OSError as e:
+                log.warning("Saving segment timing measurements failed: %s", e)
+
+            PROGRESS_REPORTER.untrack(progress)
+            log.info(
+                "Audio memory peak %s bytes (budget %s bytes), %s bytes spilled to disk",
+                memory_budget.peak,
+                memory_budget.max_bytes,
+                memory_budget.spilled,
+            )
+            METRICS.record("audio_memory_peak_bytes", memory_budget.peak)
+            if memory_budget.spilled:
+                METRICS.increment("audio_spilled_bytes", memory_budget.spilled)
 
             # Send final elapsed time status
-            final_elapsed_seconds = int(time.time() - generation_start_time)
+            final_elapsed_seconds = int(progress.elapsed())
             if __event_emitter__ and final_elapsed_seconds > 0:
                 try:
                     await __event_emitter__(
@@ -577,78 +3988,109 @@ class Action:
                             },
                         }
                     )
-                    log.info(f"Final elapsed time sent: {final_elapsed_seconds}s")
+                    log.info("Final elapsed time sent: %ss", final_elapsed_seconds)
+                except Exception as e:
+                    log.error("Failed to send final elapsed time: %s", e)
+
+            if transcript_upload is not None and not saved_files:
+                # Without audio the transcript must not stay behind in storage
+                try:
+                    transcript_file = await transcript_upload
                 except Exception as e:
-                    log.error(f"Failed to send final elapsed time: {e}")
+                    log.debug("Transcript upload failed: %s", e)
+                else:
+                    try:
+                        await run_io((self._file_store or Storage).delete_file, transcript_file.path)
+                    except Exception as e:
+                        log.warning("Removing uploaded transcript %s failed: %s", transcript_file.id, e)
 
         # Optionally save transcript after successful audio generation, if enabled
-        if self.valves.save_transcript == "Yes" and len(file_ids) > 0:
+        if transcript_upload is not None and len(saved_files) > 0:
             log.debug("Saving transcript (enabled in valves)")
-            transcript_bytes = transcript.encode("utf-8")
-            transcript_file_id = self._save_file(
-                file_bytes=transcript_bytes,
-                user_id=user_id,
-                name=podcast_name,
-                mime="text/plain",
-            )
-            log.info(f"Transcript saved with file_id: {transcript_file_id}")
-            file_ids.insert(
-                0, transcript_file_id
+            transcript_file = await transcript_upload
+            file_records.extend(transcript_records)
+            log.info("Transcript uploaded with file_id: %s", transcript_file.id)
+            saved_files.insert(
+                0, transcript_file
             )  # Insert at beginning so transcript is first
         elif self.valves.save_transcript == "Yes":
             log.warning("Transcript saving enabled but no audio files were generated")
 
-        log.info(f"Podcast generation complete. Total files generated: {len(file_ids)}")
-        log.debug(f"File IDs: {file_ids}")
+        if file_records:
+            with METRICS.span("db_insert", kind="batch"):
+                await run_io(insert_file_records, user_id, file_records)
+            log.info("Inserted %s file records", len(file_records))
+        if saved_files:
+            # The podcast is stored, its checkpoints are no longer needed
+            await run_io(shutil.rmtree, checkpoints.directory, ignore_errors=True)
+            if part_files:
+                # The whole episode replaces the preview parts, which would otherwise
+                # stay in storage next to it
+                await run_io(self._delete_saved_files, part_files)
+
+        log.info("Podcast generation complete. Total files generated: %s", len(saved_files))
+        log.debug("File IDs: %s", [saved_file.id for saved_file in saved_files])
 
-        return file_ids
+        return saved_files
 
-    def _convert_to_wav(self, audio_data: bytes, mime_type: str) -> bytes:
+    def _resolve_output_format(self) -> str:
         """
-        Convert raw audio data to WAV format by generating a proper WAV file header.
+        Return the configured output format, falling back to WAV when it can't be produced.
 
-        Parses the MIME type to extract sample rate and bit depth, then constructs a
-        valid WAV/RIFF header according to the WAV specification. Defaults to 24000 Hz
-        sample rate and 16-bit PCM encoding if parameters cannot be extracted.
+        Returns:
+            str: A key of `OUTPUT_FORMATS`.
+        """
+        output_format = self.valves.output_format
+        if output_format not in OUTPUT_FORMATS:
+            log.warning("Unknown output format %r, using WAV", output_format)
+            return "WAV"
+        if output_format != "WAV" and importlib.util.find_spec("soundfile") is None:
+            log.warning("%s output needs the 'soundfile' package, using WAV", output_format)
+            return "WAV"
+        return output_format
+
+    def _create_audio_encoder(
+        self, file: BinaryIO, output_format: str, mime_type: str
+    ) -> WavAssembler | SoundFileEncoder | PcmStitcher:
+        """
+        Create the encoder stage that turns streamed PCM into the output format.
 
-        Format specification: http://soundfile.sapp.org/doc/WaveFormat/
+        With `audio_cleanup` enabled (and numpy installed), 16-bit PCM first goes
+        through a `PcmStitcher`.
 
         Args:
-            audio_data: The raw audio data as a bytes object (PCM samples).
-            mime_type: MIME type of the audio data (e.g., "audio/L16;rate=24000").
+            file: Seekable binary file the encoded podcast is written to.
+            output_format: A key of `OUTPUT_FORMATS`.
+            mime_type: MIME type of the PCM (e.g., "audio/L16;rate=24000").
 
         Returns:
-            bytes: Complete WAV file (header + audio data) ready to be saved.
+            WavAssembler | SoundFileEncoder | PcmStitcher: Stage accepting PCM chunks via `write`.
         """
         parameters = self._parse_audio_mime_type(mime_type)
-        bits_per_sample = parameters["bits_per_sample"]
-        sample_rate = parameters["rate"]
-        num_channels = 1
-        data_size = len(audio_data)
-        bytes_per_sample = bits_per_sample // 8  # type: ignore
-        block_align = num_channels * bytes_per_sample
-        byte_rate = sample_rate * block_align  # type: ignore
-        chunk_size = 36 + data_size  # 36 bytes for header fields before data chunk size
-
-        # http://soundfile.sapp.org/doc/WaveFormat/
-
-        header = struct.pack(
-            "<4sI4s4sIHHIIHH4sI",
-            b"RIFF",  # ChunkID
-            chunk_size,  # ChunkSize (total file size - 8 bytes)
-            b"WAVE",  # Format
-            b"fmt ",  # Subchunk1ID
-            16,  # Subchunk1Size (16 for PCM)
-            1,  # AudioFormat (1 for PCM)
-            num_channels,  # NumChannels
-            sample_rate,  # SampleRate
-            byte_rate,  # ByteRate
-            block_align,  # BlockAlign
-            bits_per_sample,  # BitsPerSample
-            b"data",  # Subchunk2ID
-            data_size,  # Subchunk2Size (size of audio data)
-        )
-        return header + audio_data
+        output = OUTPUT_FORMATS[output_format]
+        if output_format == "WAV":
+            encoder = WavAssembler(
+                file,
+                mime_type,
+                bits_per_sample=parameters["bits_per_sample"],  # type: ignore
+                sample_rate=parameters["rate"],  # type: ignore
+            )
+        else:
+            encoder = SoundFileEncoder(
+                file,
+                mime_type,
+                bits_per_sample=parameters["bits_per_sample"],  # type: ignore
+                sample_rate=parameters["rate"],  # type: ignore
+                format=output["format"],
+                subtype=output["subtype"],
+            )
+        if (
+            self.valves.audio_cleanup == "Yes"
+            and parameters["bits_per_sample"] == 16
+            and importlib.util.find_spec("numpy") is not None
+        ):
+            return PcmStitcher(encoder, mime_type, sample_rate=parameters["rate"])  # type: ignore
+        return encoder
 
     def _parse_audio_mime_type(self, mime_type: str) -> dict[str, int | None]:
         """
@@ -695,114 +4137,410 @@ class Action:
 
     def _save_file(
         self,
-        file_bytes: bytes,
+        file_bytes: bytes | memoryview | BinaryIO,
         user_id: str,
         name: str,
         mime: str = "audio/wav",
-    ) -> str:
+        records: "list[FileForm] | None" = None,
+    ) -> SavedFile:
         """
         Save file to Open WebUI storage and create database record with access control.
 
-        Handles both transcript (text/plain) and audio (audio/wav) files using Open WebUI's
+        Handles both transcript (text/plain) and audio (any `OUTPUT_FORMATS` MIME type) files using Open WebUI's
         storage factory pattern, which automatically routes to the configured backend
         (local/S3/GCS/Azure). Creates database records with user-specific access control
         and appropriate metadata tags.
 
         Args:
-            file_bytes: The file content as bytes.
+            file_bytes: The file content as bytes, or a seekable binary file object that is
+                        passed to `Storage.upload_file` as-is (audio spooled to disk).
             user_id: User ID for file ownership and access control.
             name: Base name for the file (without extension).
-            mime: MIME type of the file - "text/plain" or "audio/wav" (default: "audio/wav").
+            mime: MIME type of the file - "text/plain" or an audio MIME type from
+                  `OUTPUT_FORMATS` (default: "audio/wav").
+            records: If given, the database record is appended here for a later
+                     `insert_file_records` call instead of being inserted right away.
+                     Files saved to the `LocalFileStore` get no record.
 
         Returns:
-            str: The unique file ID assigned to the saved file.
+            SavedFile: ID, name, content type, size and storage path of the saved file.
+
+        Raises:
+            RuntimeError: If the database record could not be inserted.
 
         Note:
             - Transcript files are named: "Podcast_Transcript_{name}.txt"
-            - Audio files are named: "Podcast_{name}.wav"
+            - Audio files are named: "Podcast_{name}{extension}" (e.g. ".wav", ".flac")
             - Access is restricted to the creator (and admins)
             - Files are tagged with user ID, file ID, and type for auditing
         """
         # Generate unique ID (common for both text and audio)
         file_id = str(uuid.uuid4())
+        if isinstance(file_bytes, (bytes, bytearray, memoryview)):
+            # A BytesIO over bytes shares their buffer until it is written to
+            file_obj = io.BytesIO(file_bytes)
+            file_size = len(file_bytes)
+        else:
+            file_obj = file_bytes
+            file_size = file_obj.seek(0, io.SEEK_END)
+            file_obj.seek(0)
         log.debug(
-            f"Saving file - name: {name}, mime: {mime}, size: {len(file_bytes)} bytes, user_id: {user_id}, file_id: {file_id}"
+            "Saving file - name: %s, mime: %s, size: %s bytes, user_id: %s, file_id: %s",
+            name,
+            mime,
+            file_size,
+            user_id,
+            file_id,
         )
 
+        if self._file_store is None and not import_open_webui():
+            raise RuntimeError("Open WebUI's file storage is not available")
+        storage = self._file_store or Storage
         if mime == "text/plain":
             # Save transcript as text file
+            kind = "transcript"
             filename = f"Podcast_Transcript_{name}.txt"
-            storage_filename = f"{file_id}_{filename}"
+            tags = {
+                "OpenWebUI-User-Id": user_id,
+                "OpenWebUI-File-Id": file_id,
+                "OpenWebUI-Type": "podcast_transcript",
+            }
+            uploader = None
 
-            # Upload to storage
-            file_obj = io.BytesIO(file_bytes)
-            contents, file_path = Storage.upload_file(
-                file=file_obj,
-                filename=storage_filename,
-                tags={
-                    "OpenWebUI-User-Id": user_id,
-                    "OpenWebUI-File-Id": file_id,
-                    "OpenWebUI-Type": "podcast_transcript",
-                },
+        else:
+            # Save audio file (extension matching the output format)
+            kind = "audio"
+            extension = next(
+                (f["extension"] for f in OUTPUT_FORMATS.values() if f["mime"] == mime),
+                ".wav",
             )
-
-            # Create database record for transcript with access control
-            file_form = FileForm(
-                id=file_id,
-                filename=filename,
-                path=file_path,
-                data={"status": "completed", "content": "Podcast transcript"},
-                meta={
-                    "name": filename,
-                    "content_type": "text/plain",
-                    "size": len(file_bytes),
-                    "data": {"type": "podcast_transcript"},
-                },
-                access_control={"read": {"user_ids": [user_id]}},
+            filename = f"Podcast_{name}{extension}"
+            tags = {
+                "OpenWebUI-User-Id": user_id,
+                "OpenWebUI-File-Id": file_id,
+                "OpenWebUI-Type": "podcast_audio",
+            }
+            part_size = max(5, self.valves.upload_part_size_mb) * 1024 * 1024
+            uploader = (
+                MultipartUploader.for_storage(
+                    storage,
+                    part_size=part_size,
+                    max_concurrent_parts=self.valves.max_concurrent_upload_parts,
+                    max_part_retries=self.valves.max_upload_part_retries,
+                )
+                if self.valves.upload_part_size_mb > 0 and file_size > part_size
+                else None
             )
 
-            file_item = Files.insert_new_file(user_id=user_id, form_data=file_form)
-            log.info(f"Transcript saved - file_id: {file_item.id}")  # type: ignore
-            return file_item.id  # type: ignore
+        # Upload to storage
+        # (factory pattern automatically handles local/S3/GCS/Azure)
+        storage_filename = f"{file_id}_{filename}"
+        with METRICS.span("upload", kind=kind):
+            if uploader:
+                # Large files on S3 go up in parallel parts, retried one by one
+                file_path = uploader.upload(file_obj, storage_filename, tags)
+            else:
+                contents, file_path = storage.upload_file(
+                    file=file_obj, filename=storage_filename, tags=tags
+                )
+        saved_file = SavedFile(id=file_id, name=filename, content_type=mime, size=file_size, path=file_path)
+
+        if self._file_store is not None:
+            # Files in a local directory have no database record
+            log.info("File saved - %s, size: %s bytes", file_path, file_size)
+            return saved_file
+
+        # Create database record with access control
+        file_form = FileForm(
+            id=file_id,
+            filename=filename,
+            path=file_path,
+            data=(
+                {"status": "completed", "content": "Podcast transcript"}
+                if kind == "transcript"
+                else {"status": "completed"}
+            ),
+            meta={
+                "name": filename,
+                "content_type": mime,
+                "size": file_size,
+                "data": {"type": "podcast_transcript" if kind == "transcript" else "generated_podcast"},
+            },
+            access_control={"read": {"user_ids": [user_id]}},
+        )
 
+        if records is None:
+            with METRICS.span("db_insert", kind=kind):
+                insert_file_records(user_id, [file_form])
+            log.info("File saved - file_id: %s, size: %s bytes", file_id, file_size)
         else:
-            # Save audio file (wav)
-            filename = f"Podcast_{name}.wav"
-            storage_filename = f"{file_id}_{filename}"
+            records.append(file_form)
 
-            # Upload to storage
-            # (factory pattern automatically handles local/S3/GCS/Azure)
-            file_obj = io.BytesIO(file_bytes)
-            contents, file_path = Storage.upload_file(
-                file=file_obj,
-                filename=storage_filename,
-                tags={
-                    "OpenWebUI-User-Id": user_id,
-                    "OpenWebUI-File-Id": file_id,
-                    "OpenWebUI-Type": "podcast_audio",
-                },
+        return saved_file
+
+    def _delete_saved_files(self, saved_files: list[SavedFile]) -> None:
+        """
+        Delete files saved by `_save_file` from storage, along with their database records.
+
+        Failures are logged and skipped, a leftover file never fails the podcast.
+
+        Args:
+            saved_files: Files to delete.
+        """
+        storage = self._file_store or Storage
+        for saved_file in saved_files:
+            try:
+                storage.delete_file(saved_file.path)
+                if self._file_store is None:
+                    Files.delete_file_by_id(saved_file.id)
+                log.debug("Deleted file %s", saved_file.id)
+            except Exception as e:
+                log.warning("Deleting file %s failed: %s", saved_file.id, e)
+
+    async def _emit_file_citation(
+        self,
+        __event_emitter__,
+        saved_file: SavedFile,
+        base_url: str,
+        transcript: str,
+        source_name: str | None = None,
+    ) -> None:
+        """
+        Emit a citation for a saved file: an embedded player for audio, the text for transcripts.
+
+        Uses the metadata returned by `_save_file`, so no database read is needed.
+
+        Args:
+            __event_emitter__: Event emitter of the action call.
+            saved_file: The saved file.
+            base_url: Scheme and host of the Open WebUI instance ("" when unknown).
+            transcript: Transcript text shown in the transcript citation.
+            source_name: Overrides the default source name of an audio citation.
+        """
+        # Content download endpoint
+        file_content_url = f"{base_url}/api/v1/files/{saved_file.id}/content"
+
+        # Determine source name and document content based on file type
+        content_type = saved_file.content_type
+        filename = saved_file.name
+
+        if content_type.startswith("text/"):
+            # For transcripts: show actual content + download link
+            name = "📄 Podcast Transcript"
+            document_content = f"Download: {file_content_url}\n\n{transcript}"
+            metadata = {"source": filename}
+
+        elif content_type.startswith("audio/"):
+            # For audio: embed HTML audio player
+            name = source_name or "🎙️ Podcast Audio"
+            document_content = document_content_template(file_content_url, filename, content_type)
+            metadata = {"source": filename, "html": True}
+
+        else:
+            # Generic file
+            name = "📎 Generated File"
+            document_content = file_content_url
+            metadata = {"source": filename}
+
+        citation_event = {
+            "type": "citation",
+            "data": {
+                "source": {"name": name},
+                "document": [document_content],
+                "metadata": [metadata],
+            },
+        }
+
+        await __event_emitter__(citation_event)
+        log.info("Citation emitted - %s, file_id: %s", name, saved_file.id)
+
+    async def _render_podcast(
+        self,
+        transcript: str,
+        parsed_transcript: ParsedTranscript,
+        planner: SegmentPlanner,
+        segment_ranges: list[tuple[int, int]],
+        estimate: RenderEstimate,
+        over_budget: bool,
+        fingerprint: str,
+        user_id: str,
+        __event_emitter__,
+        base_url: str,
+        on_started: Callable | None = None,
+    ) -> list[SavedFile]:
+        """
+        Wait for a `JOB_SCHEDULER` slot, generate the podcast and record it in the render index.
+
+        Args:
+            transcript: The formatted transcript text.
+            parsed_transcript: Result of `_validate_transcript_format` for `transcript`.
+            planner: Segment planner over `parsed_transcript`.
+            segment_ranges: Segments planned for the pre-flight estimate.
+            estimate: Pre-flight estimate from `_estimate_render`.
+            over_budget: Queue the job behind every job within the budget.
+            fingerprint: Render fingerprint (`_render_fingerprint`).
+            user_id: Owner of the job and its files.
+            __event_emitter__: Event emitter for statuses and progressive parts.
+            base_url: Scheme and host of the Open WebUI instance ("" when unknown).
+            on_started: Optional async callback, awaited once the job got its slot.
+
+        Returns:
+            list[SavedFile]: Saved files, as returned by `_generate_podcast`.
+        """
+        JOB_SCHEDULER.configure(
+            max_jobs=self.valves.max_concurrent_jobs,
+            max_jobs_per_user=self.valves.max_concurrent_jobs_per_user,
+            requests_per_minute=self.valves.requests_per_minute,
+            characters_per_minute=self.valves.characters_per_minute,
+        )
+
+        async def report_queue_position(position: int, eta_seconds: float | None):
+            eta = f", estimated wait ~{int(eta_seconds)}s" if eta_seconds is not None else ""
+            await __event_emitter__(
+                {
+                    "type": "status",
+                    "data": {
+                        "description": f"Waiting for a free generation slot - position {position} in queue{eta}",
+                        "done": False,
+                    },
+                }
             )
 
-            # Generate database record with access control
-            file_form = FileForm(
-                id=file_id,
-                filename=filename,
-                path=file_path,
-                data={"status": "completed"},
-                meta={
-                    "name": filename,
-                    "content_type": "audio/wav",
-                    "size": len(file_bytes),
-                    "data": {"type": "generated_podcast"},
-                },
-                access_control={"read": {"user_ids": [user_id]}},
+        queued_at = time.perf_counter()
+        async with JOB_SCHEDULER.job(user_id, on_queued=report_queue_position, deferred=over_budget):
+            METRICS.observe("queue_wait", time.perf_counter() - queued_at)
+            if on_started:
+                await on_started()
+            # generate podcast
+            await __event_emitter__(
+                {
+                    "type": "status",
+                    "data": {
+                        "description": f"Generating Podcast... about {math.ceil(estimate.audio_seconds / 60)} min of audio, ready in about {int(estimate.synthesis_seconds)}s"
+                    },
+                }
+            )
+            await __event_emitter__(
+                {
+                    "type": "notification",
+                    "data": {"type": "info", "content": "Podcast generation started. Sit tight - this might take awhile..."},
+                }
             )
 
-            file_item = Files.insert_new_file(user_id=user_id, form_data=file_form)
-            log.info(
-                f"Audio saved - file_id: {file_item.id}, size: {len(file_bytes)} bytes"  # type: ignore
+            async def publish_audio_part(
+                saved_file: SavedFile, part_number: int, ready_segments: int, total_segments: int
+            ):
+                await self._emit_file_citation(
+                    __event_emitter__,
+                    saved_file,
+                    base_url,
+                    transcript,
+                    source_name=f"🎙️ Podcast Audio - Part {part_number} (segments up to {ready_segments} of {total_segments})",
+                )
+
+            log.info("Starting podcast generation")
+            async with LOOP_LAG_MONITOR.watch():
+                with METRICS.span("generate"):
+                    saved_files = await self._generate_podcast(
+                        transcript=transcript,
+                        user_id=user_id,
+                        __event_emitter__=__event_emitter__,
+                        parsed_transcript=parsed_transcript,
+                        on_audio_part=publish_audio_part if self.valves.progressive_playback == "Yes" else None,
+                        planner=planner,
+                        segment_ranges=segment_ranges,
+                        fingerprint=fingerprint,
+                    )
+        METRICS.increment("jobs", outcome="completed")
+        file_ids = [saved_file.id for saved_file in saved_files]
+        log.info("Podcast generation returned %s file IDs: %s", len(file_ids), file_ids)
+
+        if file_ids and self.valves.reuse_identical_renders == "Yes":
+            self._get_render_index().put(fingerprint, file_ids)
+        return saved_files
+
+    async def _deliver_podcast(
+        self, __event_emitter__, saved_files: list[SavedFile], base_url: str, transcript: str
+    ) -> None:
+        """Send the completion notification and a citation for every saved file."""
+        # Success notification (status already marked done in _generate_podcast)
+        await __event_emitter__(
+            {"type": "notification", "data": {"type": "info", "content": "Podcast generation complete!"}}
+        )
+
+        # Emit citations with links to generated files
+        log.info("Emitting citations for %d files", len(saved_files))
+
+        citations_start = time.perf_counter()
+        for saved_file in saved_files:
+            await self._emit_file_citation(__event_emitter__, saved_file, base_url, transcript)
+
+        METRICS.observe("citations", time.perf_counter() - citations_start)
+
+        # Success
+        log.info("Podcast action completed successfully, %d citations emitted", len(saved_files))
+
+    async def _report_failure(self, __event_emitter__, error: Exception) -> None:
+        """Log a failed podcast generation and tell the user."""
+        log.error(
+            "Podcast generation failed with exception: %s: %s", type(error).__name__, str(error), exc_info=error
+        )
+        await __event_emitter__(
+            {"type": "status", "data": {"description": f"Podcast generation failed with error: {str(error)[:47]}..."}}
+        )
+        await __event_emitter__(
+            {
+                "type": "notification",
+                "data": {"type": "error", "content": f"Podcast generation failed with error: {str(error)[:47]}..."},
+            }
+        )
+
+    async def _run_detached_job(
+        self, fingerprint: str, render: Callable, __event_emitter__, base_url: str, transcript: str
+    ) -> None:
+        """
+        Background part of a detached `action()`: render, deliver and record the outcome.
+
+        Runs after `action()` returned, so the request that started it may be long gone.
+        Statuses, notifications and citations still go through its event emitter (Open
+        WebUI stores them with the chat message), but a failing emit never fails the
+        job. Every status is also recorded in `JOB_REGISTRY`, where it serves as the
+        job's heartbeat and is shown when the job is looked up.
+
+        Args:
+            fingerprint: Render fingerprint, the job's ID in `JOB_REGISTRY`.
+            render: `_render_podcast` with everything but the emitter and `on_started` bound.
+            __event_emitter__: Event emitter of the action call that started the job.
+            base_url: Scheme and host of the Open WebUI instance ("" when unknown).
+            transcript: Transcript text shown in the transcript citation.
+        """
+
+        async def emit(event: dict) -> None:
+            if event["type"] == "status":
+                await run_io(JOB_REGISTRY.update, fingerprint, status=event["data"]["description"])
+            try:
+                await __event_emitter__(event)
+            except Exception as e:
+                log.warning("Delivering a %s event of job %s failed: %s", event["type"], fingerprint[:12], e)
+
+        try:
+            saved_files = await render(
+                __event_emitter__=emit,
+                on_started=functools.partial(run_io, JOB_REGISTRY.update, fingerprint, state="running"),
+            )
+            await run_io(
+                JOB_REGISTRY.update,
+                fingerprint,
+                state="completed",
+                file_ids=[saved_file.id for saved_file in saved_files],
             )
-            return file_item.id  # type: ignore
+            await self._deliver_podcast(emit, saved_files, base_url, transcript)
+        except Exception as e:
+            METRICS.increment("jobs", outcome="failed")
+            await run_io(JOB_REGISTRY.update, fingerprint, state="failed", error=str(e))
+            await self._report_failure(emit, e)
+        finally:
+            METRICS.flush()
 
     # fmt:off
     async def action(
@@ -846,10 +4584,10 @@ class Action:
         """
         # fmt:on
         log.info("Podcast It! action triggered")
-        log.debug(f"__user__ present: {__user__ is not None}, user_id: {__user__.get('id') if __user__ else 'None'}")
-        log.debug(f"__event_emitter__ present: {__event_emitter__ is not None}")
-        log.debug(f"__event_call__ present: {__event_call__ is not None}")
-        log.debug(f"__request__ present: {__request__ is not None}")
+        log.debug("__user__ present: %s, user_id: %s", __user__ is not None, __user__.get('id') if __user__ else 'None')
+        log.debug("__event_emitter__ present: %s", __event_emitter__ is not None)
+        log.debug("__event_call__ present: %s", __event_call__ is not None)
+        log.debug("__request__ present: %s", __request__ is not None)
 
         if not __user__:
             log.error("Missing __user__ parameter, cannot proceed")
@@ -887,15 +4625,19 @@ class Action:
             return None
 
         transcript = messages[-1]["content"]
-        log.debug(f"Extracted transcript from last message, length: {len(transcript)} characters")
+        log.debug("Extracted transcript from last message, length: %s characters", len(transcript))
 
         # validate & parse
         log.debug("Validating transcript format")
-        result = self._validate_transcript_format(text=transcript)
+        self._configure_metrics()
+        with METRICS.span("validate"):
+            result = await run_io(self._validate_transcript_format, text=transcript)
 
         # Handle errors
         if not result["valid"]:
-            log.warning(f"Transcript validation failed: {result['error']}")
+            log.warning("Transcript validation failed: %s", result["error"])
+            METRICS.increment("jobs", outcome="invalid")
+            METRICS.flush()
             await __event_emitter__({
                 "type": "notification",
                 "data": {
@@ -913,7 +4655,7 @@ class Action:
 
         # Handle warning and continue...
         if result["warning"]:
-            log.debug(f"Validation warning: {result['warning']}")
+            log.debug("Validation warning: %s", result["warning"])
             await __event_emitter__({
                 "type": "notification",
                 "data": {
@@ -936,94 +4678,446 @@ class Action:
             }
         })
 
-        # generate podcast
-        await __event_emitter__({
-            "type": "status",
-            "data": {"description": "Generating Podcast..."}
-        })
-        await __event_emitter__({
-            "type": "notification",
-            "data": {"type": "info", "content": "Podcast generation started. Sit tight - this might take awhile..."}
-        })
+        # Construct base URL for the file download links
+        if __request__:
+            base_url = f"{__request__.url.scheme}://{__request__.url.netloc}"
+        else:
+            base_url = ""
+            log.warning("No __request__ available, base URL will be empty")
 
         try:
-            log.info("Starting podcast generation")
-            file_ids = await self._generate_podcast(
-                transcript=transcript,
-                user_id=__user__["id"],
-                __event_emitter__=__event_emitter__
+            # Identical renders return the files saved last time
+            fingerprint = await run_io(self._render_fingerprint, result, __user__["id"])
+            saved_files = (
+                await run_io(self._find_previous_render, fingerprint, __user__["id"])
+                if self.valves.reuse_identical_renders == "Yes"
+                else None
             )
-            log.info(f"Podcast generation returned {len(file_ids)} file IDs: {file_ids}")
+            reused = "Found an identical podcast, reusing it"
+            detached = self.valves.detached_jobs == "Yes"
+            job_record = None
+            if not saved_files and detached:
+                job_record = await run_io(JOB_REGISTRY.get, fingerprint)
+                if job_record and job_record["state"] == "completed" and job_record.get("file_ids"):
+                    # A finished background job shows its files, whether or not renders are reused
+                    saved_files = await run_io(self._load_saved_files, job_record["file_ids"], __user__["id"])
+                    reused = "Your background podcast is ready"
+
+            if saved_files:
+                METRICS.increment("cache_hits", cache="render")
+                METRICS.increment("jobs", outcome="reused")
+                await __event_emitter__({
+                    "type": "status",
+                    "data": {"description": reused, "done": True}
+                })
+            else:
+                if job_record and job_record["state"] in JobRegistry.ACTIVE_STATES:
+                    # Clicking again (e.g. after a page reload) looks the job up
+                    elapsed_seconds = int(time.time() - job_record["created_at"])
+                    await __event_emitter__({
+                        "type": "status",
+                        "data": {"description": f"Podcast job {job_record['state']} for {elapsed_seconds}s - {job_record['status']}", "done": True}
+                    })
+                    await __event_emitter__({
+                        "type": "notification",
+                        "data": {"type": "info", "content": "This podcast is still being generated in the background, it will appear here when it is ready."}
+                    })
+                    return None
+
+                # Pre-flight estimate, before any Gemini request. The plan is handed on to
+                # `_generate_podcast`.
+                planner = await run_io(SegmentPlanner, result.iter_dialogues(), result.style)
+                segment_ranges = await run_io(
+                    self._plan_segments,
+                    planner,
+                    PROGRESSIVE_FIRST_SEGMENT_MAX_CHARS if self.valves.progressive_playback == "Yes" else None,
+                )
+                estimate = await run_io(self._estimate_render, planner, segment_ranges)
+                over_budget = (
+                    self.valves.max_estimated_minutes > 0
+                    and estimate.synthesis_seconds > self.valves.max_estimated_minutes * 60
+                )
+                if over_budget and self.valves.over_budget_jobs != "Defer":
+                    log.warning(
+                        "Rejecting podcast estimated at %.0fs, over the %s minute budget",
+                        estimate.synthesis_seconds,
+                        self.valves.max_estimated_minutes,
+                    )
+                    METRICS.increment("jobs", outcome="rejected")
+                    await __event_emitter__({
+                        "type": "notification",
+                        "data": {
+                            "type": "error",
+                            "content": f"This podcast would take about {math.ceil(estimate.synthesis_seconds / 60)} minutes to generate, "
+                                       f"over the budget of {self.valves.max_estimated_minutes} minutes. Please shorten the transcript."
+                        }
+                    })
+                    return None
+
+                render = functools.partial(
+                    self._render_podcast,
+                    transcript=transcript,
+                    parsed_transcript=result,
+                    planner=planner,
+                    segment_ranges=segment_ranges,
+                    estimate=estimate,
+                    over_budget=over_budget,
+                    fingerprint=fingerprint,
+                    user_id=__user__["id"],
+                    base_url=base_url,
+                )
+                if detached:
+                    # Failed and interrupted jobs resume from their checkpoints
+                    resumed = job_record is not None and job_record["state"] != "completed"
+                    await JOB_REGISTRY.submit(
+                        fingerprint,
+                        __user__["id"],
+                        self._run_detached_job(fingerprint, render, __event_emitter__, base_url, transcript),
+                    )
+                    METRICS.increment("jobs", outcome="detached")
+                    await __event_emitter__({
+                        "type": "status",
+                        "data": {"description": f"{'Resuming the interrupted' if resumed else 'Queued the'} podcast in the background, about {math.ceil(estimate.audio_seconds / 60)} min of audio, ready in about {int(estimate.synthesis_seconds)}s", "done": True}
+                    })
+                    await __event_emitter__({
+                        "type": "notification",
+                        "data": {"type": "info", "content": "Podcast generation continues in the background, even if you leave this page. Click Podcast It! again to check on it."}
+                    })
+                    return None
+
+                saved_files = await render(__event_emitter__=__event_emitter__)
+
+            await self._deliver_podcast(__event_emitter__, saved_files, base_url, transcript)
+            return None
 
-            # Success notification (status already marked done in _generate_podcast)
-            await __event_emitter__({
-                "type": "notification",
-                "data": {"type": "info", "content": "Podcast generation complete!"}
-            })
+        except Exception as e:
+            METRICS.increment("jobs", outcome="failed")
+            await self._report_failure(__event_emitter__, e)
+            return None
 
-            # Emit citations with links to generated files
-            log.info(f"Emitting citations for {len(file_ids)} files")
+        finally:
+            METRICS.flush()
 
-            for idx, file_id in enumerate(file_ids):
-                file = Files.get_file_by_id(file_id)
-                if file and file.meta:
-                    # Construct base URL
-                    if __request__:
-                        base_url = f"{__request__.url.scheme}://{__request__.url.netloc}"
-                    else:
-                        base_url = ""
-                        log.warning("No __request__ available, base URL will be empty")
 
-                    # Content download endpoint
-                    file_content_url = f"{base_url}/api/v1/files/{file_id}/content"
+class BatchItem(NamedTuple):
+    """A transcript of a batch render, with its per-item valve overrides."""
 
-                    # Determine source name and document content based on file type
-                    content_type = file.meta.get("content_type", "")
+    id: str
+    transcript: str
+    overrides: dict[str, str]
 
-                    if content_type.startswith("text/"):
-                        # For transcripts: show actual content + download link
-                        source_name = "📄 Podcast Transcript"
-                        document_content = f"Download: {file_content_url}\n\n{transcript}"
-                        metadata = {"source": file.meta.get("name", file.filename)}
 
-                    elif content_type.startswith("audio/"):
-                        # For audio: embed HTML audio player
-                        source_name = "🎙️ Podcast Audio"
-                        document_content = document_content_template(file_content_url, file.meta.get("name", file.filename))
-                        metadata = {"source": file.meta.get("name", file.filename), "html": True}
+def load_batch_items(path: str) -> list[BatchItem]:
+    """
+    Read the transcripts of a batch render from a directory or a JSONL file.
 
-                    else:
-                        # Generic file
-                        source_name = "📎 Generated File"
-                        document_content = file_content_url
-                        metadata = {"source": file.meta.get("name", file.filename)}
+    In a directory, every `name.txt` is an item with ID `name`, and an optional
+    `name.json` next to it holds its overrides. In a JSONL file, every line is an object
+    with a "transcript", an optional "id" (default: "line-N") and optional overrides.
+    Overrides are valve names from `BATCH_ITEM_OVERRIDES` with one of their values,
+    e.g. `{"speaker_1": "Kore (Female)", "podcast_output_language": "German (Germany)"}`.
 
-                    citation_event = {
-                        "type": "citation",
-                        "data": {
-                            "source": {"name": source_name},
-                            "document": [document_content],
-                            "metadata": [metadata],
-                        }
-                    }
+    Args:
+        path: Directory or JSONL file.
 
-                    await __event_emitter__(citation_event)
-                    log.info(f"Citation emitted - {source_name}, file_id: {file_id}")
-                else:
-                    log.error(f"Failed to retrieve file from database or file has no meta - file_id: {file_id}, file exists: {file is not None}")
+    Returns:
+        list[BatchItem]: Items in file name or line order.
 
-            # Success
-            log.info(f"Podcast action completed successfully, {len(file_ids)} citations emitted")
-            return None
+    Raises:
+        OSError: If the input can't be read.
+        ValueError: On malformed lines, missing transcripts, unknown overrides or
+                    duplicate IDs.
+    """
+    records = []
+    if os.path.isdir(path):
+        for filename in sorted(os.listdir(path)):
+            item_id, extension = os.path.splitext(filename)
+            if extension != ".txt":
+                continue
+            with open(os.path.join(path, filename), encoding="utf-8") as f:
+                transcript = f.read()
+            overrides = {}
+            overrides_path = os.path.join(path, f"{item_id}.json")
+            if os.path.exists(overrides_path):
+                with open(overrides_path, encoding="utf-8") as f:
+                    overrides = json.load(f)
+            records.append({**overrides, "id": item_id, "transcript": transcript})
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Line {line_number} of {path} is not valid JSON: {e}") from None
+                if not isinstance(record, dict):
+                    raise ValueError(f"Line {line_number} of {path} is not a JSON object")
+                records.append({"id": f"line-{line_number}", **record})
+
+    items = []
+    seen_ids = set()
+    for record in records:
+        item_id = str(record.pop("id"))
+        transcript = record.pop("transcript", None)
+        if not isinstance(transcript, str):
+            raise ValueError(f"Batch item {item_id} has no transcript")
+        for key, value in record.items():
+            if key not in BATCH_ITEM_OVERRIDES:
+                raise ValueError(f"Batch item {item_id} overrides unknown setting {key!r}")
+            if value not in BATCH_ITEM_OVERRIDES[key]:
+                raise ValueError(f"Batch item {item_id} has an unknown {key}: {value!r}")
+        if item_id in seen_ids:
+            raise ValueError(f"Duplicate batch item ID {item_id}")
+        seen_ids.add(item_id)
+        items.append(BatchItem(id=item_id, transcript=transcript, overrides=record))
+    return items
+
+
+class BatchManifest:
+    """
+    Append-only JSONL log of finished batch items, so a rerun skips what is done.
 
-        except Exception as e:
-            log.error(f"Podcast generation failed with exception: {type(e).__name__}: {str(e)}", exc_info=True)
-            await __event_emitter__({
-                "type": "status",
-                "data": {"description": f"Podcast generation failed with error: {str(e)[:47]}..."}
-            })
-            await __event_emitter__({
-                "type": "notification",
-                "data": {"type": "error", "content": f"Podcast generation failed with error: {str(e)[:47]}..."}
-            })
-            return None
+    Every line holds an item's ID, render fingerprint (`Action._render_fingerprint`),
+    status ("done" or "failed") and its files or error; the last line of an ID wins.
+    An item only counts as done for the fingerprint it was rendered with, so items whose
+    transcript, overrides or valves changed are rendered again. Lines are synced to disk
+    one by one, and a line cut off by a crash is ignored.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self._needs_newline = False
+        try:
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return
+        for line in content.splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self.entries[entry["id"]] = entry
+        self._needs_newline = bool(content) and not content.endswith("\n")
+
+    def is_done(self, item_id: str, fingerprint: str) -> bool:
+        entry = self.entries.get(item_id)
+        return entry is not None and entry["status"] == "done" and entry["fingerprint"] == fingerprint
+
+    def record(self, entry: dict) -> None:
+        """Append `entry` (with at least "id", "fingerprint" and "status")."""
+        self.entries[entry["id"]] = entry
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            if self._needs_newline:
+                # Terminate the line an interrupted run left behind
+                f.write("\n")
+                self._needs_newline = False
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+# State of a batch worker process, set up by `_init_batch_worker`
+_batch_action: Action | None = None
+_batch_valves: dict = {}
+
+
+def _init_batch_worker(
+    valves: dict,
+    output_directory: str | None,
+    request_bucket: TokenBucket,
+    character_bucket: TokenBucket,
+    log_level: int,
+) -> None:
+    """Prepare a batch worker process: valves, output and the shared rate limits."""
+    global _batch_action, _batch_valves
+    logging.basicConfig(level=log_level, format=BATCH_LOG_FORMAT)
+    JOB_SCHEDULER.request_bucket = request_bucket
+    JOB_SCHEDULER.character_bucket = character_bucket
+    _batch_action = Action(LocalFileStore(output_directory) if output_directory else None)
+    _batch_valves = valves
+
+
+def render_batch_item(item: BatchItem, user_id: str) -> dict:
+    """
+    Render one batch item in a worker process.
+
+    Args:
+        item: The item to render.
+        user_id: Owner of the saved files.
+
+    Returns:
+        dict: "files" (the `SavedFile` fields of each saved file) and "seconds".
+
+    Raises:
+        RuntimeError: If the render failed, with the original error's type and message.
+    """
+    action = _batch_action
+    action.valves = Action.Valves(**{**_batch_valves, **item.overrides})
+    started = time.perf_counter()
+    try:
+        saved_files = asyncio.run(
+            action._generate_podcast(
+                transcript=item.transcript,
+                user_id=user_id,
+                podcast_name=re.sub(r"[^\w.-]+", "_", item.id),
+            )
+        )
+        if not saved_files:
+            raise RuntimeError("Gemini returned no audio")
+    except Exception as e:
+        log.error(
+            "Batch item %s failed: %s: %s", item.id, type(e).__name__, e, exc_info=log.isEnabledFor(logging.INFO)
+        )
+        # Gemini and storage errors don't always survive pickling to the main process
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    return {
+        "files": [saved_file._asdict() for saved_file in saved_files],
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def batch_main(argv: list[str] | None = None) -> int:
+    """
+    Command-line batch renderer, run as `python main.py INPUT --output-dir DIR`.
+
+    Renders every transcript of a directory or JSONL file (see `load_batch_items`) with
+    `Action`'s parsing, synthesis, encoding and storage, one item at a time per worker
+    process. All processes share one requests and characters per minute quota
+    (`SharedTokenBucket`). Files go to a local directory (`LocalFileStore`) or, run
+    inside Open WebUI's environment, to its configured `Storage` with file records.
+    Finished items are logged in a `BatchManifest`, so rerunning the same command after
+    an interruption skips them, and items cut off mid-render resume from their segment
+    checkpoints.
+
+    Args:
+        argv: Command-line arguments (default: `sys.argv[1:]`).
+
+    Returns:
+        int: Exit status, 1 if any item failed and 130 if interrupted.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python main.py",
+        description="Render podcast transcripts in bulk, outside of the chat.",
+    )
+    parser.add_argument(
+        "input", help="Directory of .txt transcripts (with optional .json overrides) or a JSONL file"
+    )
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--output-dir", help="Save the files into this local directory")
+    output.add_argument(
+        "--storage",
+        action="store_true",
+        help="Save the files to Open WebUI's storage with database records (run inside Open WebUI's environment)",
+    )
+    parser.add_argument("--user-id", help="Open WebUI user owning the files, required with --storage")
+    parser.add_argument("--manifest", help="Progress manifest (default: manifest.jsonl in the output directory)")
+    parser.add_argument("--valves", help="JSON file of valve values, as in the plugin settings")
+    parser.add_argument(
+        "--api-key",
+        default=os.environ.get("GEMINI_API_KEY"),
+        help="Gemini API key (default: $GEMINI_API_KEY, or API_KEY from the valves file)",
+    )
+    parser.add_argument("--processes", type=int, default=2, help="Worker processes rendering at the same time")
+    parser.add_argument(
+        "--requests-per-minute", type=int, help="Gemini requests per minute across all processes (default: valve)"
+    )
+    parser.add_argument(
+        "--characters-per-minute", type=int, help="Transcript characters per minute across all processes (default: valve)"
+    )
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log the progress of every render")
+    args = parser.parse_args(argv)
+
+    if args.storage and not import_open_webui():
+        parser.error("--storage needs Open WebUI, run the batch inside its environment")
+    if args.storage and not args.user_id:
+        parser.error("--storage needs --user-id")
+    if args.storage and not args.manifest:
+        parser.error("--storage needs --manifest")
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=log_level, format=BATCH_LOG_FORMAT)
+
+    try:
+        valves = {}
+        if args.valves:
+            with open(args.valves, encoding="utf-8") as f:
+                try:
+                    valves = json.load(f)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{args.valves} is not valid JSON: {e}") from None
+        if args.api_key:
+            valves["API_KEY"] = args.api_key
+        if args.requests_per_minute is not None:
+            valves["requests_per_minute"] = args.requests_per_minute
+        if args.characters_per_minute is not None:
+            valves["characters_per_minute"] = args.characters_per_minute
+        base_valves = Action.Valves(**valves)
+        items = load_batch_items(args.input)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if base_valves.API_KEY == DEFAULT_GEMINI_API_KEY_PLACEHOLDER:
+        parser.error("No Gemini API key, pass --api-key or set GEMINI_API_KEY")
+
+    user_id = args.user_id or "batch"
+    manifest = BatchManifest(args.manifest or os.path.join(args.output_dir, "manifest.jsonl"))
+    failed = 0
+    pending: list[tuple[BatchItem, str]] = []
+    action = Action()
+    for item in items:
+        action.valves = Action.Valves(**{**valves, **item.overrides})
+        parsed_transcript = action._validate_transcript_format(text=item.transcript)
+        if not parsed_transcript["valid"]:
+            failed += 1
+            error = f"Invalid transcript format: {parsed_transcript['error']}"
+            manifest.record({"id": item.id, "fingerprint": None, "status": "failed", "error": error})
+            print(f"{item.id}: {error}")
+            continue
+        fingerprint = action._render_fingerprint(parsed_transcript, user_id)
+        if not manifest.is_done(item.id, fingerprint):
+            pending.append((item, fingerprint))
+    print(f"{len(items)} items: {len(items) - len(pending) - failed} already rendered, {len(pending)} to render")
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=max(1, args.processes),
+        initializer=_init_batch_worker,
+        initargs=(
+            valves,
+            args.output_dir,
+            SharedTokenBucket(base_valves.requests_per_minute),
+            SharedTokenBucket(base_valves.characters_per_minute),
+            log_level,
+        ),
+    ) as pool:
+        futures = {pool.submit(render_batch_item, item, user_id): (item, fingerprint) for item, fingerprint in pending}
+        try:
+            for count, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                item, fingerprint = futures[future]
+                entry = {"id": item.id, "fingerprint": fingerprint}
+                try:
+                    entry.update(status="done", **future.result())
+                    outcome = f"done in {entry['seconds']}s"
+                except Exception as e:
+                    failed += 1
+                    entry.update(status="failed", error=str(e))
+                    outcome = f"failed: {e}"
+                manifest.record(entry)
+                print(f"[{count}/{len(pending)}] {item.id}: {outcome}")
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            print("Interrupted, run the same command again to resume")
+            return 130
+
+    return 1 if failed else 0
+
+
+if os.environ.get("PODCAST_IT_WARM_UP") == "1":
+    # Opt-in: pay for the deferred imports in the background, not on the first podcast
+    threading.Thread(target=warm_up, name="podcast-it-warm-up", daemon=True).start()
+
+if __name__ == "__main__":
+    sys.exit(batch_main())